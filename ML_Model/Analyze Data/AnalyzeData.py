@@ -1,25 +1,142 @@
+import argparse
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
-# Import modular plotting functions
-from plots.class_distribution import plot_class_distribution
-from plots.numerical_distributions import plot_numerical_distributions
-from plots.correlation_heatmap import plot_correlation_heatmap
-from plots.feature_boxplots import plot_feature_boxplots
+# Plots are rendered by the modules in plots/, via the render scheduler
+from render_scheduler import PlotJob, render_plots
+from crop_stats import CropStats
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+# The cleaned-data reader lives with the cleaner in Data Wrangling
+sys.path.append(str(Path(__file__).parent.parent / 'Data Wrangling'))
+from DataWrangling import load_cleaned_dataset
 
-def analyze_data(input_file, output_dir="analysis_results"):
+# Above this many rows plots are drawn from samples and precomputed counts
+LARGE_DATA_ROWS = 100_000
+
+def stratified_sample(df, per_class, label_col='label', seed=42):
+    """
+    Up to `per_class` random rows of every label, in their original order.
+
+    Args:
+        df (pd.DataFrame): Dataset to sample
+        per_class (int): Rows kept per label; smaller classes are kept whole
+        label_col (str): Column holding the class labels
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: The sampled rows
+    """
+    codes = pd.factorize(df[label_col])[0]
+    rng = np.random.default_rng(seed)
+    # Shuffle, then group by label keeping the shuffled order within each group
+    order = rng.permutation(len(df))
+    order = order[np.argsort(codes[order], kind='stable')]
+    sorted_codes = codes[order]
+    group_start = np.searchsorted(sorted_codes, sorted_codes)
+    rank = np.arange(len(order)) - group_start
+    return df.iloc[np.sort(order[rank < per_class])]
+
+def histogram_counts(df, numerical_cols, bins=50, label_col='label'):
+    """
+    Per-label histogram counts of each feature, computed with NumPy.
+
+    Bin edges span each feature's full range and are shared by all labels,
+    so the counts can be drawn as stacked histograms.
+
+    Returns:
+        pd.DataFrame: One row per (feature, label, bin) with columns
+            'feature', 'label', 'bin_left', 'bin_right' and 'count'
+    """
+    codes, labels = pd.factorize(df[label_col], sort=True)
+    frames = []
+    for col in numerical_cols:
+        values = df[col].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        edges = np.histogram_bin_edges(values[valid], bins=bins)
+        # Same binning as np.histogram: right edge included in the last bin
+        idx = np.clip(np.searchsorted(edges, values[valid], side='right') - 1, 0, bins - 1)
+        counts = np.bincount(codes[valid] * bins + idx, minlength=len(labels) * bins)
+        frames.append(pd.DataFrame({
+            'feature': col,
+            'label': np.repeat(np.asarray(labels, dtype=object), bins),
+            'bin_left': np.tile(edges[:-1], len(labels)),
+            'bin_right': np.tile(edges[1:], len(labels)),
+            'count': counts
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def plot_jobs(numerical_cols, top_features):
+    """
+    The figures produced by analyze_data, one job per module in plots/.
+
+    Args:
+        numerical_cols (list): Numerical feature columns
+        top_features (list): Features shown in the pairplot
+
+    Returns:
+        list: PlotJob instances
+    """
+    return [
+        PlotJob('class_distribution', 'plot_class_distribution', 'class_distribution.png', ['label']),
+        PlotJob('numerical_distributions', 'plot_numerical_distributions', 'numerical_distributions.png',
+                numerical_cols + ['label'], args=(numerical_cols,)),
+        PlotJob('correlation_heatmap', 'plot_correlation_heatmap', 'correlation_heatmap.png',
+                numerical_cols, args=(numerical_cols,)),
+        PlotJob('feature_boxplots', 'plot_feature_boxplots', 'feature_boxplots.png',
+                ['label'] + numerical_cols, args=(numerical_cols,)),
+        PlotJob('feature_pairplot', 'plot_feature_pairplot', 'feature_pairplot.png',
+                top_features + ['label'], args=(top_features,))
+    ]
+
+def large_data_jobs(df, numerical_cols, top_features, class_counts, correlation_matrix, per_class=2000):
+    """
+    Plot jobs for large datasets, drawn from fixed-size inputs.
+
+    Class counts, the correlation matrix and histogram counts are computed
+    over every row with vectorized reductions; the boxplots and a hexbin
+    pairplot use a stratified sample of `per_class` rows per label. Drawing
+    cost therefore does not grow with the number of rows.
+    """
+    sample = stratified_sample(df, per_class)
+    return [
+        PlotJob('class_distribution', 'plot_class_counts', 'class_distribution.png',
+                data=class_counts.rename_axis('label').reset_index(name='count')),
+        PlotJob('numerical_distributions', 'plot_binned_distributions', 'numerical_distributions.png',
+                args=(numerical_cols,), data=histogram_counts(df, numerical_cols)),
+        PlotJob('correlation_heatmap', 'plot_correlation_matrix', 'correlation_heatmap.png',
+                data=correlation_matrix),
+        PlotJob('feature_boxplots', 'plot_feature_boxplots', 'feature_boxplots.png',
+                ['label'] + numerical_cols, args=(numerical_cols,), data=sample),
+        PlotJob('feature_pairplot', 'plot_binned_pairplot', 'feature_pairplot.png',
+                top_features + ['label'], args=(top_features,), data=sample)
+    ]
+
+def analyze_data(input_file, output_dir="analysis_results", n_workers=None, force=False,
+                 large_data=None, sample_per_class=2000, labelled_rows=None):
     """
     Perform comprehensive analysis of the crop recommendation dataset.
+
+    Statistics are computed here; the plots are rendered in parallel by
+    render_plots, which skips any plot whose data, parameters and plot
+    code are unchanged since it was last written.
     
     Args:
         input_file (str): Path to the cleaned CSV file
         output_dir (str): Directory to save analysis plots
+        n_workers (int): Processes used to render plots (default: one per plot, up to the CPU count)
+        force (bool): Re-render every plot
+        large_data (bool): Draw plots from samples and precomputed counts
+            (default: when the dataset has more than LARGE_DATA_ROWS rows)
+        sample_per_class (int): Rows per crop sampled in large-data mode
+        labelled_rows (str): Optional CSV of extra labelled rows folded into
+            the per-crop statistics (not the plots)
+
+    Returns:
+        bool: True if the statistics were written and every plot rendered
     """
     try:
         # Create output directory
@@ -27,13 +144,13 @@ def analyze_data(input_file, output_dir="analysis_results"):
         output_path.mkdir(parents=True, exist_ok=True)
         
         # Read the cleaned dataset
-        df = pd.read_csv(input_file)
+        df = load_cleaned_dataset(input_file)
         print("Dataset Shape:", df.shape)
         print("\nDataset Info:")
         print(df.info())
         
         # 1. Class Distribution Analysis
-        class_counts = plot_class_distribution(df, output_path)
+        class_counts = df['label'].value_counts()
         print("\nClass Distribution:")
         print(class_counts)
         print("\nClass Balance Metrics:")
@@ -41,45 +158,63 @@ def analyze_data(input_file, output_dir="analysis_results"):
         print(f"Most common class: {class_counts.index[0]} ({class_counts.iloc[0]} samples)")
         print(f"Least common class: {class_counts.index[-1]} ({class_counts.iloc[-1]} samples)")
         
-        # 2. Numerical Features Analysis
+        # 2. Numerical Features and Correlation Analysis
         numerical_cols = df.select_dtypes(include=[np.number]).columns
         numerical_cols = [col for col in numerical_cols if col != 'label']
-        plot_numerical_distributions(df, numerical_cols, output_path)
-        
-        # 3. Correlation Analysis
-        correlation_matrix = plot_correlation_heatmap(df, numerical_cols, output_path)
+        correlation_matrix = df[numerical_cols].corr()
         
-        # 4. Box Plots for each numerical feature by crop type
-        plot_feature_boxplots(df, numerical_cols, output_path)
-        
-        # 5. Statistical Summary
+        # 3. Statistical Summary
         print("\nStatistical Summary of Numerical Features:")
         print(df[numerical_cols].describe())
         
-        # 6. Pairplot for top correlated features
-        # Get top 5 most correlated feature pairs
+        # 4. Top 5 most correlated feature pairs, shown in the pairplot
         corr_pairs = correlation_matrix.unstack().sort_values(ascending=False)
         top_corr_pairs = corr_pairs[corr_pairs < 1.0].head(5)
-        top_features = list(set([pair[0] for pair in top_corr_pairs.index] + 
-                              [pair[1] for pair in top_corr_pairs.index]))
-        
-        plt.figure(figsize=(12, 10))
-        sns.pairplot(df[top_features + ['label']], hue='label', diag_kind='kde')
-        plt.savefig(output_path / 'feature_pairplot.png')
-        plt.close()
+        # Sorted so the pairplot's fingerprint is stable between runs
+        top_features = sorted(set([pair[0] for pair in top_corr_pairs.index] + 
+                                  [pair[1] for pair in top_corr_pairs.index]))
         
         print("\nTop 5 Most Correlated Feature Pairs:")
         print(top_corr_pairs)
         
-        # 7. Save summary statistics to CSV
-        summary_stats = df.groupby('label')[numerical_cols].agg(['mean', 'std', 'min', 'max'])
-        summary_stats.to_csv(output_path / 'crop_statistics.csv')
+        # 5. Render plots (distributions, heatmap, boxplots, pairplot)
+        if large_data is None:
+            large_data = len(df) > LARGE_DATA_ROWS
+        if large_data:
+            print(f"\nLarge-data mode: plotting from counts and {sample_per_class} sampled rows per crop")
+            jobs = large_data_jobs(df, numerical_cols, top_features, class_counts, correlation_matrix,
+                                   per_class=sample_per_class)
+        else:
+            jobs = plot_jobs(numerical_cols, top_features)
+        rendered = render_plots(df, jobs, output_path, n_workers=n_workers, force=force)
+        
+        # 6. Per-crop statistics, persisted so new rows can be added with crop_stats.update_crop_stats
+        crop_stats = CropStats.from_frame(df, numerical_cols)
+        if labelled_rows is not None and Path(labelled_rows).exists():
+            crop_stats.update(pd.read_csv(labelled_rows))
+        crop_stats.save(output_path / 'crop_stats.json')
+        crop_stats.to_frame().to_csv(output_path / 'crop_statistics.csv')
         
+        if rendered['failed']:
+            print(f"\nAnalysis finished with {len(rendered['failed'])} failed plot(s)")
+            return False
         print(f"\nAnalysis complete! Results saved to {output_dir}/")
+        return True
         
     except Exception as e:
         print(f"An error occurred during analysis: {str(e)}")
+        return False
 
 if __name__ == "__main__":
-    input_file = "data/cleanCrop_rec_DataSet.csv"
-    analyze_data(input_file)
+    parser = argparse.ArgumentParser(description="Analyze the cleaned crop dataset")
+    parser.add_argument("--input", default="data/cleanCrop_rec_DataSet.csv")
+    parser.add_argument("--output", default="analysis_results")
+    parser.add_argument("--workers", type=int, help="Processes used to render plots")
+    parser.add_argument("--force", action="store_true", help="Re-render plots even if they are up to date")
+    parser.add_argument("--large-data", action="store_true", default=None,
+                        help=f"Plot from samples and binned counts (default above {LARGE_DATA_ROWS:,} rows)")
+    parser.add_argument("--sample-per-class", type=int, default=2000, help="Rows per crop sampled in large-data mode")
+    args = parser.parse_args()
+    ok = analyze_data(args.input, args.output, n_workers=args.workers, force=args.force,
+                      large_data=args.large_data, sample_per_class=args.sample_per_class)
+    sys.exit(0 if ok else 1)
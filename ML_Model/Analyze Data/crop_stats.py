@@ -0,0 +1,304 @@
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FEATURES = ['n', 'p', 'k', 'temperature', 'humidity', 'ph', 'rainfall']
+
+
+def _quantile_sketch():
+    # The sketch lives with the streaming cleaner in Data Wrangling
+    wrangling_dir = str(Path(__file__).parent.parent / 'Data Wrangling')
+    if wrangling_dir not in sys.path:
+        sys.path.append(wrangling_dir)
+    from sketches import QuantileSketch
+    return QuantileSketch
+
+
+class CropStats:
+    """
+    Mergeable per-crop, per-feature summary statistics.
+
+    For every (crop, feature) pair it keeps the count, mean and sum of
+    squared deviations (Welford/Chan), the minimum and maximum, and
+    optionally a QuantileSketch. update() folds in a batch of rows in time
+    proportional to the batch, merge() combines accumulators built on
+    separate partitions or processes, and the state round-trips through
+    JSON with save()/load(), so statistics can be kept current without
+    rereading the dataset.
+    """
+
+    def __init__(self, features=FEATURES, sketch_k=None):
+        """
+        Args:
+            features (list): Numerical columns to summarize
+            sketch_k (int): Keep a QuantileSketch of this size per crop and
+                feature (default: no sketches)
+        """
+        self.features = list(features)
+        self.sketch_k = sketch_k
+        self.labels = []
+        self.int_features = set()
+        shape = (0, len(self.features))
+        self.count = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self.sketches = {}
+
+    @classmethod
+    def from_frame(cls, df, features=FEATURES, sketch_k=None, label_col='label'):
+        """Accumulator over every row of a DataFrame."""
+        stats = cls(features, sketch_k=sketch_k)
+        stats.update(df, label_col=label_col)
+        return stats
+
+    def update(self, df, label_col='label'):
+        """
+        Fold a batch of rows into the statistics. NaNs are ignored.
+
+        Args:
+            df (pd.DataFrame): Rows with the feature columns and a label column
+            label_col (str): Column holding the crop names
+        """
+        if df.empty:
+            return
+        if not self.count.any():
+            self.int_features = {col for col in self.features if pd.api.types.is_integer_dtype(df[col])}
+        else:
+            self.int_features &= {col for col in self.features if pd.api.types.is_integer_dtype(df[col])}
+
+        # Per-crop moments of the batch, then merged into the running totals
+        groups = df[self.features].astype(np.float64).groupby(df[label_col].astype(str), sort=False)
+        batch = groups.agg(['count', 'mean', 'var', 'min', 'max'])
+        labels = list(batch.index)
+
+        def stat(name):
+            return batch.xs(name, axis=1, level=1)[self.features].to_numpy(dtype=np.float64)
+
+        count = stat('count')
+        # Single-row groups have NaN variance but no spread to add
+        m2 = np.nan_to_num(stat('var')) * np.maximum(count - 1, 0)
+        minimum = np.nan_to_num(stat('min'), nan=np.inf)
+        maximum = np.nan_to_num(stat('max'), nan=-np.inf)
+        mean = np.nan_to_num(stat('mean'))
+
+        rows = self._label_rows(labels)
+        self._combine(rows, count, mean, m2, minimum, maximum)
+
+        if self.sketch_k:
+            QuantileSketch = _quantile_sketch()
+            values = df[self.features].to_numpy(dtype=np.float64)
+            for label, index in groups.indices.items():
+                for f, col in enumerate(self.features):
+                    sketch = self.sketches.setdefault((label, col), QuantileSketch(self.sketch_k))
+                    sketch.update(values[index, f])
+
+    def merge(self, other):
+        """Fold in another accumulator over the same features (e.g. another partition)."""
+        if other.features != self.features:
+            raise ValueError(f"Cannot merge statistics over {other.features} into {self.features}")
+        if not other.labels:
+            return
+        self.int_features = (self.int_features & other.int_features) if self.labels else set(other.int_features)
+        rows = self._label_rows(other.labels)
+        self._combine(rows, other.count, other.mean, other.m2, other.min, other.max)
+        for key, sketch in other.sketches.items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = sketch
+
+    def _label_rows(self, labels):
+        """Row index of each label, adding rows for labels not seen before."""
+        index = {label: i for i, label in enumerate(self.labels)}
+        new = [label for label in labels if label not in index]
+        if new:
+            for label in new:
+                index[label] = len(self.labels)
+                self.labels.append(label)
+            pad = ((0, len(new)), (0, 0))
+            self.count = np.pad(self.count, pad)
+            self.mean = np.pad(self.mean, pad)
+            self.m2 = np.pad(self.m2, pad)
+            self.min = np.pad(self.min, pad, constant_values=np.inf)
+            self.max = np.pad(self.max, pad, constant_values=-np.inf)
+        return np.array([index[label] for label in labels], dtype=np.intp)
+
+    def _combine(self, rows, count, mean, m2, minimum, maximum):
+        """Chan et al.'s pairwise update of (count, mean, M2) plus min/max."""
+        n_a = self.count[rows]
+        total = n_a + count
+        delta = mean - self.mean[rows]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, count / total, 0.0)
+        self.mean[rows] += delta * weight
+        self.m2[rows] += m2 + delta ** 2 * n_a * weight
+        self.count[rows] = total
+        self.min[rows] = np.minimum(self.min[rows], minimum)
+        self.max[rows] = np.maximum(self.max[rows], maximum)
+
+    def to_frame(self):
+        """
+        Mean, standard deviation, minimum and maximum per crop.
+
+        Returns:
+            pd.DataFrame: Same layout as
+                df.groupby('label')[features].agg(['mean', 'std', 'min', 'max'])
+        """
+        order = np.argsort(self.labels, kind='stable')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.where(self.count > 1, self.m2 / (self.count - 1), np.nan))
+        columns = {}
+        for f, col in enumerate(self.features):
+            empty = self.count[order, f] == 0
+            minimum = np.where(empty, np.nan, self.min[order, f])
+            maximum = np.where(empty, np.nan, self.max[order, f])
+            if col in self.int_features and not empty.any():
+                minimum, maximum = minimum.astype(np.int64), maximum.astype(np.int64)
+            columns[(col, 'mean')] = np.where(empty, np.nan, self.mean[order, f])
+            columns[(col, 'std')] = std[order, f]
+            columns[(col, 'min')] = minimum
+            columns[(col, 'max')] = maximum
+        index = pd.Index([self.labels[i] for i in order], name='label')
+        return pd.DataFrame(columns, index=index)
+
+    def quantiles(self, q):
+        """
+        Sketched quantiles per crop.
+
+        Args:
+            q (list): Quantiles in [0, 1]
+
+        Returns:
+            pd.DataFrame: Index crops, columns (feature, q)
+        """
+        if not self.sketch_k:
+            raise ValueError("Quantiles need an accumulator created with sketch_k")
+        labels = sorted(self.labels)
+        columns = {
+            (col, quantile): [self.sketches[(label, col)].quantile(quantile) if (label, col) in self.sketches
+                              else np.nan for label in labels]
+            for col in self.features for quantile in q
+        }
+        return pd.DataFrame(columns, index=pd.Index(labels, name='label'))
+
+    def out_of_range(self, df, label_col='label'):
+        """
+        Rows whose values fall outside the range seen so far for their crop.
+
+        Crops not seen before are not flagged.
+
+        Returns:
+            pd.DataFrame: Boolean frame, one column per feature
+        """
+        index = {label: i for i, label in enumerate(self.labels)}
+        rows = df[label_col].astype(str).map(index)
+        known = rows.notna().to_numpy()
+        rows = rows.fillna(0).to_numpy(dtype=np.intp)
+        values = df[self.features].to_numpy(dtype=np.float64)
+        outside = (values < self.min[rows]) | (values > self.max[rows])
+        return pd.DataFrame(outside & known[:, None], columns=self.features, index=df.index)
+
+    def ideal_values(self):
+        """Per-crop feature means in the {crop: {feature: value}} shape the JS recommender reads."""
+        frame = self.to_frame()
+        return {
+            label: {col: round(float(frame.loc[label, (col, 'mean')]), 2) for col in self.features}
+            for label in frame.index
+        }
+
+    def save(self, path):
+        """Write the accumulator state as JSON."""
+        state = {
+            'features': self.features,
+            'sketch_k': self.sketch_k,
+            'labels': self.labels,
+            'int_features': sorted(self.int_features),
+            'count': self.count.tolist(),
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist(),
+            'min': self.min.tolist(),
+            'max': self.max.tolist(),
+            'sketches': [
+                {'label': label, 'feature': col, **sketch.to_dict()}
+                for (label, col), sketch in self.sketches.items()
+            ]
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        """Read an accumulator written by save()."""
+        with open(path) as f:
+            state = json.load(f)
+        stats = cls(state['features'], sketch_k=state['sketch_k'])
+        stats.labels = state['labels']
+        stats.int_features = set(state['int_features'])
+        shape = (len(stats.labels), len(stats.features))
+        for name in ('count', 'mean', 'm2', 'min', 'max'):
+            setattr(stats, name, np.array(state[name], dtype=np.float64).reshape(shape))
+        if state['sketches']:
+            QuantileSketch = _quantile_sketch()
+            stats.sketches = {
+                (entry['label'], entry['feature']): QuantileSketch.from_dict(entry)
+                for entry in state['sketches']
+            }
+        return stats
+
+
+def update_crop_stats(batch, stats_path, csv_path=None):
+    """
+    Fold a batch of labelled rows into persisted crop statistics.
+
+    Rows outside the range recorded so far for their crop are reported
+    before the batch is added.
+
+    Args:
+        batch (pd.DataFrame): New rows with the feature columns and 'label'
+        stats_path: JSON written by CropStats.save()
+        csv_path: If given, crop_statistics.csv to rewrite from the result
+
+    Returns:
+        CropStats: The updated statistics
+    """
+    stats = CropStats.load(stats_path)
+    outside = stats.out_of_range(batch)
+    flagged = outside.sum()
+    if flagged.any():
+        print("Rows outside their crop's recorded range:")
+        print(flagged[flagged > 0].to_string())
+    stats.update(batch)
+    stats.save(stats_path)
+    if csv_path is not None:
+        stats.to_frame().to_csv(csv_path)
+    print(f"Updated crop statistics with {len(batch)} rows")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update or export persisted per-crop statistics")
+    parser.add_argument("--stats", default="analysis_results/crop_stats.json")
+    parser.add_argument("--add", help="CSV of new labelled rows to fold into the statistics")
+    parser.add_argument("--csv", default="analysis_results/crop_statistics.csv",
+                        help="crop_statistics.csv to rewrite after --add")
+    parser.add_argument("--export-ideal", help="Write per-crop ideal values (feature means) as JSON to this path")
+    args = parser.parse_args()
+
+    if args.add:
+        batch = pd.read_csv(args.add)
+        batch.columns = batch.columns.str.lower().str.replace(' ', '_')
+        update_crop_stats(batch, args.stats, args.csv)
+    if args.export_ideal:
+        with open(args.export_ideal, 'w') as f:
+            json.dump(CropStats.load(args.stats).ideal_values(), f, indent=2)
+        print(f"Ideal values written to {args.export_ideal}")
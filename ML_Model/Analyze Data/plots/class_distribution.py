@@ -2,8 +2,14 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 
 def plot_class_distribution(df, output_path):
-    plt.figure(figsize=(12, 6))
     class_counts = df['label'].value_counts()
+    plot_class_counts(class_counts.rename_axis('label').reset_index(name='count'), output_path)
+    return class_counts
+
+def plot_class_counts(counts, output_path):
+    """Bar chart from precomputed 'label'/'count' rows (large-data mode)."""
+    class_counts = counts.set_index('label')['count']
+    plt.figure(figsize=(12, 6))
     sns.barplot(x=class_counts.index, y=class_counts.values)
     plt.title('Distribution of Crop Types')
     plt.xticks(rotation=45, ha='right')
@@ -12,4 +18,3 @@ def plot_class_distribution(df, output_path):
     plt.tight_layout()
     plt.savefig(output_path / 'class_distribution.png')
     plt.close()
-    return class_counts 
\ No newline at end of file
@@ -0,0 +1,31 @@
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+def plot_feature_pairplot(df, features, output_path):
+    grid = sns.pairplot(df[features + ['label']], hue='label', diag_kind='kde')
+    grid.figure.savefig(output_path / 'feature_pairplot.png')
+    plt.close(grid.figure)
+
+def plot_binned_pairplot(df, features, output_path, gridsize=30):
+    """
+    Pairplot for large datasets: hexbin densities instead of per-point scatter.
+
+    Off-diagonal panels bin every row into hexagons and the diagonal shows
+    stacked per-crop histograms instead of per-class KDEs, so the cost is
+    linear in the rows given (a stratified sample in large-data mode).
+    """
+    n = len(features)
+    fig, axes = plt.subplots(n, n, figsize=(2.5*n, 2.5*n), squeeze=False)
+    for i, y in enumerate(features):
+        for j, x in enumerate(features):
+            ax = axes[i, j]
+            if i == j:
+                sns.histplot(data=df, x=x, hue='label', multiple="stack", bins=gridsize,
+                             linewidth=0, legend=False, ax=ax)
+            else:
+                ax.hexbin(df[x], df[y], gridsize=gridsize, bins='log', mincnt=1, cmap='viridis')
+            ax.set_xlabel(x if i == n - 1 else '')
+            ax.set_ylabel(y if j == 0 else '')
+    plt.tight_layout()
+    fig.savefig(output_path / 'feature_pairplot.png')
+    plt.close(fig)
@@ -15,4 +15,40 @@ def plot_numerical_distributions(df, numerical_cols, output_path):
         axes[idx].set_visible(False)
     plt.tight_layout()
     plt.savefig(output_path / 'numerical_distributions.png')
-    plt.close() 
\ No newline at end of file
+    plt.close()
+
+def plot_binned_distributions(hist, numerical_cols, output_path):
+    """
+    Stacked per-crop histograms from precomputed bin counts (large-data mode).
+
+    `hist` has one row per (feature, label, bin) with columns 'feature',
+    'label', 'bin_left', 'bin_right' and 'count', so drawing costs the
+    same whatever the number of rows that were counted. Each crop is one
+    filled step artist stacked on the ones before it.
+    """
+    labels = list(dict.fromkeys(hist['label']))
+    # Seaborn's default hue palette
+    palette = sns.color_palette(n_colors=len(labels)) if len(labels) <= 10 else sns.color_palette("husl", len(labels))
+    n_cols = 3
+    n_rows = (len(numerical_cols) + n_cols - 1) // n_cols
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 4*n_rows))
+    axes = axes.flatten()
+    for idx, col in enumerate(numerical_cols):
+        counts = hist[hist['feature'] == col]
+        edges = np.append(np.unique(counts['bin_left']), counts['bin_right'].max())
+        table = counts.pivot_table(index='label', columns='bin_left', values='count', aggfunc='sum', sort=False)
+        bottom = np.zeros(len(edges) - 1)
+        for label, color in zip(labels, palette):
+            top = bottom + table.loc[label].to_numpy()
+            axes[idx].stairs(top, edges, baseline=bottom, fill=True, color=color, alpha=0.75, label=label)
+            bottom = top
+        axes[idx].set_title(f'Distribution of {col}')
+        axes[idx].set_xlabel(col)
+        axes[idx].set_ylabel('Count')
+        axes[idx].tick_params(axis='x', rotation=45)
+    axes[0].legend(title='label', fontsize='small', ncol=2)
+    for idx in range(len(numerical_cols), len(axes)):
+        axes[idx].set_visible(False)
+    plt.tight_layout()
+    plt.savefig(output_path / 'numerical_distributions.png')
+    plt.close()
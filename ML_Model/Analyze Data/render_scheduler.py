@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import hashlib
+import importlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+PLOTS_DIR = Path(__file__).parent / "plots"
+MANIFEST_NAME = ".render_manifest.json"
+
+
+class PlotJob:
+    """
+    One figure rendered by a function in plots/.
+
+    The function is called as func(df[columns], *args, output_path) and
+    must write `output` inside output_path.
+
+    Args:
+        module (str): Module name inside plots/, e.g. "class_distribution"
+        function (str): Plot function in that module
+        output (str): File name the function writes
+        columns (list): Data columns the plot reads (default: all of `data`)
+        args (tuple): Extra JSON-serializable arguments
+        data (pd.DataFrame): Precomputed frame (counts, a sample, ...) to
+            pass instead of the dataset
+    """
+
+    def __init__(self, module, function, output, columns=None, args=(), data=None):
+        self.module = module
+        self.function = function
+        self.output = output
+        self.columns = list(data.columns if columns is None else columns)
+        self.args = tuple(args)
+        self.data = data
+
+    def frame(self, df):
+        """The data the plot function is called with."""
+        return (df if self.data is None else self.data)[self.columns]
+
+
+def _init_worker():
+    # Workers only ever write files; never start a GUI event loop
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render(module, function, data, args, output_path):
+    start = time.perf_counter()
+    func = getattr(importlib.import_module(f"plots.{module}"), function)
+    func(data, *args, output_path)
+    return time.perf_counter() - start
+
+
+def _column_digests(df, columns, index=False):
+    return {
+        col: hashlib.sha256(pd.util.hash_pandas_object(df[col], index=index).to_numpy().tobytes()).hexdigest()
+        for col in columns
+    }
+
+
+def _fingerprint(job, digests):
+    digest = hashlib.sha256()
+    digest.update(json.dumps([job.module, job.function, job.output, job.columns, list(job.args)],
+                             default=str).encode())
+    if job.data is not None:
+        # Small precomputed frames: their index (e.g. crop names) is data too
+        digests = _column_digests(job.data, job.columns, index=True)
+    for col in job.columns:
+        digest.update(digests[col].encode())
+    digest.update((PLOTS_DIR / f"{job.module}.py").read_bytes())
+    return digest.hexdigest()
+
+
+def _load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path, manifest):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def render_plots(df, jobs, output_path, n_workers=None, force=False):
+    """
+    Render plot jobs in parallel, skipping those whose output is current.
+
+    Each job is fingerprinted from the contents of the columns it reads,
+    its arguments and the source of its plot module. A job whose output
+    file exists and whose fingerprint matches the one recorded in
+    output_path/.render_manifest.json is skipped. The rest run in a
+    process pool with the Agg backend, each worker receiving only the
+    columns its plot needs.
+
+    Args:
+        df (pd.DataFrame): Dataset to plot
+        jobs (list): PlotJob instances
+        output_path (Path): Directory the figures are written to
+        n_workers (int): Processes to use (default: one per job, up to the
+            CPU count); 1 renders in this process
+        force (bool): Re-render every job
+
+    Returns:
+        dict: {"rendered": {output: seconds}, "skipped": [output, ...],
+            "failed": {output: error message}}
+    """
+    output_path = Path(output_path)
+    manifest_path = output_path / MANIFEST_NAME
+    manifest = _load_manifest(manifest_path)
+    digests = _column_digests(df, {col for job in jobs if job.data is None for col in job.columns})
+
+    fingerprints = {job.output: _fingerprint(job, digests) for job in jobs}
+    pending = [
+        job for job in jobs
+        if force
+        or manifest.get(job.output) != fingerprints[job.output]
+        or not (output_path / job.output).exists()
+    ]
+    result = {
+        "rendered": {},
+        "skipped": [job.output for job in jobs if job not in pending],
+        "failed": {}
+    }
+    for output in result["skipped"]:
+        print(f"Up to date: {output}")
+
+    def finished(job, seconds=None, error=None):
+        if error is not None:
+            result["failed"][job.output] = error
+            manifest.pop(job.output, None)
+            print(f"Failed to render {job.output}: {error}")
+        else:
+            result["rendered"][job.output] = seconds
+            manifest[job.output] = fingerprints[job.output]
+            print(f"Rendered {job.output} in {seconds:.2f}s")
+        _save_manifest(manifest_path, manifest)
+
+    n_workers = n_workers or min(len(pending), os.cpu_count() or 1)
+    if n_workers <= 1 or len(pending) <= 1:
+        _init_worker()
+        for job in pending:
+            try:
+                finished(job, _render(job.module, job.function, job.frame(df), job.args, output_path))
+            except Exception as e:
+                finished(job, error=str(e))
+        return result
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker) as pool:
+        futures = {
+            job: pool.submit(_render, job.module, job.function, job.frame(df), job.args, output_path)
+            for job in pending
+        }
+        for job, future in futures.items():
+            try:
+                finished(job, future.result())
+            except Exception as e:
+                finished(job, error=str(e))
+    return result
@@ -1,79 +1,402 @@
+import os
+import argparse
+from collections import Counter
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from sketches import QuantileSketch, BloomFilter
 
-def load_and_clean_data(input_file, output_file):
+def write_columnar_cache(df, output_file):
+    """
+    Write a typed Feather copy of the cleaned data next to the CSV.
+
+    Numerical columns are stored as float32 and text columns as
+    categoricals, so training and analysis load it without parsing text
+    and in a fraction of the memory. Needs pyarrow; without it only the
+    CSV is written and readers use that.
+
+    Returns:
+        Path: The cache file, or None if it was not written
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow is not installed; skipping the columnar cache")
+        return None
+
+    cache_path = Path(output_file).with_suffix('.feather')
+    typed = df.copy()
+    numerical_columns = typed.select_dtypes(include=[np.number]).columns
+    typed[numerical_columns] = typed[numerical_columns].astype(np.float32)
+    for col in typed.columns.difference(numerical_columns):
+        typed[col] = typed[col].astype('category')
+
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    typed.reset_index(drop=True).to_feather(tmp_path)
+    os.replace(tmp_path, cache_path)
+    print(f"Columnar cache saved to: {cache_path}")
+    return cache_path
+
+def load_cleaned_dataset(csv_path):
+    """
+    Read the cleaned dataset, preferring its columnar cache.
+
+    The Feather copy written by write_columnar_cache is used when it is at
+    least as new as the CSV and pyarrow is available, otherwise the CSV is
+    parsed. Training and analysis both read the data through this.
+    """
+    csv_path = Path(csv_path)
+    cache_path = csv_path.with_suffix('.feather')
+    csv_mtime = csv_path.stat().st_mtime_ns if csv_path.exists() else -1
+    if cache_path.exists() and cache_path.stat().st_mtime_ns >= csv_mtime:
+        try:
+            return pd.read_feather(cache_path)
+        except ImportError:
+            pass
+    return pd.read_csv(csv_path)
+
+def _duplicated_rows(columns):
+    """
+    Boolean mask of rows repeating an earlier row, like DataFrame.duplicated.
+
+    Rows are compared by a 64-bit hash combined over the column arrays, and
+    every hash match is checked value by value against the first row with
+    that hash.
+
+    Args:
+        columns (list): Equal-length 1-D arrays (numbers or integer codes)
+
+    Returns:
+        np.ndarray: The mask, or None if a hash collision was found and the
+            caller has to compare rows exactly
+    """
+    hashes = pd.util.hash_array(columns[0])
+    with np.errstate(over="ignore"):
+        for values in columns[1:]:
+            hashes = (hashes * np.uint64(0x100000001B3)) ^ pd.util.hash_array(values)
+    duplicated = pd.Series(hashes).duplicated().to_numpy()
+
+    rows = np.flatnonzero(duplicated)
+    if len(rows):
+        kept = np.flatnonzero(~duplicated)
+        originals = kept[pd.Index(hashes[kept]).get_indexer(hashes[rows])]
+        for values in columns:
+            if not (values[rows] == values[originals]).all():
+                return None
+    return duplicated
+
+def clean_dataframe(df):
+    """
+    Clean a raw crop recommendation frame with vectorized column statistics.
+
+    Each numerical column is read as a NumPy array (a view for float64
+    columns) and handled with whole-array operations: missing values are
+    counted and filled with the column median, duplicate rows are found
+    with one hash over all columns, and the quartiles for the IQR bounds
+    come from one quantile call per column before it is clipped in place.
+    Only columns with missing values get a filled copy, and every column is
+    copied once more when the duplicates are dropped; that copy becomes
+    the cleaned column. Text columns are filled with their mode. Column
+    names are lowercased with spaces replaced by underscores.
+
+    Args:
+        df (pd.DataFrame): Raw dataset
+
+    Returns:
+        tuple: (cleaned pd.DataFrame, cleaning report dict)
+    """
+    initial_rows = len(df)
+    numerical_columns = list(df.select_dtypes(include=[np.number]).columns)
+    categorical_columns = [col for col in df.columns if col not in numerical_columns]
+
+    # Missing values: medians for numbers, modes for text
+    values = []
+    nulls_filled = np.zeros(len(numerical_columns), dtype=np.int64)
+    medians = np.full(len(numerical_columns), np.nan)
+    for j, col in enumerate(numerical_columns):
+        column = df[col].to_numpy(dtype=np.float64)
+        missing = np.isnan(column)
+        nulls_filled[j] = np.count_nonzero(missing)
+        if nulls_filled[j]:
+            # The masked copy is ours, so the median may partition it in place
+            medians[j] = np.median(column[~missing], overwrite_input=True)
+            column = np.where(missing, medians[j], column)
+        values.append(column)
+
+    text = {}
+    text_fill = {}
+    for col in categorical_columns:
+        n_missing = int(df[col].isna().sum())
+        text_fill[col] = (n_missing, df[col].mode()[0] if n_missing else None)
+        text[col] = df[col].fillna(text_fill[col][1]) if n_missing else df[col]
+
+    # Duplicates, with text compared through integer codes
+    codes = [pd.factorize(text[col], use_na_sentinel=False)[0] for col in categorical_columns]
+    duplicated = _duplicated_rows(values + codes)
+    if duplicated is None:
+        filled = pd.DataFrame(dict(zip(numerical_columns, values)))
+        for col in categorical_columns:
+            filled[col] = text[col].to_numpy()
+        duplicated = filled.duplicated().to_numpy()
+    keep = ~duplicated
+    # Each column's own copy of the kept rows, clipped in place below
+    values = [column[keep] for column in values]
+
+    # Outliers: IQR bounds per column, clipped in place
+    lower_bounds = np.full(len(numerical_columns), -np.inf)
+    upper_bounds = np.full(len(numerical_columns), np.inf)
+    clipped_low = np.zeros(len(numerical_columns), dtype=np.int64)
+    clipped_high = np.zeros(len(numerical_columns), dtype=np.int64)
+    for j, column in enumerate(values):
+        if not len(column):
+            continue
+        Q1, Q3 = np.quantile(column, [0.25, 0.75])
+        IQR = Q3 - Q1
+        lower_bounds[j] = np.nan_to_num(Q1 - 1.5 * IQR, nan=-np.inf)
+        upper_bounds[j] = np.nan_to_num(Q3 + 1.5 * IQR, nan=np.inf)
+        clipped_low[j] = np.count_nonzero(column < lower_bounds[j])
+        clipped_high[j] = np.count_nonzero(column > upper_bounds[j])
+        np.clip(column, lower_bounds[j], upper_bounds[j], out=column)
+
+    def clean_name(col):
+        return str(col).lower().replace(' ', '_')
+
+    cleaned = pd.DataFrame(dict(zip(numerical_columns, values)), index=df.index[keep], copy=False)
+    report_columns = {}
+    for j, col in enumerate(numerical_columns):
+        dtype = df[col].dtype
+        # Integer columns stay integers unless a fractional bound was written
+        # into them, as Series.clip does
+        fractional = ((clipped_low[j] and not float(lower_bounds[j]).is_integer())
+                      or (clipped_high[j] and not float(upper_bounds[j]).is_integer()))
+        if dtype.kind in "iu" and not fractional:
+            cleaned[col] = values[j].astype(dtype)
+        report_columns[clean_name(col)] = {
+            'nulls_filled': int(nulls_filled[j]),
+            'fill_value': float(medians[j]) if nulls_filled[j] else None,
+            'lower_bound': float(lower_bounds[j]),
+            'upper_bound': float(upper_bounds[j]),
+            'clipped_low': int(clipped_low[j]),
+            'clipped_high': int(clipped_high[j])
+        }
+    for col in categorical_columns:
+        cleaned[col] = text[col].array[keep]
+        n_missing, fill_value = text_fill[col]
+        report_columns[clean_name(col)] = {'nulls_filled': n_missing, 'fill_value': fill_value}
+
+    if list(cleaned.columns) != list(df.columns):
+        cleaned = cleaned[list(df.columns)]
+    cleaned.columns = [clean_name(col) for col in df.columns]
+    report = {
+        'initial_rows': initial_rows,
+        'final_rows': len(cleaned),
+        'duplicates_removed': initial_rows - len(cleaned),
+        'columns': report_columns
+    }
+    return cleaned, report
+
+def print_cleaning_report(report):
+    """Print a cleaning report as a short table."""
+    print(f"Rows: {report['initial_rows']} -> {report['final_rows']} "
+          f"({report['duplicates_removed']} duplicates removed)")
+    table = pd.DataFrame.from_dict(report['columns'], orient='index')
+    for col in ('nulls_filled', 'clipped_low', 'clipped_high'):
+        if col in table:
+            table[col] = table[col].astype('Int64')
+    print(table.to_string(na_rep=''))
+    if report.get('output_file'):
+        print(f"Cleaned dataset saved to: {report['output_file']}")
+
+def load_and_clean_data(input_file, output_file, chunksize=None, **stream_options):
     """
     Load and clean the crop recommendation dataset.
     
     Args:
         input_file (str): Path to the input CSV file
         output_file (str): Path to save the cleaned CSV file
+        chunksize (int): Rows per chunk; when set the file is cleaned with
+            stream_clean_data() in bounded memory instead of loaded whole
+        **stream_options: Passed on to stream_clean_data()
+
+    Returns:
+        dict: Cleaning report (row counts, and per column the nulls filled,
+            fill value, IQR bounds and values clipped), or None if
+            cleaning failed
     """
     try:
-        # Read the dataset
-        df = pd.read_csv(input_file)
-        
-        # Display initial information
-        print("Initial dataset shape:", df.shape)
-        print("\nInitial missing values:")
-        print(df.isnull().sum())
-        
-        # Handle missing values
-        # For numerical columns, fill with median
-        numerical_columns = df.select_dtypes(include=[np.number]).columns
-        for col in numerical_columns:
-            df[col] = df[col].fillna(df[col].median())
-        
-        # For categorical columns, fill with mode
-        categorical_columns = df.select_dtypes(include=['object']).columns
-        for col in categorical_columns:
-            df[col] = df[col].fillna(df[col].mode()[0])
-        
-        # Remove duplicates
-        initial_rows = len(df)
-        df = df.drop_duplicates()
-        removed_rows = initial_rows - len(df)
-        print(f"\nRemoved {removed_rows} duplicate rows")
-        
-        # Check for and handle outliers using IQR method
-        for col in numerical_columns:
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            # Replace outliers with bounds
-            df[col] = df[col].clip(lower=lower_bound, upper=upper_bound)
-        
-        # Ensure all column names are clean (lowercase, no spaces)
-        df.columns = df.columns.str.lower().str.replace(' ', '_')
+        if chunksize:
+            return stream_clean_data(input_file, output_file, chunksize, **stream_options)
+
+        df, report = clean_dataframe(pd.read_csv(input_file))
         
         # Save the cleaned dataset
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         df.to_csv(output_file, index=False)
-        
-        print("\nFinal dataset shape:", df.shape)
-        print("\nFinal missing values:")
-        print(df.isnull().sum())
-        print(f"\nCleaned dataset saved to: {output_file}")
-        
-        return df
+        write_columnar_cache(df, output_file)
+        report['output_file'] = str(output_file)
+        return report
         
     except Exception as e:
         print(f"An error occurred: {str(e)}")
         return None
 
+def _row_hashes(chunk):
+    """64-bit hash of every row's values."""
+    return pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+def stream_clean_data(input_file, output_file, chunksize=1_000_000, dedup="hash",
+                      expected_rows=10_000_000, error_rate=0.001, sketch_size=4096):
+    """
+    Clean a CSV too large for memory, one chunk at a time.
+
+    Applies the same steps as load_and_clean_data in three passes:
+
+    1. Medians (from quantile sketches) and modes of the raw columns.
+    2. Fill missing values, drop duplicate rows by row hash, write the rows
+       to a temporary file and sketch the quartiles of what is kept.
+    3. Clip the temporary file to the IQR bounds into output_file.
+
+    Peak memory is one chunk plus the sketches and the duplicate filter.
+    Sketches are exact until a column has more than sketch_size values.
+
+    Args:
+        input_file (str): Path to the input CSV file
+        output_file (str): Path to save the cleaned CSV file
+        chunksize (int): Rows read per chunk
+        dedup (str): "hash" keeps a set of 64-bit row hashes (memory grows
+            with the number of distinct rows); rows are not compared by
+            value, so two distinct rows with the same hash (chance about
+            n**2 / 2**65 for n distinct rows, under 1e-5 at 10M) lose the
+            later one. "bloom" uses a fixed-size Bloom filter that wrongly
+            drops about error_rate of unique rows
+        expected_rows (int): Distinct rows the Bloom filter is sized for
+        error_rate (float): Bloom filter false-positive rate at expected_rows
+        sketch_size (int): Values kept per sketch level
+
+    Returns:
+        dict: Cleaning report in the same form as load_and_clean_data's
+    """
+    if dedup not in ("hash", "bloom"):
+        raise ValueError(f"Unknown dedup mode: {dedup}")
+
+    # Pass 1: medians and modes
+    numerical_columns = None
+    medians = {}
+    modes = {}
+    null_counts = Counter()
+    initial_rows = 0
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        if numerical_columns is None:
+            numerical_columns = list(chunk.select_dtypes(include=[np.number]).columns)
+            categorical_columns = [col for col in chunk.columns if col not in numerical_columns]
+            medians = {col: QuantileSketch(sketch_size) for col in numerical_columns}
+            modes = {col: Counter() for col in categorical_columns}
+        initial_rows += len(chunk)
+        null_counts.update(chunk.isnull().sum().to_dict())
+        for col in numerical_columns:
+            medians[col].update(pd.to_numeric(chunk[col], errors='coerce').to_numpy())
+        for col in categorical_columns:
+            modes[col].update(chunk[col].dropna())
+    if numerical_columns is None:
+        raise ValueError(f"No rows in {input_file}")
+
+    fill_values = {col: float(sketch.quantile(0.5)) for col, sketch in medians.items()}
+    for col, counts in modes.items():
+        if counts:
+            top = max(counts.values())
+            # Ties resolve to the smallest value, as Series.mode()[0] does
+            fill_values[col] = min(value for value, n in counts.items() if n == top)
+
+    # Pass 2: fill, deduplicate, spool to a temporary file, sketch quartiles
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # The columnar cache is only written by the in-memory path; drop a stale one
+    output_path.with_suffix('.feather').unlink(missing_ok=True)
+    spool_path = output_path.with_name(output_path.name + ".spool")
+    seen = set() if dedup == "hash" else BloomFilter(expected_rows, error_rate)
+    quartiles = {col: QuantileSketch(sketch_size) for col in numerical_columns}
+    kept_rows = 0
+    try:
+        for i, chunk in enumerate(pd.read_csv(input_file, chunksize=chunksize)):
+            for col in numerical_columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+                # A column with any missing value is float in every chunk,
+                # as it is when the whole file is loaded
+                if null_counts[col]:
+                    chunk[col] = chunk[col].astype(np.float64)
+            chunk = chunk.fillna(fill_values)
+
+            hashes = _row_hashes(chunk)
+            keep = ~pd.Series(hashes).duplicated().to_numpy()
+            if dedup == "hash":
+                keep &= np.fromiter((h not in seen for h in hashes.tolist()), bool, len(hashes))
+                seen.update(hashes[keep].tolist())
+            else:
+                keep &= ~seen.contains(hashes)
+                seen.add(hashes[keep])
+            chunk = chunk[keep]
+
+            kept_rows += len(chunk)
+            for col in numerical_columns:
+                quartiles[col].update(chunk[col].to_numpy())
+            chunk.to_csv(spool_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+        bounds = {}
+        for col, sketch in quartiles.items():
+            Q1, Q3 = sketch.quantile([0.25, 0.75])
+            IQR = Q3 - Q1
+            bounds[col] = (float(Q1 - 1.5 * IQR), float(Q3 + 1.5 * IQR))
+
+        # Pass 3: clip and write with cleaned column names
+        clipped = {col: [0, 0] for col in bounds}
+        for i, chunk in enumerate(pd.read_csv(spool_path, chunksize=chunksize)):
+            for col, (lower, upper) in bounds.items():
+                clipped[col][0] += int((chunk[col] < lower).sum())
+                clipped[col][1] += int((chunk[col] > upper).sum())
+                chunk[col] = chunk[col].clip(lower=lower, upper=upper)
+            chunk.columns = chunk.columns.str.lower().str.replace(' ', '_')
+            chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    finally:
+        if spool_path.exists():
+            os.remove(spool_path)
+
+    def clean_name(col):
+        return str(col).lower().replace(' ', '_')
+
+    report_columns = {}
+    for col in numerical_columns + categorical_columns:
+        entry = {'nulls_filled': int(null_counts[col]), 'fill_value': fill_values.get(col)}
+        if col in bounds:
+            entry.update({
+                'lower_bound': bounds[col][0],
+                'upper_bound': bounds[col][1],
+                'clipped_low': clipped[col][0],
+                'clipped_high': clipped[col][1]
+            })
+        report_columns[clean_name(col)] = entry
+    return {
+        'initial_rows': initial_rows,
+        'final_rows': kept_rows,
+        'duplicates_removed': initial_rows - kept_rows,
+        'columns': report_columns,
+        'output_file': str(output_file)
+    }
+
 if __name__ == "__main__":
-    # Define input and output file paths
-    input_file = "data/Crop_recommendation (2).csv"
-    output_file = "data/cleanCrop_rec_DataSet.csv"
+    parser = argparse.ArgumentParser(description="Clean the crop recommendation dataset")
+    parser.add_argument("--input", default="data/Crop_recommendation (2).csv")
+    parser.add_argument("--output", default="data/cleanCrop_rec_DataSet.csv")
+    parser.add_argument("--chunksize", type=int, help="Stream the file in chunks of this many rows")
+    parser.add_argument("--dedup", choices=["hash", "bloom"], default="hash",
+                        help="Duplicate detection in streaming mode")
+    parser.add_argument("--expected-rows", type=int, default=10_000_000,
+                        help="Distinct rows the Bloom filter is sized for")
+    args = parser.parse_args()
     
     # Run the cleaning process
-    cleaned_df = load_and_clean_data(input_file, output_file)
+    report = load_and_clean_data(args.input, args.output, args.chunksize,
+                                 dedup=args.dedup, expected_rows=args.expected_rows)
     
-    if cleaned_df is not None:
-        print("\nSample of cleaned data:")
-        print(cleaned_df.head())
+    if report is not None:
+        print_cleaning_report(report)
@@ -0,0 +1,136 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch (KLL-style compactors).
+
+    Values are buffered at level 0; when a level holds more than `k`
+    values it is sorted and every other value (from a random offset) moves
+    up a level with twice the weight. Memory is O(k log(n / k)) and the
+    rank error is roughly proportional to 1/k. Until more than `k` values
+    have been seen nothing is compacted and quantiles are exact, matching
+    pandas' linear interpolation.
+    """
+
+    def __init__(self, k=4096, seed=0):
+        """
+        Args:
+            k (int): Values kept per level; larger is more accurate
+            seed (int): Seed for the compaction offsets
+        """
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add an array of values; NaNs are ignored."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Fold another sketch (e.g. from another process) into this one."""
+        for level, values in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self.count += other.count
+        self._compress()
+
+    def quantile(self, q):
+        """
+        Approximate quantile(s) of everything seen so far.
+
+        Args:
+            q: Float or array of floats in [0, 1]
+
+        Returns:
+            float or np.ndarray (NaN if the sketch is empty)
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], q)
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(v), 2.0 ** level) for level, v in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        # Rank of each retained value's midpoint, scaled to [0, 1]
+        cumulative = np.cumsum(weights[order])
+        positions = (cumulative - weights[order] / 2.0) / cumulative[-1]
+        return np.interp(q, positions, values)
+
+    def to_dict(self):
+        """JSON-serializable state (the compaction RNG is not kept)."""
+        return {'k': self.k, 'count': self.count, 'levels': [level.tolist() for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state, seed=0):
+        """Rebuild a sketch from to_dict() output."""
+        sketch = cls(state['k'], seed=seed)
+        sketch.count = state['count']
+        sketch.levels = [np.asarray(level, dtype=np.float64) for level in state['levels']]
+        return sketch
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            buffer = self.levels[level]
+            if len(buffer) > self.k:
+                buffer = np.sort(buffer)
+                # An odd value out stays at this level
+                n_even = len(buffer) - len(buffer) % 2
+                promoted = buffer[self._rng.integers(2):n_even:2]
+                self.levels[level] = buffer[n_even:]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over 64-bit hashes.
+
+    Membership tests never miss an added item; unseen items are reported
+    as present with probability about `error_rate` once `capacity` items
+    have been added. Memory is fixed up front at
+    -capacity * ln(error_rate) / ln(2)^2 bits.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        Args:
+            capacity (int): Expected number of distinct items
+            error_rate (float): Target false-positive rate at capacity
+        """
+        self.n_bits = max(64, int(-capacity * np.log(error_rate) / np.log(2) ** 2))
+        self.n_hashes = max(1, int(round(self.n_bits / capacity * np.log(2))))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes):
+        # Double hashing: h1 + i * h2 for i in range(n_hashes)
+        h1 = np.asarray(hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            h2 = (h1 ^ (h1 >> np.uint64(31))) * np.uint64(0x9E3779B97F4A7C15) | np.uint64(1)
+            steps = np.arange(self.n_hashes, dtype=np.uint64)
+            return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.n_bits)
+
+    def contains(self, hashes):
+        """Boolean array: True where the hash may have been added before."""
+        positions = self._positions(hashes)
+        bits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return bits.all(axis=1)
+
+    def add(self, hashes):
+        """Add an array of hashes."""
+        positions = self._positions(hashes).ravel()
+        masks = np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
@@ -2,20 +2,44 @@
 EO Analysis Package
 ------------------
 A comprehensive package for analyzing Earth Observation data
+
+Submodules are imported on first attribute access, so using only
+DataValidator or clean_time_series does not pull in xarray, scikit-learn,
+matplotlib, seaborn or folium.
 """
 
-from .eo_analysis import EODataAnalyzer
-from .utils.preprocessing import clean_time_series, process_satellite_data
-from .utils.visualization import EOVisualizer
-from .utils.validation import DataValidator
+import importlib
 
 __version__ = '0.1.0'
 __author__ = 'EcoFarmIQ Team'
 
+# Public name -> submodule that defines it
+_LAZY_ATTRS = {
+    'EODataAnalyzer': '.eo_analysis',
+    'clean_time_series': '.utils.preprocessing',
+    'process_satellite_data': '.utils.preprocessing',
+    'process_satellite_tiles': '.utils.windowed',
+    'EOVisualizer': '.utils.visualization',
+    'DataValidator': '.utils.validation'
+}
+
 __all__ = [
     'EODataAnalyzer',
     'clean_time_series',
     'process_satellite_data',
+    'process_satellite_tiles',
     'EOVisualizer',
     'DataValidator'
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
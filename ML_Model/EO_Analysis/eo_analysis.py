@@ -11,21 +11,24 @@ Key Features:
 - Weather forecast integration
 - Vegetation indices calculation
 - Soil moisture analysis
+
+scipy, scikit-learn, matplotlib and seaborn are imported inside the methods
+that use them, so importing this module stays cheap.
 """
 
+from __future__ import annotations
+
 import numpy as np
 import pandas as pd
-from scipy import stats
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import IsolationForest
 from datetime import datetime, timedelta
-import xarray as xr
-import rasterio
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List, Tuple, Optional, Union
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, Union
 import logging
 
+from .utils.spectral import dataset_indices
+
+if TYPE_CHECKING:
+    import xarray as xr
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -43,6 +46,8 @@ class EODataAnalyzer:
         Args:
             data_path (str): Path to the EO data directory
         """
+        from sklearn.preprocessing import StandardScaler
+
         self.data_path = data_path
         self.scaler = StandardScaler()
         self._initialize_analysis_components()
@@ -73,6 +78,8 @@ class TemperatureAnalyzer:
         Returns:
             Dictionary containing analysis results
         """
+        from scipy import stats
+
         try:
             # Resample and calculate statistics
             daily_stats = temp_data.resample(time_window).agg({
@@ -113,6 +120,8 @@ class TemperatureAnalyzer:
         Returns:
             Series indicating anomalous points
         """
+        from sklearn.ensemble import IsolationForest
+
         model = IsolationForest(contamination=contamination)
         return pd.Series(
             model.fit_predict(temp_data),
@@ -325,6 +334,8 @@ class ForecastAnalyzer:
         errors: pd.DataFrame
     ) -> Dict[str, float]:
         """Analyze systematic bias in forecasts"""
+        from scipy import stats
+
         return {
             'mean_bias': errors.mean(),
             'bias_std': errors.std(),
@@ -348,62 +359,12 @@ class VegetationAnalyzer:
             Dictionary containing calculated indices
         """
         try:
-            # Calculate NDVI
-            ndvi = self._calculate_ndvi(
-                satellite_data.nir,
-                satellite_data.red
-            )
-            
-            # Calculate EVI
-            evi = self._calculate_evi(
-                satellite_data.nir,
-                satellite_data.red,
-                satellite_data.blue
-            )
-            
-            # Calculate NDWI
-            ndwi = self._calculate_ndwi(
-                satellite_data.nir,
-                satellite_data.swir
-            )
-            
-            return {
-                'ndvi': ndvi,
-                'evi': evi,
-                'ndwi': ndwi
-            }
+            # NDVI, EVI and NDWI in one fused pass over the bands
+            indices = dataset_indices(satellite_data, ['NDVI', 'EVI', 'NDWI'])
+            return {name.lower(): index for name, index in indices.items()}
         except Exception as e:
             logger.error(f"Error in vegetation analysis: {str(e)}")
             raise
-    
-    def _calculate_ndvi(
-        self,
-        nir: xr.DataArray,
-        red: xr.DataArray
-    ) -> xr.DataArray:
-        """Calculate Normalized Difference Vegetation Index"""
-        return (nir - red) / (nir + red)
-    
-    def _calculate_evi(
-        self,
-        nir: xr.DataArray,
-        red: xr.DataArray,
-        blue: xr.DataArray,
-        L: float = 1,
-        C1: float = 6,
-        C2: float = 7.5,
-        G: float = 2.5
-    ) -> xr.DataArray:
-        """Calculate Enhanced Vegetation Index"""
-        return G * (nir - red) / (nir + C1 * red - C2 * blue + L)
-    
-    def _calculate_ndwi(
-        self,
-        nir: xr.DataArray,
-        swir: xr.DataArray
-    ) -> xr.DataArray:
-        """Calculate Normalized Difference Water Index"""
-        return (nir - swir) / (nir + swir)
 
 def create_visualization(
     analysis_results: Dict,
@@ -418,6 +379,8 @@ def create_visualization(
         output_path: Path to save visualizations
         plot_type: Type of plots to generate ('all' or specific type)
     """
+    import matplotlib.pyplot as plt
+
     try:
         plt.style.use('seaborn')
         
@@ -444,6 +407,9 @@ def _plot_temperature_analysis(temp_results: Dict) -> None:
     """Create temperature analysis plots"""
     if temp_results is None:
         return
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
         
     fig, axes = plt.subplots(2, 2, figsize=(15, 10))
     
@@ -2,15 +2,37 @@
 EO Analysis Utilities
 --------------------
 Utility modules for EO data analysis
+
+Submodules are imported on first attribute access.
 """
 
-from .preprocessing import clean_time_series, process_satellite_data
-from .visualization import EOVisualizer
-from .validation import DataValidator
+import importlib
+
+# Public name -> submodule that defines it
+_LAZY_ATTRS = {
+    'clean_time_series': '.preprocessing',
+    'process_satellite_data': '.preprocessing',
+    'process_satellite_tiles': '.windowed',
+    'EOVisualizer': '.visualization',
+    'DataValidator': '.validation'
+}
 
 __all__ = [
     'clean_time_series',
     'process_satellite_data',
+    'process_satellite_tiles',
     'EOVisualizer',
     'DataValidator'
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,16 +1,30 @@
 """
 Preprocessing utilities for EO data analysis
+
+pandas is imported inside the functions that need it, so the satellite
+helpers load nothing heavier than NumPy.
 """
 
+from __future__ import annotations
+
 import numpy as np
-import pandas as pd
-import xarray as xr
-from typing import Union, Dict, List, Optional
+from typing import TYPE_CHECKING, Union, Dict, List, Optional
 from datetime import datetime, timedelta
 import logging
 
+if TYPE_CHECKING:
+    import pandas as pd
+    import xarray as xr
+
 logger = logging.getLogger(__name__)
 
+# Dark object subtraction takes this quantile of each band as its dark value
+DARK_OBJECT_QUANTILE = 0.01
+
+# Histogram bins and chunk size used to estimate the dark values
+DOS_HISTOGRAM_BINS = 4096
+DOS_CHUNK_SIZE = 1 << 20
+
 def clean_time_series(
     data: pd.DataFrame,
     timestamp_col: str = 'timestamp',
@@ -31,6 +45,8 @@ def clean_time_series(
     Returns:
         Cleaned DataFrame
     """
+    import pandas as pd
+
     try:
         # Convert timestamp to datetime if needed
         if not pd.api.types.is_datetime64_any_dtype(data[timestamp_col]):
@@ -66,6 +82,7 @@ def handle_missing_values(
     interpolation_method: str
 ) -> pd.DataFrame:
     """Handle missing values in time series data"""
+    import pandas as pd
     
     # Create regular time index
     full_index = pd.date_range(
@@ -113,15 +130,22 @@ def remove_outliers(
 def process_satellite_data(
     data: xr.Dataset,
     cloud_mask: Optional[xr.DataArray] = None,
-    resolution: Optional[float] = None
+    resolution: Optional[float] = None,
+    dark_values: Optional[Dict[str, float]] = None
 ) -> xr.Dataset:
     """
     Process satellite imagery data
     
+    The whole Dataset is held in memory; for scenes that do not fit, use
+    process_satellite_tiles (utils.windowed), which runs the same chain
+    tile by tile from raster files.
+    
     Args:
         data: Input xarray Dataset
         cloud_mask: Cloud mask array
         resolution: Target resolution in meters
+        dark_values: Per-band dark values for the atmospheric correction
+            (default: estimated from the data)
         
     Returns:
         Processed Dataset
@@ -136,7 +160,7 @@ def process_satellite_data(
             data = resample_satellite_data(data, resolution)
         
         # Apply atmospheric correction
-        data = apply_atmospheric_correction(data)
+        data = apply_atmospheric_correction(data, dark_values)
         
         return data
         
@@ -149,6 +173,7 @@ def resample_satellite_data(
     target_resolution: float
 ) -> xr.Dataset:
     """Resample satellite data to target resolution"""
+    from rasterio.enums import Resampling
     
     # Calculate resampling factor
     current_res = data.rio.resolution()[0]
@@ -158,26 +183,143 @@ def resample_satellite_data(
     data = data.rio.reproject(
         data.rio.crs,
         resolution=target_resolution,
-        resampling=rasterio.enums.Resampling.bilinear
+        resampling=Resampling.bilinear
     )
     
     return data
 
-def apply_atmospheric_correction(
-    data: xr.Dataset
-) -> xr.Dataset:
-    """Apply basic atmospheric correction to satellite data"""
+def estimate_dark_values(
+    data: xr.Dataset,
+    quantile: float = DARK_OBJECT_QUANTILE,
+    bins: int = DOS_HISTOGRAM_BINS,
+    chunk_size: int = DOS_CHUNK_SIZE
+) -> Dict[str, float]:
+    """
+    Estimate the dark-object value (a low quantile) of every band
+    
+    Bands are never sorted or copied whole; each is read in chunks, so
+    temporaries stay chunk-sized. 8- and 16-bit integer bands (e.g. raw
+    Sentinel-2 digital numbers) get an exact histogram of their values in
+    one sweep. Other bands take two sweeps, one for the value range and one
+    for a fixed-bin histogram over it, and the quantile is interpolated
+    inside its bin, so the error is at most one bin width,
+    (max - min) / bins. NaNs are ignored.
     
-    # Simple Dark Object Subtraction (DOS)
+    Args:
+        data: Input Dataset
+        quantile: Quantile taken as the dark value
+        bins: Histogram bins per float band
+        chunk_size: Pixels per band processed at a time
+        
+    Returns:
+        Dictionary of band name -> dark value (NaN for an all-NaN band)
+    """
+    dark_values = {}
     for band in data.data_vars:
-        # Find darkest pixel value
-        dark_value = float(data[band].quantile(0.01))
+        values = np.asarray(data[band].values).reshape(-1)
+        chunks = range(0, len(values), chunk_size)
+        
+        if values.dtype.kind in 'ui' and values.dtype.itemsize <= 2:
+            # Exact: one count per possible value
+            offset = int(np.iinfo(values.dtype).min)
+            counts = np.zeros(1 << (8 * values.dtype.itemsize), dtype=np.int64)
+            for start in chunks:
+                chunk = values[start:start + chunk_size].astype(np.int32) - offset
+                counts += np.bincount(chunk, minlength=len(counts))
+            dark_values[band] = _histogram_quantile(counts, quantile, offset, 1.0, exact=True)
+            continue
         
-        # Subtract dark value
-        data[band] = data[band] - dark_value
+        # Sweep 1: value range and number of valid pixels
+        low, high, count = np.inf, -np.inf, 0
+        for start in chunks:
+            chunk = values[start:start + chunk_size]
+            valid = len(chunk) - int(np.count_nonzero(np.isnan(chunk))) if values.dtype.kind == 'f' else len(chunk)
+            if valid:
+                low = min(low, float(np.nanmin(chunk)))
+                high = max(high, float(np.nanmax(chunk)))
+                count += valid
+        if count == 0 or high == low:
+            dark_values[band] = float('nan') if count == 0 else low
+            continue
         
-        # Clip negative values
-        data[band] = data[band].clip(min=0)
+        # Sweep 2: fixed-bin histogram over the range; NaNs only masked if present
+        has_nan = count < len(values)
+        scale = bins / (high - low)
+        counts = np.zeros(bins, dtype=np.int64)
+        for start in chunks:
+            chunk = values[start:start + chunk_size]
+            if has_nan:
+                chunk = chunk[~np.isnan(chunk)]
+            index = ((chunk - low) * scale).astype(np.intp)
+            np.minimum(index, bins - 1, out=index)
+            counts += np.bincount(index, minlength=bins)
+        dark_values[band] = _histogram_quantile(counts, quantile, low, (high - low) / bins)
+    
+    return dark_values
+
+def _histogram_quantile(
+    counts: np.ndarray,
+    quantile: float,
+    low: float,
+    width: float,
+    exact: bool = False
+) -> float:
+    """
+    Quantile from histogram counts of bins [low + i * width, low + (i + 1) * width)
+    
+    With exact=True every bin holds a single integer value and the result
+    matches np.quantile's linear interpolation.
+    """
+    total = int(counts.sum())
+    if total == 0:
+        return float('nan')
+    rank = quantile * (total - 1)
+    cumulative = np.cumsum(counts)
+    if exact:
+        i = int(np.floor(rank))
+        lower = int(np.searchsorted(cumulative, i, side='right'))
+        upper = int(np.searchsorted(cumulative, min(i + 1, total - 1), side='right'))
+        return float(low + lower + (rank - i) * (upper - lower))
+    b = int(np.searchsorted(cumulative, rank, side='right'))
+    below = cumulative[b - 1] if b else 0
+    fraction = (rank - below + 0.5) / counts[b]
+    return float(min(low + (b + fraction) * width, low + len(counts) * width))
+
+def apply_atmospheric_correction(
+    data: xr.Dataset,
+    dark_values: Optional[Dict[str, float]] = None
+) -> xr.Dataset:
+    """
+    Apply basic atmospheric correction to satellite data
+    
+    Simple Dark Object Subtraction (DOS): each band's dark value (its 1%
+    quantile, estimated by estimate_dark_values) is subtracted and negative
+    values are clipped to 0. Each band is written once into a new array
+    (float32 for integer bands) that replaces the band in `data`, so the
+    Dataset passed in is updated but the arrays it held, which the caller
+    may share, are left untouched. Lazy bands are loaded. The value used is
+    stored in each band's attrs['dark_value'].
+    
+    Args:
+        data: Input Dataset
+        dark_values: Band name -> dark value to use instead of estimating
+            it, e.g. cached from another scene of the same acquisition
+            
+    Returns:
+        Corrected Dataset (the same object as `data`)
+    """
+    estimated = [band for band in data.data_vars if dark_values is None or band not in dark_values]
+    dark_values = {**(dark_values or {}), **(estimate_dark_values(data[estimated]) if estimated else {})}
+    
+    for band in list(data.data_vars):
+        source = np.asarray(data[band].values)
+        dtype = source.dtype if np.issubdtype(source.dtype, np.floating) else np.float32
+        values = np.empty(source.shape, dtype=dtype)
+        np.subtract(source, dark_values[band], out=values, casting='unsafe')
+        np.maximum(values, 0, out=values)
+        corrected = data[band].copy(data=values)
+        corrected.attrs['dark_value'] = dark_values[band]
+        data[band] = corrected
     
     return data
 
@@ -188,28 +330,21 @@ def calculate_indices(
     """
     Calculate various spectral indices
     
+    All requested indices are computed together in one tiled float32 pass
+    by the fused engine in utils.spectral; pixels with a zero denominator
+    are NaN.
+    
     Args:
         data: Input Dataset with spectral bands
-        indices: List of indices to calculate
+        indices: List of indices to calculate (NDVI, EVI, NDWI)
         
     Returns:
         Dictionary of calculated indices
     """
-    results = {}
-    
-    for index in indices:
-        if index.upper() == 'NDVI':
-            results['NDVI'] = (data.nir - data.red) / (data.nir + data.red)
-            
-        elif index.upper() == 'EVI':
-            results['EVI'] = 2.5 * (data.nir - data.red) / (
-                data.nir + 6 * data.red - 7.5 * data.blue + 1
-            )
-            
-        elif index.upper() == 'NDWI':
-            results['NDWI'] = (data.nir - data.swir) / (data.nir + data.swir)
-    
-    return results
+    from .spectral import INDEX_BANDS, dataset_indices
+
+    # Names other than the supported indices are ignored, as before
+    return dataset_indices(data, [index for index in indices if index.upper() in INDEX_BANDS])
 
 def validate_data_format(
     data: Union[pd.DataFrame, xr.Dataset],
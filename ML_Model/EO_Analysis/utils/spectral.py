@@ -0,0 +1,158 @@
+"""
+Fused spectral index engine
+---------------------------
+Computes any set of NDVI, EVI and NDWI in a single pass over the bands.
+
+The bands are walked in tiles. Each tile is converted to float32 once,
+terms shared between indices (e.g. nir - red for NDVI and EVI) are computed
+once into small scratch buffers with ufunc ``out=`` arguments, and results
+are written straight into preallocated float32 outputs. Apart from the
+outputs, extra memory is a few tile-sized buffers rather than several
+full-scene temporaries per index. Pixels whose denominator is zero are NaN.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+# Index name -> bands it reads
+INDEX_BANDS = {
+    'NDVI': ('nir', 'red'),
+    'EVI': ('nir', 'red', 'blue'),
+    'NDWI': ('nir', 'swir')
+}
+
+# EVI = G * (nir - red) / (nir + C1 * red - C2 * blue + L)
+EVI_COEFFICIENTS = {'G': 2.5, 'C1': 6.0, 'C2': 7.5, 'L': 1.0}
+
+# Pixels per tile: 2**18 float32 values is 1 MiB per scratch buffer
+TILE_SIZE = 1 << 18
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray, out: np.ndarray) -> None:
+    """out = numerator / denominator, NaN where the denominator is zero"""
+    out.fill(np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+
+
+def compute_indices(
+    bands: Dict[str, np.ndarray],
+    indices: Iterable[str] = ('NDVI', 'EVI', 'NDWI'),
+    tile_size: int = TILE_SIZE,
+    out: Optional[Dict[str, np.ndarray]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate spectral indices in one tiled pass over the bands
+
+    Args:
+        bands: Band name ('nir', 'red', 'blue', 'swir') -> array; all bands
+            must have the same shape. Only the bands the requested indices
+            use are read.
+        indices: Index names (case-insensitive) from INDEX_BANDS
+        tile_size: Pixels processed per tile
+        out: Optional preallocated float32 output arrays, keyed by index name
+
+    Returns:
+        Dictionary of upper-case index name -> float32 array
+    """
+    names = list(dict.fromkeys(index.upper() for index in indices))
+    if not names:
+        return dict(out or {})
+    unknown = [name for name in names if name not in INDEX_BANDS]
+    if unknown:
+        raise ValueError(f"Unknown spectral indices: {unknown}")
+    needed = sorted({band for name in names for band in INDEX_BANDS[name]})
+    missing = [band for band in needed if band not in bands]
+    if missing:
+        raise ValueError(f"Missing required bands: {missing}")
+
+    shape = np.shape(bands[needed[0]])
+    if any(np.shape(bands[band]) != shape for band in needed):
+        raise ValueError(f"Bands must share one shape, got {[np.shape(bands[b]) for b in needed]}")
+
+    out = dict(out or {})
+    for name in names:
+        if name not in out:
+            out[name] = np.empty(shape, dtype=np.float32)
+        elif out[name].shape != shape or out[name].dtype != np.float32 or not out[name].flags.c_contiguous:
+            raise ValueError(f"Output for {name} must be a contiguous float32 array of shape {shape}")
+
+    # Flat views; reshape only copies bands that are not contiguous
+    flat_bands = {band: np.asarray(bands[band]).reshape(-1) for band in needed}
+    flat_out = {name: out[name].reshape(-1) for name in names}
+    size = int(np.prod(shape))
+    tile_size = max(1, min(tile_size, size))
+
+    scratch = {band: np.empty(tile_size, dtype=np.float32) for band in needed}
+    diff = np.empty(tile_size, dtype=np.float32)
+    denom = np.empty(tile_size, dtype=np.float32)
+    term = np.empty(tile_size, dtype=np.float32)
+    G, C1, C2, L = (EVI_COEFFICIENTS[key] for key in ('G', 'C1', 'C2', 'L'))
+
+    for start in range(0, size, tile_size):
+        stop = min(start + tile_size, size)
+        n = stop - start
+        tile = {}
+        for band in needed:
+            tile[band] = scratch[band][:n]
+            tile[band][...] = flat_bands[band][start:stop]
+        d, s, t = diff[:n], denom[:n], term[:n]
+
+        if 'NDVI' in names or 'EVI' in names:
+            np.subtract(tile['nir'], tile['red'], out=d)
+        if 'NDVI' in names:
+            np.add(tile['nir'], tile['red'], out=s)
+            _safe_divide(d, s, flat_out['NDVI'][start:stop])
+        if 'EVI' in names:
+            np.multiply(tile['red'], C1, out=s)
+            s += tile['nir']
+            np.multiply(tile['blue'], C2, out=t)
+            s -= t
+            s += L
+            d *= G
+            _safe_divide(d, s, flat_out['EVI'][start:stop])
+        if 'NDWI' in names:
+            np.subtract(tile['nir'], tile['swir'], out=d)
+            np.add(tile['nir'], tile['swir'], out=s)
+            _safe_divide(d, s, flat_out['NDWI'][start:stop])
+
+    return out
+
+
+def dataset_indices(
+    data: xr.Dataset,
+    indices: Iterable[str] = ('NDVI', 'EVI', 'NDWI')
+) -> Dict[str, xr.DataArray]:
+    """
+    Calculate spectral indices for an xarray Dataset with compute_indices
+
+    Args:
+        data: Dataset with the spectral bands as variables on one grid
+        indices: Index names (case-insensitive) from INDEX_BANDS
+
+    Returns:
+        Dictionary of upper-case index name -> float32 DataArray with the
+        bands' dimensions and coordinates
+    """
+    import xarray as xr
+
+    names = [index.upper() for index in indices]
+    if not names:
+        return {}
+    needed = sorted({band for name in names if name in INDEX_BANDS for band in INDEX_BANDS[name]})
+    missing = [band for band in needed if band not in data.data_vars]
+    if missing:
+        raise ValueError(f"Missing required bands: {missing}")
+
+    template = data[needed[0]]
+    # Bring every band onto the template's dimension order
+    bands = {band: data[band].transpose(*template.dims).values for band in needed}
+    values = compute_indices(bands, names)
+    return {
+        name: xr.DataArray(array, coords=template.coords, dims=template.dims, name=name)
+        for name, array in values.items()
+    }
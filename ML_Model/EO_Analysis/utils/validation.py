@@ -1,16 +1,128 @@
 """
 Validation utilities for EO data analysis
+
+NumPy and pandas are imported inside the methods that need them, so
+importing the validator loads neither.
 """
 
-import numpy as np
-import pandas as pd
-import xarray as xr
-from typing import Dict, List, Optional, Union
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 from datetime import datetime, timedelta
 import logging
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import xarray as xr
+
 logger = logging.getLogger(__name__)
 
+# Declarative sensor validation rules. Each column lists its required dtype
+# ('datetime' or 'numeric') and optional checks: 'range' names the
+# DataValidator attribute holding the (min, max) limits, 'nonnegative'
+# reports negative values separately and 'unique' flags repeated values.
+VALIDATION_RULES = {
+    'temperature': {
+        'label': 'Temperature',
+        'columns': {
+            'timestamp': {'dtype': 'datetime', 'unique': True},
+            'temperature': {'dtype': 'numeric', 'range': 'temperature_range'}
+        }
+    },
+    'humidity': {
+        'label': 'Humidity',
+        'columns': {
+            'timestamp': {'dtype': 'datetime'},
+            'relative_humidity': {'dtype': 'numeric', 'range': 'humidity_range'}
+        }
+    },
+    'rainfall': {
+        'label': 'Rainfall',
+        'columns': {
+            'timestamp': {'dtype': 'datetime'},
+            'precipitation': {'dtype': 'numeric', 'range': 'rainfall_range', 'nonnegative': True}
+        }
+    }
+}
+
+# Order in which value checks are reported
+CHECK_ORDER = ('range', 'negative', 'duplicate')
+
+# Rows per chunk of a validation pass: small enough for the masks to stay in cache
+VALIDATION_CHUNK_SIZE = 1 << 16
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    """Values of a numeric column as a NumPy array, NaN for missing values"""
+    import numpy as np
+
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _range_violations(
+    values: np.ndarray,
+    low: float,
+    high: float,
+    below: Optional[float] = None,
+    chunk_size: int = VALIDATION_CHUNK_SIZE
+) -> tuple:
+    """
+    Positions of values outside [low, high] in one chunked pass; NaN is not
+    flagged. If below is given, positions of values under it are collected
+    in the same pass (otherwise None is returned for them).
+    """
+    import numpy as np
+
+    n = len(values)
+    size = max(1, min(chunk_size, n))
+    outside = np.empty(size, dtype=bool)
+    scratch = np.empty(size, dtype=bool)
+    hits, below_hits = [], []
+    for start in range(0, n, size):
+        chunk = values[start:start + size]
+        m, t = outside[:len(chunk)], scratch[:len(chunk)]
+        np.less(chunk, low, out=m)
+        np.greater(chunk, high, out=t)
+        m |= t
+        hits.append(np.flatnonzero(m) + start)
+        if below is not None:
+            np.less(chunk, below, out=t)
+            below_hits.append(np.flatnonzero(t) + start)
+    empty = np.empty(0, dtype=np.intp)
+    return (
+        np.concatenate(hits) if hits else empty,
+        (np.concatenate(below_hits) if below_hits else empty) if below is not None else None
+    )
+
+
+def _duplicate_positions(series: pd.Series, chunk_size: int = VALIDATION_CHUNK_SIZE) -> np.ndarray:
+    """
+    Positions of repeated values after their first occurrence, as
+    series.duplicated() marks them
+
+    Datetime columns that are already sorted (the usual case for sensor
+    logs) are checked by comparing neighbours in one pass; anything else
+    falls back to a hash-based pass.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = np.asarray(series.values).view(np.int64)
+        hits = []
+        for start in range(0, max(len(values) - 1, 0), chunk_size):
+            chunk = values[start:start + chunk_size + 1]
+            if (chunk[1:] < chunk[:-1]).any():
+                break
+            hits.append(np.flatnonzero(chunk[1:] == chunk[:-1]) + start + 1)
+        else:
+            return np.concatenate(hits) if hits else np.empty(0, dtype=np.intp)
+    return np.flatnonzero(pd.Index(series).duplicated())
+
+
 class DataValidator:
     """Class for validating EO data"""
     
@@ -29,130 +141,125 @@ class DataValidator:
             'water': ['nir', 'swir']
         }
     
-    def validate_temperature_data(
+    def validate_sensor_data(
         self,
         data: pd.DataFrame,
+        data_type: str,
         strict: bool = True
-    ) -> Dict[str, Union[bool, List[str]]]:
+    ) -> Dict[str, Union[bool, List[str], Dict[str, Union[int, np.ndarray]]]]:
         """
-        Validate temperature data
+        Validate sensor data against the rules in VALIDATION_RULES
+        
+        The rules of the data type are compiled into one chunked NumPy pass
+        per column: range and sign checks share a pass over the values, and
+        duplicate timestamps are found in one pass over a sorted column
+        (with a hash-based fallback when it is unsorted). No filtered
+        DataFrame copies are built.
         
         Args:
             data: Input DataFrame
+            data_type: Key of VALIDATION_RULES ('temperature', 'humidity'
+                or 'rainfall')
             strict: Whether to raise errors or return warnings
             
         Returns:
-            Dictionary with validation results
+            Dictionary with validation results; 'counts' and 'offending'
+            map each failed check ('<column>:<check>') to the number of
+            offending rows and their positional indices
         """
+        import pandas as pd
+
         try:
+            rules = VALIDATION_RULES[data_type]
             issues = []
+            value_issues = []
+            counts = {}
+            offending = {}
             
-            # Check required columns
-            missing_cols = self._check_required_columns(
-                data,
-                self.required_columns['temperature']
-            )
+            missing_cols = self._check_required_columns(data, self.required_columns[data_type])
             if missing_cols:
-                msg = f"Missing columns: {missing_cols}"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            # Check data types
-            if not pd.api.types.is_datetime64_any_dtype(data['timestamp']):
-                msg = "timestamp column must be datetime type"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            if not pd.api.types.is_numeric_dtype(data['temperature']):
-                msg = "temperature column must be numeric type"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            # Check value ranges
-            temp_range = self.temperature_range
-            invalid_temps = data[
-                (data['temperature'] < temp_range[0]) |
-                (data['temperature'] > temp_range[1])
-            ]
-            if not invalid_temps.empty:
-                msg = f"Temperature values outside valid range {temp_range}"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            # Check for duplicates
-            duplicates = data[data.duplicated(['timestamp'])]
-            if not duplicates.empty:
-                msg = "Duplicate timestamps found"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
+                issues.append(f"Missing columns: {missing_cols}")
+            
+            for column, rule in rules['columns'].items():
+                if column not in data.columns:
+                    continue
+                series = data[column]
+                
+                if rule['dtype'] == 'datetime':
+                    if not pd.api.types.is_datetime64_any_dtype(series):
+                        issues.append(f"{column} column must be datetime type")
+                elif not pd.api.types.is_numeric_dtype(series):
+                    issues.append(f"{column} column must be numeric type")
+                    continue
+                
+                found = {}
+                if 'range' in rule:
+                    low, high = getattr(self, rule['range'])
+                    values = _numeric_values(series)
+                    below_zero = 0 if rule.get('nonnegative') and low < 0 else None
+                    found['range'], negative = _range_violations(values, low, high, below=below_zero)
+                    if rule.get('nonnegative'):
+                        # Negatives are a subset of the range violations when low >= 0
+                        if negative is None:
+                            negative = found['range'][values[found['range']] < 0]
+                        found['negative'] = negative
+                if rule.get('unique'):
+                    found['duplicate'] = _duplicate_positions(series)
+                
+                for check, positions in found.items():
+                    if len(positions):
+                        key = f"{column}:{check}"
+                        counts[key] = len(positions)
+                        offending[key] = positions
+                        if check == 'range':
+                            msg = f"{rules['label']} values outside valid range {getattr(self, rule['range'])}"
+                        elif check == 'negative':
+                            msg = f"Negative {rules['label'].lower()} values found"
+                        else:
+                            msg = f"Duplicate {column}s found"
+                        value_issues.append((CHECK_ORDER.index(check), msg))
+            
+            # Type issues first, then value issues in check order
+            issues.extend(msg for _, msg in sorted(value_issues, key=lambda issue: issue[0]))
+            
+            if strict and issues:
+                raise ValueError("; ".join(issues))
             
             return {
                 'valid': len(issues) == 0,
-                'issues': issues
+                'issues': issues,
+                'counts': counts,
+                'offending': offending
             }
             
         except Exception as e:
-            logger.error(f"Error in temperature validation: {str(e)}")
+            logger.error(f"Error in {data_type} validation: {str(e)}")
             raise
     
+    def validate_temperature_data(
+        self,
+        data: pd.DataFrame,
+        strict: bool = True
+    ) -> Dict[str, Union[bool, List[str]]]:
+        """
+        Validate temperature data
+        
+        Args:
+            data: Input DataFrame
+            strict: Whether to raise errors or return warnings
+            
+        Returns:
+            Dictionary with validation results (see validate_sensor_data)
+        """
+        return self.validate_sensor_data(data, 'temperature', strict)
+    
     def validate_humidity_data(
         self,
         data: pd.DataFrame,
         strict: bool = True
     ) -> Dict[str, Union[bool, List[str]]]:
         """Validate humidity data"""
-        try:
-            issues = []
-            
-            # Check required columns
-            missing_cols = self._check_required_columns(
-                data,
-                self.required_columns['humidity']
-            )
-            if missing_cols:
-                msg = f"Missing columns: {missing_cols}"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            # Check data types
-            if not pd.api.types.is_datetime64_any_dtype(data['timestamp']):
-                msg = "timestamp column must be datetime type"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            if not pd.api.types.is_numeric_dtype(data['relative_humidity']):
-                msg = "relative_humidity column must be numeric type"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            # Check value ranges
-            humidity_range = self.humidity_range
-            invalid_humidity = data[
-                (data['relative_humidity'] < humidity_range[0]) |
-                (data['relative_humidity'] > humidity_range[1])
-            ]
-            if not invalid_humidity.empty:
-                msg = f"Humidity values outside valid range {humidity_range}"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            return {
-                'valid': len(issues) == 0,
-                'issues': issues
-            }
-            
-        except Exception as e:
-            logger.error(f"Error in humidity validation: {str(e)}")
-            raise
+        return self.validate_sensor_data(data, 'humidity', strict)
     
     def validate_rainfall_data(
         self,
@@ -160,61 +267,7 @@ class DataValidator:
         strict: bool = True
     ) -> Dict[str, Union[bool, List[str]]]:
         """Validate rainfall data"""
-        try:
-            issues = []
-            
-            # Check required columns
-            missing_cols = self._check_required_columns(
-                data,
-                self.required_columns['rainfall']
-            )
-            if missing_cols:
-                msg = f"Missing columns: {missing_cols}"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            # Check data types
-            if not pd.api.types.is_datetime64_any_dtype(data['timestamp']):
-                msg = "timestamp column must be datetime type"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            if not pd.api.types.is_numeric_dtype(data['precipitation']):
-                msg = "precipitation column must be numeric type"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            # Check value ranges
-            rainfall_range = self.rainfall_range
-            invalid_rainfall = data[
-                (data['precipitation'] < rainfall_range[0]) |
-                (data['precipitation'] > rainfall_range[1])
-            ]
-            if not invalid_rainfall.empty:
-                msg = f"Rainfall values outside valid range {rainfall_range}"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            # Check for negative values
-            negative_rainfall = data[data['precipitation'] < 0]
-            if not negative_rainfall.empty:
-                msg = "Negative rainfall values found"
-                if strict:
-                    raise ValueError(msg)
-                issues.append(msg)
-            
-            return {
-                'valid': len(issues) == 0,
-                'issues': issues
-            }
-            
-        except Exception as e:
-            logger.error(f"Error in rainfall validation: {str(e)}")
-            raise
+        return self.validate_sensor_data(data, 'rainfall', strict)
     
     def validate_satellite_data(
         self,
@@ -223,6 +276,8 @@ class DataValidator:
         strict: bool = True
     ) -> Dict[str, Union[bool, List[str]]]:
         """Validate satellite data"""
+        import numpy as np
+
         try:
             issues = []
             
@@ -303,6 +358,8 @@ class DataValidator:
         Returns:
             Dictionary with validation results
         """
+        import pandas as pd
+
         try:
             issues = []
             
@@ -345,40 +402,51 @@ class DataValidator:
     def validate_spatial_consistency(
         self,
         data: xr.Dataset,
-        max_gap_pixels: int = 10
+        max_gap_pixels: int = 10,
+        tile_rows: Optional[int] = None
     ) -> Dict[str, Union[bool, List[Dict]]]:
         """
         Validate spatial consistency of satellite data
         
+        NaN regions of all bands with the same shape are labelled in one
+        batch; region sizes come from a single bincount over the labels
+        and bounding boxes from ndimage.find_objects, so the cost is linear
+        in the number of pixels however many gaps there are. Bands are read
+        in strips of rows, and regions that cross strip boundaries are
+        joined, so dask-chunked rasters are never loaded whole. Region
+        sizes and boxes do not depend on the strip size; for bands with
+        more than two dimensions the region_id numbering may.
+        
         Args:
             data: Input Dataset
             max_gap_pixels: Maximum allowed gap in pixels
+            tile_rows: Rows read per strip (default: the band's chunk size
+                along y if it is chunked, otherwise the whole band)
             
         Returns:
-            Dictionary with validation results
+            Dictionary with validation results; each issue's 'bbox' maps
+            the band's dimensions to [start, stop) pixel ranges
         """
         try:
             issues = []
             
-            # Check for gaps in spatial coverage
+            # Bands with the same dimensions and shape are labelled together
+            groups = {}
             for band in data.data_vars:
-                # Find contiguous regions of NaN
-                nan_regions = np.isnan(data[band])
-                if nan_regions.any():
-                    from scipy import ndimage
-                    
-                    # Label connected components of NaN regions
-                    labeled, num_features = ndimage.label(nan_regions)
-                    
-                    # Check size of each NaN region
-                    for region_id in range(1, num_features + 1):
-                        region_size = (labeled == region_id).sum()
+                key = (data[band].dims, data[band].shape)
+                groups.setdefault(key, []).append(band)
+            
+            for (dims, shape), bands in groups.items():
+                regions = self._label_nan_regions(data, bands, tile_rows)
+                for band, band_regions in zip(bands, regions):
+                    for region_id, (region_size, bbox) in enumerate(band_regions, 1):
                         if region_size > max_gap_pixels:
                             issues.append({
                                 'type': 'large_spatial_gap',
                                 'band': band,
                                 'region_id': region_id,
-                                'size_pixels': int(region_size)
+                                'size_pixels': int(region_size),
+                                'bbox': {dim: [int(start), int(stop)] for dim, (start, stop) in zip(dims, bbox)}
                             })
             
             return {
@@ -388,4 +456,98 @@ class DataValidator:
             
         except Exception as e:
             logger.error(f"Error in spatial consistency validation: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+    
+    def _label_nan_regions(
+        self,
+        data: xr.Dataset,
+        bands: List[str],
+        tile_rows: Optional[int] = None
+    ) -> List[List[tuple]]:
+        """
+        Connected NaN regions of bands that share one shape
+        
+        The bands' NaN masks are stacked and labelled in one call, with a
+        structure that connects pixels within a band only. Strips of rows
+        are labelled one at a time; regions touching across a strip
+        boundary are merged with a union-find over the boundary labels.
+        
+        Returns:
+            Per band, a list of (size, bbox) in region order, where bbox is
+            one (start, stop) pair per band dimension
+        """
+        import numpy as np
+        from scipy import ndimage
+        
+        template = data[bands[0]]
+        ndim = template.ndim
+        if ndim == 0:
+            return [[(1, ())] if np.isnan(data[band].values) else [] for band in bands]
+        
+        # Same connectivity as labelling each band alone, never across bands
+        structure = np.zeros((3,) * (ndim + 1), dtype=bool)
+        structure[1] = ndimage.generate_binary_structure(ndim, 1)
+        
+        row_axis = max(ndim - 2, 0)
+        n_rows = template.shape[row_axis]
+        if tile_rows is None:
+            chunks = template.chunks
+            tile_rows = chunks[row_axis][0] if chunks else n_rows
+        tile_rows = max(1, tile_rows)
+        
+        parent = [0]
+        sizes = [0]
+        boxes = [np.zeros((ndim + 1, 2), dtype=np.int64)]
+        
+        def find(label):
+            while parent[label] != label:
+                parent[label] = parent[parent[label]]
+                label = parent[label]
+            return label
+        
+        previous_edge = None
+        for row_start in range(0, n_rows, tile_rows):
+            row_stop = min(row_start + tile_rows, n_rows)
+            window = [slice(None)] * ndim
+            window[row_axis] = slice(row_start, row_stop)
+            mask = np.stack([np.isnan(np.asarray(data[band][tuple(window)].values)) for band in bands])
+            
+            labeled, num_features = ndimage.label(mask, structure)
+            offset = len(parent) - 1
+            if num_features:
+                region_sizes = np.bincount(labeled.ravel(), minlength=num_features + 1)[1:]
+                for i, region in enumerate(ndimage.find_objects(labeled)):
+                    bbox = np.array([[s.start, s.stop] for s in region], dtype=np.int64)
+                    bbox[row_axis + 1] += row_start
+                    parent.append(offset + i + 1)
+                    sizes.append(int(region_sizes[i]))
+                    boxes.append(bbox)
+                if offset:
+                    np.add(labeled, offset, out=labeled, where=labeled > 0)
+            
+            # Join regions that touch across the boundary with the previous strip
+            first_row = np.take(labeled, 0, axis=row_axis + 1)
+            if previous_edge is not None:
+                touching = (previous_edge > 0) & (first_row > 0)
+                for a, b in set(zip(previous_edge[touching].tolist(), first_row[touching].tolist())):
+                    root_a, root_b = find(a), find(b)
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+            previous_edge = np.take(labeled, -1, axis=row_axis + 1)
+        
+        # Merge sizes and boxes into each region's root (its first label)
+        regions = [[] for _ in bands]
+        merged = {}
+        for label in range(1, len(parent)):
+            root = find(label)
+            if root in merged:
+                size, bbox = merged[root]
+                bbox[:, 0] = np.minimum(bbox[:, 0], boxes[label][:, 0])
+                bbox[:, 1] = np.maximum(bbox[:, 1], boxes[label][:, 1])
+                merged[root] = (size + sizes[label], bbox)
+            else:
+                merged[root] = (sizes[label], boxes[label].copy())
+        for root in sorted(merged):
+            size, bbox = merged[root]
+            regions[int(bbox[0, 0])].append((size, tuple(map(tuple, bbox[1:]))))
+        return regions
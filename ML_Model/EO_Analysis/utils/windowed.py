@@ -0,0 +1,431 @@
+"""
+Windowed satellite processing
+-----------------------------
+Out-of-core counterpart of process_satellite_data for scenes that do not
+fit in memory.
+
+The scene is read from single-band rasters (e.g. Sentinel-2 band files)
+with rasterio, one output window at a time. For every tile the chain is
+cloud mask -> NaN-aware resample -> dark object subtraction -> spectral
+indices, run
+in a process pool, and each finished tile is written straight into a tiled
+GeoTIFF or a Zarr store. Dark object subtraction needs a scene-wide dark
+value per band, so a first pass over the tiles collects a strided sample
+of each band (skipped when the dark values are passed in, e.g. cached from
+an earlier scene of the same acquisition).
+
+rasterio is required; zarr only for Zarr output. Both are imported when
+used.
+"""
+
+from __future__ import annotations
+
+import os
+import logging
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .spectral import INDEX_BANDS, compute_indices
+from .preprocessing import DARK_OBJECT_QUANTILE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TILE_SIZE = 1024
+
+# Pixels per band sampled to estimate the dark values
+DARK_SAMPLE_SIZE = 1_000_000
+
+# (row_off, col_off, height, width) in the output grid
+Window = Tuple[int, int, int, int]
+
+# Raster handles opened once per worker process
+_sources = {}
+
+
+def correct_tile(
+    bands: Dict[str, np.ndarray],
+    dark_values: Dict[str, float]
+) -> Dict[str, np.ndarray]:
+    """
+    Dark object subtraction on one tile, in place
+
+    Args:
+        bands: Band name -> float32 tile; NaN pixels stay NaN
+        dark_values: Band name -> value subtracted before clipping at 0
+
+    Returns:
+        The same dictionary of corrected tiles
+    """
+    for band, values in bands.items():
+        values -= np.float32(dark_values.get(band, 0.0))
+        np.maximum(values, 0, out=values)
+    return bands
+
+
+def tile_windows(width: int, height: int, tile_size: int) -> List[Window]:
+    """Row-major windows of at most tile_size x tile_size covering a grid"""
+    return [
+        (row, col, min(tile_size, height - row), min(tile_size, width - col))
+        for row in range(0, height, tile_size)
+        for col in range(0, width, tile_size)
+    ]
+
+
+def _open_sources(band_paths: Dict[str, str], mask_path: Optional[str]) -> None:
+    import rasterio
+
+    _close_sources()
+    _sources['bands'] = {band: rasterio.open(path) for band, path in band_paths.items()}
+    _sources['mask'] = rasterio.open(mask_path) if mask_path else None
+
+
+def _close_sources() -> None:
+    for handle in _sources.pop('bands', {}).values():
+        handle.close()
+    mask = _sources.pop('mask', None)
+    if mask is not None:
+        mask.close()
+
+
+def _target_grid(reference, resolution: Optional[float]) -> Tuple[int, int, object]:
+    """(width, height, transform) of the output grid"""
+    from rasterio.transform import Affine
+
+    if resolution is None:
+        return reference.width, reference.height, reference.transform
+    factor = resolution / abs(reference.res[0])
+    width = max(1, int(round(reference.width / factor)))
+    height = max(1, int(round(reference.height / factor)))
+    transform = reference.transform * Affine.scale(reference.width / width, reference.height / height)
+    return width, height, transform
+
+
+def _read_native(source, row: int, col: int, height: int, width: int) -> np.ndarray:
+    """A block of a source raster at its own resolution, nodata as NaN"""
+    from rasterio.windows import Window as RasterWindow
+
+    values = source.read(1, window=RasterWindow(col, row, width, height)).astype(np.float32, copy=False)
+    if source.nodata is not None and not np.isnan(source.nodata):
+        values[values == source.nodata] = np.nan
+    return values
+
+
+def _cloud_mask(mask, row: int, col: int, height: int, width: int, grid: Tuple[int, int]) -> np.ndarray:
+    """
+    Cloud mask for a block of a width x height grid, nearest-neighbour
+
+    The grid covers the same extent as the mask, e.g. a band's own pixel
+    grid or the output grid.
+    """
+    from rasterio.enums import Resampling
+    from rasterio.windows import Window as RasterWindow
+
+    grid_width, grid_height = grid
+    scale_y = mask.height / grid_height
+    scale_x = mask.width / grid_width
+    mask_window = RasterWindow(col * scale_x, row * scale_y, width * scale_x, height * scale_y)
+    return mask.read(1, window=mask_window, out_shape=(height, width), resampling=Resampling.nearest) > 0
+
+
+def _resample_bilinear(values: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    NaN-aware bilinear resampling
+
+    Each output pixel (rows[i], cols[j]), in fractional pixel coordinates of
+    values, is the bilinear average of its valid neighbours only, with the
+    weights renormalised; it is NaN when all four neighbours are NaN. Cloud
+    and nodata pixels therefore never bleed into clear ones.
+
+    Args:
+        values: 2-D float32 array with NaN for invalid pixels
+        rows: Output row centres in values' pixel coordinates
+        cols: Output column centres in values' pixel coordinates
+
+    Returns:
+        float32 array of shape (len(rows), len(cols))
+    """
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, np.float32(0))
+    weight = valid.astype(np.float32)
+
+    rows = np.clip(rows, 0, values.shape[0] - 1)
+    cols = np.clip(cols, 0, values.shape[1] - 1)
+    r0 = np.floor(rows).astype(np.intp)
+    c0 = np.floor(cols).astype(np.intp)
+    r1 = np.minimum(r0 + 1, values.shape[0] - 1)
+    c1 = np.minimum(c0 + 1, values.shape[1] - 1)
+    wr = (rows - r0).astype(np.float32)[:, None]
+    wc = (cols - c0).astype(np.float32)[None, :]
+
+    def interpolate(array):
+        top = array[np.ix_(r0, c0)] * (1 - wc) + array[np.ix_(r0, c1)] * wc
+        bottom = array[np.ix_(r1, c0)] * (1 - wc) + array[np.ix_(r1, c1)] * wc
+        return top * (1 - wr) + bottom * wr
+
+    total = interpolate(weight)
+    out = np.full(total.shape, np.nan, dtype=np.float32)
+    np.divide(interpolate(filled), total, out=out, where=total > 0)
+    return out
+
+
+def _native_block(
+    window: Window,
+    grid: Tuple[int, int],
+    shape: Tuple[int, int]
+) -> Tuple[np.ndarray, np.ndarray, Window]:
+    """
+    Where a window of the output grid falls on a source raster
+
+    Args:
+        window: Window on the output grid
+        grid: (width, height) of the output grid
+        shape: (width, height) of the source raster, covering the same extent
+
+    Returns:
+        (rows, cols, block): the output pixel centres in the pixel
+        coordinates of block, and the smallest source block holding every
+        pixel the bilinear resampling reads
+    """
+    row, col, height, width = window
+    grid_width, grid_height = grid
+    source_width, source_height = shape
+    rows = (row + np.arange(height) + 0.5) * (source_height / grid_height) - 0.5
+    cols = (col + np.arange(width) + 0.5) * (source_width / grid_width) - 0.5
+    row_start = min(max(int(np.floor(rows[0])), 0), source_height - 1)
+    col_start = min(max(int(np.floor(cols[0])), 0), source_width - 1)
+    row_stop = min(int(np.floor(rows[-1])) + 2, source_height)
+    col_stop = min(int(np.floor(cols[-1])) + 2, source_width)
+    block = (row_start, col_start, row_stop - row_start, col_stop - col_start)
+    return rows - row_start, cols - col_start, block
+
+
+def _mask_and_resample(
+    values: np.ndarray,
+    cloudy: Optional[np.ndarray],
+    rows: np.ndarray,
+    cols: np.ndarray
+) -> np.ndarray:
+    """
+    Set cloudy pixels of a native block to NaN, then resample it bilinearly
+
+    Args:
+        values: float32 block at the source's resolution, modified in place
+        cloudy: Boolean cloud mask on the same pixels, or None
+        rows: Output row centres in the block's pixel coordinates
+        cols: Output column centres in the block's pixel coordinates
+    """
+    if cloudy is not None:
+        values[cloudy] = np.nan
+    return _resample_bilinear(values, rows, cols)
+
+
+def _read_tile(window: Window, grid: Tuple[int, int]) -> Dict[str, np.ndarray]:
+    """
+    Bands of one window on the output grid, with clouds set to NaN
+
+    Each band is read at its own resolution and the cloud mask is applied
+    there, before bilinear resampling onto the output grid, so cloudy and
+    nodata pixels are left out of the interpolation instead of bleeding
+    into clear ones. Output pixels that are cloudy on the output grid are
+    then set to NaN as well.
+    """
+    mask = _sources['mask']
+    bands = {}
+    for band, source in _sources['bands'].items():
+        shape = (source.width, source.height)
+        rows, cols, block = _native_block(window, grid, shape)
+        values = _read_native(source, *block)
+        cloudy = _cloud_mask(mask, *block, grid=shape) if mask is not None else None
+        bands[band] = _mask_and_resample(values, cloudy, rows, cols)
+
+    if mask is not None:
+        cloudy = _cloud_mask(mask, *window, grid=grid)
+        for values in bands.values():
+            values[cloudy] = np.nan
+    return bands
+
+
+def _sample_tile(window: Window, grid: Tuple[int, int], stride: int) -> Dict[str, np.ndarray]:
+    """Every stride-th valid pixel of each band in one window"""
+    bands = _read_tile(window, grid)
+    samples = {}
+    for band, values in bands.items():
+        values = values.ravel()[::stride]
+        samples[band] = values[~np.isnan(values)]
+    return samples
+
+
+def _process_tile(
+    window: Window,
+    grid: Tuple[int, int],
+    dark_values: Dict[str, float],
+    indices: List[str]
+) -> Tuple[Window, Dict[str, np.ndarray]]:
+    """Corrected bands and indices of one window"""
+    bands = correct_tile(_read_tile(window, grid), dark_values)
+    outputs = dict(bands)
+    if indices:
+        outputs.update(compute_indices(bands, indices))
+    return window, outputs
+
+
+def _map_tiles(func, windows: List[Window], n_workers: int, initargs: tuple) -> Iterator:
+    """
+    Results of func(window) for every window, in completion order
+
+    At most two tiles per worker are in flight, so memory stays bounded by
+    the tile size rather than the scene size.
+    """
+    if n_workers <= 1:
+        _open_sources(*initargs)
+        try:
+            for window in windows:
+                yield func(window)
+        finally:
+            _close_sources()
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_open_sources, initargs=initargs) as pool:
+        pending = set()
+        for window in windows:
+            pending.add(pool.submit(func, window))
+            if len(pending) >= 2 * n_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+class _GeoTiffWriter:
+    """Multi-band tiled float32 GeoTIFF, one band per output"""
+
+    def __init__(self, path, names, width, height, transform, crs, tile_size):
+        import rasterio
+
+        self.index = {name: i + 1 for i, name in enumerate(names)}
+        self.dataset = rasterio.open(
+            path, 'w', driver='GTiff', width=width, height=height, count=len(names),
+            dtype='float32', crs=crs, transform=transform, nodata=np.nan,
+            tiled=True, blockxsize=tile_size, blockysize=tile_size,
+            compress='deflate', BIGTIFF='IF_SAFER'
+        )
+        for name, i in self.index.items():
+            self.dataset.set_band_description(i, name)
+
+    def write(self, window: Window, outputs: Dict[str, np.ndarray]) -> None:
+        from rasterio.windows import Window as RasterWindow
+
+        row, col, height, width = window
+        for name, values in outputs.items():
+            self.dataset.write(values, self.index[name], window=RasterWindow(col, row, width, height))
+
+    def close(self) -> None:
+        self.dataset.close()
+
+
+class _ZarrWriter:
+    """Zarr group with one chunked float32 array per output"""
+
+    def __init__(self, path, names, width, height, transform, crs, tile_size):
+        import zarr
+
+        self.group = zarr.open_group(str(path), mode='w')
+        self.group.attrs['transform'] = list(transform)[:6]
+        self.group.attrs['crs'] = crs.to_string() if crs is not None else None
+        for name in names:
+            self.group.create_dataset(name, shape=(height, width), chunks=(tile_size, tile_size),
+                                      dtype='float32', fill_value=np.nan)
+
+    def write(self, window: Window, outputs: Dict[str, np.ndarray]) -> None:
+        row, col, height, width = window
+        for name, values in outputs.items():
+            self.group[name][row:row + height, col:col + width] = values
+
+    def close(self) -> None:
+        pass
+
+
+def process_satellite_tiles(
+    bands: Dict[str, str],
+    output_path: str,
+    cloud_mask: Optional[str] = None,
+    resolution: Optional[float] = None,
+    indices: Iterable[str] = ('NDVI', 'EVI', 'NDWI'),
+    tile_size: int = DEFAULT_TILE_SIZE,
+    n_workers: Optional[int] = None,
+    dark_values: Optional[Dict[str, float]] = None,
+    output_format: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Process a satellite scene tile by tile and write the results to disk
+
+    Args:
+        bands: Band name ('nir', 'red', 'blue', 'swir', ...) -> raster path
+        output_path: GeoTIFF path, or a Zarr store path ending in .zarr
+        cloud_mask: Raster path whose non-zero pixels are clouds
+        resolution: Target resolution in meters (default: that of the nir
+            band, or of the first band if there is no nir)
+        indices: Spectral indices added to the outputs
+        tile_size: Output tile edge in pixels; a multiple of 16
+        n_workers: Worker processes (default: CPU count; 1 runs in-process)
+        dark_values: Band name -> dark value; skips the sampling pass
+        output_format: 'GTiff' or 'zarr' (default: from the output path)
+
+    Returns:
+        Dark value subtracted from each band, for reuse on related scenes
+    """
+    import rasterio
+
+    try:
+        if tile_size % 16:
+            raise ValueError(f"tile_size must be a multiple of 16, got {tile_size}")
+        indices = [index.upper() for index in indices]
+        missing = sorted({band for index in indices for band in INDEX_BANDS.get(index, ())} - set(bands))
+        if missing:
+            raise ValueError(f"Missing required bands: {missing}")
+        output_format = output_format or ('zarr' if str(output_path).rstrip('/').endswith('.zarr') else 'GTiff')
+        n_workers = n_workers or os.cpu_count() or 1
+
+        reference_band = 'nir' if 'nir' in bands else next(iter(bands))
+        with rasterio.open(bands[reference_band]) as reference:
+            width, height, transform = _target_grid(reference, resolution)
+            crs = reference.crs
+        grid = (width, height)
+        windows = tile_windows(width, height, tile_size)
+        initargs = (dict(bands), cloud_mask)
+        logger.info(f"Processing {width}x{height} scene in {len(windows)} tiles with {n_workers} workers")
+
+        if dark_values is None:
+            stride = max(1, (width * height) // DARK_SAMPLE_SIZE)
+            samples = {band: [] for band in bands}
+            for tile_samples in _map_tiles(partial(_sample_tile, grid=grid, stride=stride),
+                                           windows, n_workers, initargs):
+                for band, values in tile_samples.items():
+                    samples[band].append(values)
+            dark_values = {}
+            for band, chunks in samples.items():
+                values = np.concatenate(chunks)
+                dark_values[band] = float(np.quantile(values, DARK_OBJECT_QUANTILE)) if len(values) else 0.0
+            logger.info(f"Dark values: {dark_values}")
+
+        names = list(bands) + indices
+        writer_class = _ZarrWriter if output_format == 'zarr' else _GeoTiffWriter
+        writer = writer_class(output_path, names, width, height, transform, crs, tile_size)
+        try:
+            process = partial(_process_tile, grid=grid, dark_values=dark_values, indices=indices)
+            for done, (window, outputs) in enumerate(_map_tiles(process, windows, n_workers, initargs), 1):
+                writer.write(window, outputs)
+                if done % 100 == 0:
+                    logger.info(f"{done}/{len(windows)} tiles written")
+        finally:
+            writer.close()
+
+        return dark_values
+
+    except Exception as e:
+        logger.error(f"Error in process_satellite_tiles: {str(e)}")
+        raise
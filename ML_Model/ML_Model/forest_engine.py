@@ -0,0 +1,210 @@
+import json
+import numpy as np
+from pathlib import Path
+
+# Batches up to this many rows sum tree probabilities with one cumsum;
+# larger ones accumulate tree by tree to avoid a (rows, trees, classes) temporary
+_SMALL_BATCH_ROWS = 16
+
+# Rows traversed together; keeps the per-step node arrays cache-resident
+_TRAVERSAL_BLOCK_ROWS = 128
+
+# Rows whose tree probabilities are summed together; keeps the running
+# (rows, classes) total cache-resident on large batches
+_ACCUMULATE_BLOCK_ROWS = 1024
+
+ARTIFACT_FORMAT = "flat-forest"
+ARTIFACT_VERSION = 1
+_ARRAYS = ["feature", "threshold", "children", "value", "roots"]
+
+
+class FlatForest:
+    """
+    Random forest flattened into contiguous NumPy arrays.
+
+    Every tree of a fitted sklearn RandomForestClassifier is concatenated
+    into one set of node arrays (feature, threshold, [left, right] children)
+    plus a per-node class distribution, so a whole batch is evaluated with
+    vectorized traversal and no sklearn estimator overhead. Leaves point
+    back at themselves, so the traversal simply runs max_depth steps.
+
+    Predictions match sklearn exactly: inputs are cast to float32 before
+    the `<=` split test, as sklearn does, and tree probabilities are summed
+    in tree order before averaging.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth,
+                 classes, feature_names=None, version=None):
+        self.feature = feature
+        self.threshold = threshold
+        # Shape (n_nodes, 2): [left, right] pairs so one take() picks the branch
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.version = version
+        # A view for C-contiguous (including memory-mapped) children
+        self._children = children.ravel()
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Build a FlatForest from a fitted RandomForestClassifier.
+
+        Args:
+            model: Fitted sklearn RandomForestClassifier (single output)
+
+        Returns:
+            FlatForest
+        """
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            # Leaves loop back to themselves and test feature 0 harmlessly
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(tree.threshold.astype(np.float64))
+            left = np.where(is_leaf, node_ids, tree.children_left)
+            right = np.where(is_leaf, node_ids, tree.children_right)
+            children.append(np.stack([left, right], axis=1).astype(np.int32) + offset)
+
+            # Per-tree class probabilities, as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=model.classes_,
+            feature_names=getattr(model, "feature_names_in_", None),
+            version=getattr(model, "model_version_", None)
+        )
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load an artifact written by save() using only NumPy.
+
+        Args:
+            path: Artifact directory
+            mmap (bool): Memory-map the arrays read-only, so several worker
+                processes share one copy through the page cache
+
+        Returns:
+            FlatForest
+        """
+        path = Path(path)
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+        if meta.get("format") != ARTIFACT_FORMAT or meta.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported model artifact: {path}")
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in _ARRAYS}
+        return cls(
+            max_depth=meta["max_depth"],
+            classes=np.array(meta["classes"]),
+            feature_names=meta["feature_names"],
+            version=meta.get("model_version"),
+            **arrays
+        )
+
+    def save(self, path):
+        """
+        Write the forest as a directory of .npy arrays plus meta.json.
+
+        The arrays are stored uncompressed so load() can memory-map them;
+        class labels and feature order go in meta.json, so loading never
+        needs pickle or sklearn.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        meta = {
+            "format": ARTIFACT_FORMAT,
+            "version": ARTIFACT_VERSION,
+            "max_depth": self.max_depth,
+            "classes": self.classes_.tolist(),
+            "feature_names": self.feature_names,
+            "model_version": self.version
+        }
+        with open(path / "meta.json", "w") as f:
+            json.dump(meta, f, indent=2)
+        return path
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def apply(self, X):
+        """
+        Return the leaf index reached in every tree.
+
+        Args:
+            X: Array-like of shape (n_rows, n_features)
+
+        Returns:
+            np.ndarray: Global node ids of shape (n_rows, n_trees)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[0] <= _TRAVERSAL_BLOCK_ROWS:
+            return self._apply_block(X)
+        return np.concatenate([
+            self._apply_block(X[start:start + _TRAVERSAL_BLOCK_ROWS])
+            for start in range(0, X.shape[0], _TRAVERSAL_BLOCK_ROWS)
+        ])
+
+    def _apply_block(self, X):
+        """Traverse every tree for one block of float32 rows."""
+        flat = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(X.shape[0]) * X.shape[1])[:, None]
+        nodes = np.tile(self.roots, (X.shape[0], 1))
+        for _ in range(self.max_depth):
+            # Written as not(<=) so NaN goes right, matching sklearn
+            go_right = ~(flat.take(row_offsets + self.feature.take(nodes)) <= self.threshold.take(nodes))
+            nodes = self._children.take(2 * nodes + go_right)
+        return nodes
+
+    def predict_proba(self, X):
+        """Average class probabilities over all trees, as sklearn does."""
+        leaves = self.apply(X)
+        # Both paths add trees strictly in order, so sums are bit-identical
+        # to sklearn's running total
+        if leaves.shape[0] <= _SMALL_BATCH_ROWS:
+            proba = np.cumsum(self.value[leaves], axis=1)[:, -1]
+        else:
+            proba = np.zeros((leaves.shape[0], self.value.shape[1]), dtype=np.float64)
+            for start in range(0, leaves.shape[0], _ACCUMULATE_BLOCK_ROWS):
+                block = proba[start:start + _ACCUMULATE_BLOCK_ROWS]
+                block_leaves = leaves[start:start + _ACCUMULATE_BLOCK_ROWS]
+                for t in range(self.n_trees):
+                    block += self.value.take(block_leaves[:, t], axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        """Predict the class label of every row."""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import math
+import itertools
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.ensemble import RandomForestClassifier
+from forest_engine import FlatForest
+
+# Forest hyperparameters searched by default
+SEARCH_SPACE = {
+    'n_estimators': [10, 25, 50, 100, 200],
+    'max_depth': [None, 6, 10, 16],
+    'max_features': ['sqrt', 'log2', None],
+    'min_samples_leaf': [1, 2, 4, 8]
+}
+
+# Set in each worker by _attach_shared; views onto the parent's shared memory
+_shared = {}
+
+
+def _share_array(array):
+    """Copy an array into a new shared memory block."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, {'name': shm.name, 'shape': array.shape, 'dtype': array.dtype.str}
+
+
+def _attach_shared(specs):
+    """Pool initializer: map the shared training/validation arrays without copying."""
+    for key, spec in specs.items():
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        _shared[key + '_shm'] = shm
+        _shared[key] = np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=shm.buf)
+
+
+def _stratified_order(y, seed):
+    """
+    Row order whose every prefix is roughly class-balanced.
+
+    Successive halving trains early rungs on a prefix of the training set,
+    so each prefix must keep all classes in proportion.
+    """
+    rng = np.random.default_rng(seed)
+    position = np.empty(len(y), dtype=np.float64)
+    for label in np.unique(y):
+        idx = np.flatnonzero(y == label)
+        rng.shuffle(idx)
+        position[idx] = (np.arange(len(idx)) + rng.random()) / len(idx)
+    return np.argsort(position, kind='stable')
+
+
+def _evaluate(params, n_train, seed):
+    """Fit one candidate on the first n_train shared rows and score it."""
+    X_train = _shared['X_train'][:n_train]
+    y_train = _shared['y_train'][:n_train]
+    X_val = _shared['X_val']
+    y_val = _shared['y_val']
+
+    model = RandomForestClassifier(random_state=seed, n_jobs=1, **params)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    # Inference cost is measured on the flat engine that serves predictions
+    engine = FlatForest.from_sklearn(model)
+    accuracy = float((engine.predict(X_val) == y_val).mean())
+
+    result = {
+        **params,
+        'n_train': n_train,
+        'accuracy': accuracy,
+        'fit_seconds': fit_seconds,
+        'n_nodes': engine.n_nodes
+    }
+    return result, engine
+
+
+def measure_latency(engine, X, latency_rows=100, repeats=5):
+    """
+    Time single-row and batch prediction of one engine.
+
+    Every candidate is timed on the same rows, in the calling process and
+    one at a time, so the numbers are not skewed by other candidates
+    fitting alongside. One untimed call warms the engine up first, and
+    each figure is the median over the repeats.
+
+    Args:
+        engine (FlatForest): Engine to time
+        X (np.ndarray): Rows to predict; the first latency_rows are
+            predicted one at a time
+        latency_rows (int): Rows timed one at a time per repeat
+        repeats (int): Timed passes per figure
+
+    Returns:
+        dict: single_row_us and batch_us_per_row in microseconds
+    """
+    rows = X[:latency_rows]
+    engine.predict(rows[:1])
+
+    single, batch = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for i in range(len(rows)):
+            engine.predict(rows[i:i + 1])
+        single.append((time.perf_counter() - start) / len(rows))
+
+        start = time.perf_counter()
+        engine.predict(X)
+        batch.append((time.perf_counter() - start) / len(X))
+
+    return {
+        'single_row_us': float(np.median(single) * 1e6),
+        'batch_us_per_row': float(np.median(batch) * 1e6)
+    }
+
+
+def pareto_ranks(results, latency_key='single_row_us'):
+    """
+    Non-dominated sorting on (accuracy up, latency down).
+
+    Returns:
+        list: Rank per result; 0 is the accuracy/latency frontier
+    """
+    ranks = [None] * len(results)
+    remaining = set(range(len(results)))
+    rank = 0
+    while remaining:
+        front = [
+            i for i in remaining
+            if not any(
+                results[j]['accuracy'] >= results[i]['accuracy']
+                and results[j][latency_key] <= results[i][latency_key]
+                and (results[j]['accuracy'] > results[i]['accuracy']
+                     or results[j][latency_key] < results[i][latency_key])
+                for j in remaining
+            )
+        ]
+        for i in front:
+            ranks[i] = rank
+        remaining -= set(front)
+        rank += 1
+    return ranks
+
+
+def sample_candidates(n_candidates, search_space=SEARCH_SPACE, seed=42):
+    """Draw distinct parameter combinations from the search space."""
+    grid = [dict(zip(search_space, values)) for values in itertools.product(*search_space.values())]
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(grid), size=min(n_candidates, len(grid)), replace=False)
+    return [grid[i] for i in picks]
+
+
+def successive_halving_search(X_train, y_train, X_val, y_val, n_candidates=27, eta=3,
+                              n_workers=None, search_space=SEARCH_SPACE, seed=42,
+                              latency_rows=100, latency_repeats=5):
+    """
+    Successive-halving search over forest hyperparameters on a process pool.
+
+    The training and validation matrices are placed in shared memory once
+    and mapped by every worker, so candidates never receive pickled copies.
+    Every rung trains the surviving candidates on a larger stratified
+    prefix of the training rows and keeps the best 1/eta of them, ranked
+    first by accuracy/latency Pareto front and then by accuracy, so fast
+    models that are nearly as accurate survive alongside the most accurate
+    ones. Candidates are fitted in parallel, but their latency is measured
+    afterwards in this process, one candidate at a time (measure_latency).
+
+    Args:
+        X_train, y_train: Training features and labels
+        X_val, y_val: Held-out rows used to score candidates
+        n_candidates (int): Parameter combinations in the first rung
+        eta (int): Fraction of candidates kept per rung is 1/eta
+        n_workers (int): Pool size (default: CPU count)
+        search_space (dict): Parameter name -> list of values
+        seed (int): Seed for sampling, row order and forests
+        latency_rows (int): Validation rows predicted one at a time per repeat
+        latency_repeats (int): Timed passes per candidate; the median is kept
+
+    Returns:
+        pd.DataFrame: One row per evaluation, with its rung and Pareto rank
+    """
+    X_train = np.asarray(X_train, dtype=np.float32)
+    y_train = np.asarray(y_train)
+    order = _stratified_order(y_train, seed)
+    arrays = {
+        'X_train': np.ascontiguousarray(X_train[order]),
+        'y_train': y_train[order].astype(str),
+        'X_val': np.ascontiguousarray(np.asarray(X_val, dtype=np.float32)),
+        'y_val': np.asarray(y_val).astype(str)
+    }
+
+    candidates = sample_candidates(n_candidates, search_space, seed)
+    # Halve until at most eta candidates remain, so the last rung compares
+    # a small frontier on the full training set rather than a single model
+    n_rungs, remaining = 1, len(candidates)
+    while remaining > eta:
+        remaining //= eta
+        n_rungs += 1
+    n_total = len(X_train)
+    min_train = max(len(np.unique(y_train)) * 2, n_total // eta ** (n_rungs - 1))
+
+    blocks = []
+    specs = {}
+    try:
+        for key, array in arrays.items():
+            shm, spec = _share_array(array)
+            blocks.append(shm)
+            specs[key] = spec
+
+        records = []
+        with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count(),
+                                 initializer=_attach_shared, initargs=(specs,)) as pool:
+            for rung in range(n_rungs):
+                n_train = n_total if rung == n_rungs - 1 else min(n_total, min_train * eta ** rung)
+                start = time.perf_counter()
+                futures = [pool.submit(_evaluate, params, n_train, seed) for params in candidates]
+                fitted = [f.result() for f in futures]
+                # Timed only once the whole rung is fitted and the pool is idle
+                results = [{**result, **measure_latency(engine, arrays['X_val'], latency_rows, latency_repeats)}
+                           for result, engine in fitted]
+                ranks = pareto_ranks(results)
+                for result, rank in zip(results, ranks):
+                    records.append({'rung': rung, 'pareto_rank': rank, **result})
+                print(f"Rung {rung}: {len(candidates)} candidates on {n_train} rows "
+                      f"in {time.perf_counter() - start:.1f}s")
+
+                if rung == n_rungs - 1 or len(candidates) == 1:
+                    break
+                keep = max(1, len(candidates) // eta)
+                survivors = sorted(range(len(results)), key=lambda i: (ranks[i], -results[i]['accuracy']))
+                candidates = [candidates[i] for i in survivors[:keep]]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    return pd.DataFrame(records)
+
+
+def select_model(results, max_latency_us=None, search_space=SEARCH_SPACE):
+    """
+    Pick parameters from the last rung: the most accurate model within the
+    single-row latency budget, breaking ties by lower latency. Without a
+    candidate inside the budget the fastest one is returned.
+
+    Args:
+        results (pd.DataFrame): Output of successive_halving_search
+        max_latency_us (float): Single-row latency budget in microseconds
+        search_space (dict): The space the search ran over; its parameter
+            names are the ones returned
+
+    Returns:
+        tuple: (parameter dict, results row of the selected model)
+    """
+    final = results[results['rung'] == results['rung'].max()]
+    if max_latency_us is not None:
+        within = final[final['single_row_us'] <= max_latency_us]
+        final = within if not within.empty else final.nsmallest(1, 'single_row_us')
+    best = final.sort_values(['accuracy', 'single_row_us'], ascending=[False, True]).iloc[0]
+    params = {}
+    for name in search_space:
+        value = best[name]
+        if isinstance(value, (np.integer, np.floating)):
+            value = value.item()
+        if isinstance(value, float):
+            # Integer columns holding None come back from pandas as floats
+            value = None if math.isnan(value) else int(value) if value.is_integer() else value
+        params[name] = value
+    return params, best
+
+
+def save_search_results(results, params, output_dir=Path("model_results")):
+    """Write every evaluation to CSV and the selected parameters to JSON."""
+    output_dir.mkdir(exist_ok=True)
+    results.to_csv(output_dir / "hyperparameter_search.csv", index=False)
+    with open(output_dir / "best_params.json", "w") as f:
+        json.dump(params, f, indent=2)
+    print(f"Search results saved to {output_dir}/hyperparameter_search.csv")
+    print(f"Selected parameters saved to {output_dir}/best_params.json")
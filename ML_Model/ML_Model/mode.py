@@ -6,13 +6,113 @@ from sklearn.metrics import classification_report, confusion_matrix, accuracy_sc
 import joblib
 from pathlib import Path
 import os
+import sys
+import time
+import json
+import argparse
 import matplotlib.pyplot as plt
 import seaborn as sns
+from forest_engine import FlatForest
+from model_store import new_version, read_current, write_current, prune_versions
 
-def crop_recommendation_model():
+# The cleaned-data reader lives with the cleaner in Data Wrangling
+sys.path.append(str(Path(__file__).parent.parent / 'Data Wrangling'))
+from DataWrangling import load_cleaned_dataset
+
+MODEL_PATH = Path("ML_Model/trained_model.pkl")
+MODEL_VERSIONS_DIR = Path("ML_Model/model_versions")
+BEST_PARAMS_PATH = Path("model_results/best_params.json")
+LABELLED_ROWS_PATH = Path("data/labelled_rows.csv")
+CLEAN_DATA_PATH = Path("data/cleanCrop_rec_DataSet.csv")
+
+def export_flat_model(model, artifact_path):
+    """
+    Export a fitted forest as a NumPy-only artifact for predict.py.
+
+    The artifact is a directory of uncompressed .npy arrays plus meta.json
+    (class labels, feature order, version), so it loads without sklearn and
+    can be memory-mapped read-only by several worker processes.
+    """
+    artifact_path = FlatForest.from_sklearn(model).save(artifact_path)
+    print(f"Flat model artifact saved to: {artifact_path}")
+    return artifact_path
+
+def publish_model(model, model_path=MODEL_PATH, versions_dir=MODEL_VERSIONS_DIR, keep_versions=5,
+                  version=None):
+    """
+    Save a fitted model as a new version without disturbing running predictors.
+
+    The joblib model is written to a temporary file and renamed over
+    trained_model.pkl, and the flat artifact goes into its own
+    model_versions/<version>/ directory before the CURRENT pointer is
+    swapped, so a watching predictor never sees a half-written model.
+
+    Args:
+        version (str): Version id to publish under (default: a new one)
+
+    Returns:
+        str: The published model version id
+    """
+    version = version or new_version()
+    model.model_version_ = version
+
+    tmp_path = model_path.with_name(model_path.name + ".tmp")
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, model_path)
+    print(f"\nModel saved to: {model_path} (version {version})")
+
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    export_flat_model(model, versions_dir / version)
+    write_current(versions_dir, version)
+    prune_versions(versions_dir, keep_versions)
+    return version
+
+def load_labelled_rows(store_path=LABELLED_ROWS_PATH):
+    """Return the rows appended to the training store, or None if there are none."""
+    if not store_path.exists():
+        return None
+    return pd.read_csv(store_path)
+
+def append_labelled_rows(new_rows_file, store_path=LABELLED_ROWS_PATH,
+                         data_path=CLEAN_DATA_PATH):
+    """
+    Append newly labelled sensor rows to the training store.
+
+    Column names are normalized the way load_and_clean_data does; rows with
+    missing values and duplicates within the batch are dropped.
+
+    Args:
+        new_rows_file (str): CSV with the feature columns and a label column
+        store_path: Training store CSV the rows are appended to
+        data_path: Cleaned dataset whose columns the rows must match
+
+    Returns:
+        pd.DataFrame: The rows appended
+    """
+    columns = list(pd.read_csv(data_path, nrows=0).columns)
+    df = pd.read_csv(new_rows_file)
+    df.columns = df.columns.str.lower().str.replace(' ', '_')
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"New rows are missing columns: {missing}")
+
+    df = df[columns].dropna().drop_duplicates()
+    df['label'] = df['label'].astype(str).str.strip()
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(store_path, mode='a', header=not store_path.exists(), index=False)
+    print(f"Appended {len(df)} labelled rows to {store_path}")
+    return df
+
+def crop_recommendation_model(model_params=None):
+    """
+    Train, evaluate and publish the crop recommendation forest.
+
+    Args:
+        model_params (dict): RandomForest parameters overriding the defaults,
+            e.g. the ones selected by tune_model()
+    """
     # Load the cleaned dataset
-    data_path = Path("data/cleanCrop_rec_DataSet.csv")
-    df = pd.read_csv(data_path)
+    df = load_cleaned_dataset(CLEAN_DATA_PATH)
     
     # Separate features and target
     X = df.drop('label', axis=1)  # Features
@@ -25,6 +125,14 @@ def crop_recommendation_model():
         random_state=42,  # For reproducibility
         stratify=y  # Ensure balanced class distribution in splits
     )
+
+    # Rows added through the training store only ever go to the training set,
+    # so the stored test set stays comparable across retrains
+    store = load_labelled_rows()
+    if store is not None:
+        X_train = pd.concat([X_train, store.drop('label', axis=1)], ignore_index=True)
+        y_train = pd.concat([y_train, store['label']], ignore_index=True)
+        print(f"Including {len(store)} rows from the training store")
     
     # Initialize and train the Random Forest classifier
     rf_classifier = RandomForestClassifier(
@@ -32,9 +140,13 @@ def crop_recommendation_model():
         random_state=42,   # For reproducibility
         n_jobs=-1          # Use all available cores
     )
+    if model_params:
+        rf_classifier.set_params(**model_params)
+        print(f"Training with parameters: {model_params}")
     
     # Train the model
     rf_classifier.fit(X_train, y_train)
+    rf_classifier.trained_store_rows_ = 0 if store is None else len(store)
     
     # Make predictions
     y_pred = rf_classifier.predict(X_test)
@@ -58,10 +170,8 @@ def crop_recommendation_model():
     print("=" * 50)
     print(feature_importance)
     
-    # Save the trained model as .pkl
-    model_path = Path("ML_Model/trained_model.pkl")
-    joblib.dump(rf_classifier, model_path)
-    print(f"\nModel saved to: {model_path}")
+    # Save the trained model as .pkl plus a versioned flat artifact
+    publish_model(rf_classifier)
     
     # Save test data for later testing
     test_data_path = Path("model_results/test_data.npz")
@@ -70,6 +180,182 @@ def crop_recommendation_model():
     
     return rf_classifier, X_test, y_test
 
+def incremental_update(trees_per_update=10, max_trees=300, replay_per_class=20, seed=42):
+    """
+    Add trees for the training store rows the current model has not seen.
+
+    The model is refit with warm_start, so existing trees are kept and only
+    the new ones are grown, on the unseen rows plus a fixed-size replay
+    sample of older rows per crop. Fit time therefore grows with the new
+    data rather than the whole dataset. Once the forest exceeds max_trees
+    the oldest trees are dropped. Rows with a crop the model does not know
+    trigger a full retrain.
+
+    Args:
+        trees_per_update (int): Trees added per update
+        max_trees (int): Largest forest kept; older trees are dropped first
+        replay_per_class (int): Older rows per crop mixed into the new trees' data
+        seed (int): Seed for the replay sample
+
+    Returns:
+        The updated model
+    """
+    model = joblib.load(MODEL_PATH)
+    store = load_labelled_rows()
+    trained_rows = getattr(model, "trained_store_rows_", 0)
+    if store is None or len(store) <= trained_rows:
+        print("No new labelled rows; model unchanged.")
+        return model
+    new_rows = store.iloc[trained_rows:]
+
+    unseen = sorted(set(new_rows['label']) - set(model.classes_))
+    if unseen:
+        print(f"New crops {unseen} need a full retrain.")
+        params = None
+        if BEST_PARAMS_PATH.exists():
+            with open(BEST_PARAMS_PATH) as f:
+                params = json.load(f)
+        model, _, _ = crop_recommendation_model(params)
+        return model
+
+    # Replay rows keep every crop in the new trees' training data
+    df = load_cleaned_dataset(CLEAN_DATA_PATH)
+    train_df, _ = train_test_split(df, test_size=0.2, random_state=42, stratify=df['label'])
+    old_rows = pd.concat([train_df, store.iloc[:trained_rows]], ignore_index=True)
+    replay = old_rows.groupby('label', group_keys=False).sample(
+        n=replay_per_class, replace=True, random_state=seed
+    )
+    fit_df = pd.concat([new_rows, replay], ignore_index=True)
+
+    n_before = len(model.estimators_)
+    model.set_params(warm_start=True, n_estimators=n_before + trees_per_update)
+    start = time.perf_counter()
+    model.fit(fit_df.drop('label', axis=1), fit_df['label'])
+    fit_seconds = time.perf_counter() - start
+    model.set_params(warm_start=False)
+
+    if len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+        model.n_estimators = max_trees
+    model.trained_store_rows_ = len(store)
+    print(f"Added {trees_per_update} trees on {len(new_rows)} new rows "
+          f"(+{len(replay)} replayed) in {fit_seconds:.2f}s; forest has {len(model.estimators_)} trees")
+
+    data = np.load(Path("model_results/test_data.npz"), allow_pickle=True)
+    print(f"Test accuracy: {accuracy_score(data['y_test'], model.predict(data['X_test'])):.4f}")
+
+    publish_model(model)
+    return model
+
+def tune_model(n_candidates=27, eta=3, n_workers=None, max_latency_us=None):
+    """
+    Search forest hyperparameters and pick a model on the accuracy/latency frontier.
+
+    Uses the same training split as crop_recommendation_model and holds out
+    a fifth of it for scoring, so the stored test set stays untouched.
+    Results for every evaluated candidate go to
+    model_results/hyperparameter_search.csv and the selected parameters to
+    model_results/best_params.json.
+
+    Args:
+        n_candidates (int): Parameter combinations tried in the first rung
+        eta (int): Successive-halving reduction factor
+        n_workers (int): Process pool size (default: CPU count)
+        max_latency_us (float): Single-row latency budget in microseconds
+
+    Returns:
+        dict: Selected RandomForest parameters
+    """
+    from hyperparameter_search import successive_halving_search, select_model, save_search_results
+
+    df = load_cleaned_dataset(CLEAN_DATA_PATH)
+    X = df.drop('label', axis=1)
+    y = df['label']
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=0.2, random_state=42, stratify=y_train
+    )
+
+    results = successive_halving_search(
+        X_fit.values, y_fit.values, X_val.values, y_val.values,
+        n_candidates=n_candidates, eta=eta, n_workers=n_workers
+    )
+    params, best = select_model(results, max_latency_us)
+
+    final = results[results['rung'] == results['rung'].max()]
+    frontier = final[final['pareto_rank'] == 0].sort_values('single_row_us')
+    print("\nAccuracy/latency frontier:")
+    print("=" * 50)
+    print(frontier[['n_estimators', 'max_depth', 'max_features', 'min_samples_leaf',
+                    'accuracy', 'single_row_us', 'fit_seconds', 'n_nodes']].to_string(index=False))
+    print(f"\nSelected parameters: {params} "
+          f"(accuracy {best['accuracy']:.4f}, {best['single_row_us']:.0f} us/row)")
+
+    save_search_results(results, params, BEST_PARAMS_PATH.parent)
+    return params
+
+def compress_model(max_latency_us=None, max_size_kb=None, max_accuracy_loss=0.01, publish=True):
+    """
+    Shrink the trained model to a latency or size budget.
+
+    Tries sub-forests of the most useful trees and small forests distilled
+    from the current model, measures each on model_results/test_data.npz,
+    and publishes the fastest one within the budgets that loses at most
+    max_accuracy_loss test accuracy. Nothing is published when the current
+    model already meets the budgets or no candidate does. The comparison
+    is written to model_results/compression_report.csv.
+
+    Args:
+        max_latency_us (float): Single-row latency budget in microseconds
+        max_size_kb (float): Pickled model size budget in kilobytes
+        max_accuracy_loss (float): Largest acceptable test accuracy drop
+        publish (bool): Publish the compressed model as a new version
+
+    Returns:
+        The selected model (the original one if it is kept)
+
+    Raises:
+        ValueError: Neither max_latency_us nor max_size_kb was given
+    """
+    from model_compression import compress_forest
+
+    if max_latency_us is None and max_size_kb is None:
+        raise ValueError("Compression needs a budget: set max_latency_us or max_size_kb")
+
+    results_dir = Path("model_results")
+    model = joblib.load(MODEL_PATH)
+    data = np.load(results_dir / "test_data.npz", allow_pickle=True)
+    X_test = data['X_test']
+    y_test = data['y_test']
+
+    # Same split as crop_recommendation_model, so only training rows are relabelled
+    df = load_cleaned_dataset(CLEAN_DATA_PATH)
+    X_train, _, _, _ = train_test_split(
+        df.drop('label', axis=1), df['label'], test_size=0.2, random_state=42, stratify=df['label']
+    )
+
+    compressed, results = compress_forest(
+        model, X_train.values, X_test, y_test,
+        max_latency_us=max_latency_us, max_size_kb=max_size_kb, max_accuracy_loss=max_accuracy_loss
+    )
+    results.to_csv(results_dir / "compression_report.csv", index=False)
+
+    print("\nModel Compression:")
+    print("=" * 50)
+    print(results[['candidate', 'n_trees', 'n_nodes', 'accuracy', 'accuracy_loss',
+                   'single_row_us', 'pickle_kb', 'within_budget']].to_string(index=False))
+    print(f"\nCompression report saved to {results_dir}/compression_report.csv")
+
+    if compressed is model:
+        return model
+    selected = results[results['within_budget']].sort_values(['single_row_us', 'pickle_kb']).iloc[0]
+    print(f"Selected: {selected['candidate']} "
+          f"({selected['single_row_us']:.0f} us/row, {selected['pickle_kb']:.0f} KB, "
+          f"accuracy loss {selected['accuracy_loss']:.4f})")
+    if publish:
+        publish_model(compressed)
+    return compressed
+
 def test_model():
     """
     Loads the trained model and test data, evaluates, and saves results to model_results folder.
@@ -109,8 +395,48 @@ def test_model():
     print(f"\nTest results saved to {results_dir}/")
     print(f"Accuracy: {acc:.4f}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train or tune the crop recommendation model")
+    parser.add_argument("--tune", action="store_true",
+                        help="Run the hyperparameter search before anything else")
+    parser.add_argument("--candidates", type=int, default=27, help="Candidates in the first search rung")
+    parser.add_argument("--eta", type=int, default=3, help="Successive-halving reduction factor")
+    parser.add_argument("--workers", type=int, help="Search processes (default: CPU count)")
+    parser.add_argument("--max-latency-us", type=float,
+                        help="Single-row latency budget for --tune and --compress, in microseconds")
+    parser.add_argument("--compress", action="store_true",
+                        help="Shrink the trained model to the latency/size budget and publish it "
+                             "(needs --max-latency-us or --max-size-kb)")
+    parser.add_argument("--max-size-kb", type=float, help="Pickled model size budget for --compress")
+    parser.add_argument("--max-accuracy-loss", type=float, default=0.01,
+                        help="Largest test accuracy drop --compress may accept")
+    parser.add_argument("--new-data", help="CSV of newly labelled rows to add with an incremental update")
+    parser.add_argument("--trees-per-update", type=int, default=10, help="Trees added by an incremental update")
+    parser.add_argument("--retrain", action="store_true",
+                        help="Train and publish a new model, using best_params.json when present")
+    return parser.parse_args()
+
 def main():
-    model_path = Path("ML_Model/trained_model.pkl")
+    args = parse_args()
+    if args.compress and args.max_latency_us is None and args.max_size_kb is None:
+        raise SystemExit("--compress needs --max-latency-us or --max-size-kb")
+    if args.tune:
+        tune_model(args.candidates, args.eta, args.workers, args.max_latency_us)
+    if args.retrain:
+        params = None
+        if BEST_PARAMS_PATH.exists():
+            with open(BEST_PARAMS_PATH) as f:
+                params = json.load(f)
+        crop_recommendation_model(params)
+    if args.new_data:
+        append_labelled_rows(args.new_data)
+        incremental_update(args.trees_per_update)
+    if args.compress:
+        compress_model(args.max_latency_us, args.max_size_kb, args.max_accuracy_loss)
+    if args.tune or args.retrain or args.new_data or args.compress:
+        return
+
+    model_path = MODEL_PATH
     test_data_path = Path("model_results/test_data.npz")
     results_dir = Path("model_results")
     results_dir.mkdir(exist_ok=True)
@@ -119,6 +445,10 @@ def main():
         print("Model and test data found. Skipping training.")
         # Load model and test data, generate report/plots
         model = joblib.load(model_path)
+        if read_current(MODEL_VERSIONS_DIR) is None:
+            # Versions are generated, not checked in: publish the existing
+            # model so the pickle and the flat artifact share one version
+            publish_model(model, version=getattr(model, "model_version_", None))
         data = np.load(test_data_path, allow_pickle=True)
         X_test = data['X_test']
         y_test = data['y_test']
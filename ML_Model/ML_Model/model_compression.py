@@ -0,0 +1,203 @@
+import copy
+import time
+import pickle
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from forest_engine import FlatForest
+
+# Sub-forest sizes tried when dropping trees
+TREE_COUNTS = [1, 2, 3, 5, 8, 10, 15, 20, 30, 50]
+
+# (n_estimators, max_depth) of the distilled student forests
+STUDENT_SHAPES = [(n, depth) for n in (5, 10, 20) for depth in (6, 8, 12, None)]
+
+
+def augment_rows(X, copies=3, jitter=0.05, seed=42):
+    """
+    Jittered copies of the training rows, for the teacher to label.
+
+    Points between the training samples show where the forest's decision
+    boundaries actually lie, which the training rows alone (nearly all
+    classified correctly by every tree) do not.
+    """
+    rng = np.random.default_rng(seed)
+    X = np.asarray(X, dtype=np.float64)
+    scale = X.std(axis=0) * jitter
+    return np.concatenate([X + rng.normal(0.0, 1.0, X.shape) * scale for _ in range(copies)])
+
+
+def tree_selection_order(teacher, X):
+    """
+    Greedy forward selection of trees by agreement with the full forest.
+
+    Each step adds the tree whose inclusion makes the sub-forest's votes
+    agree with the full forest on the most rows of X. Only the leaf each
+    row reaches in each tree is kept; a tree's class probabilities are
+    gathered when it is scored, so memory stays at one rows x classes
+    vote table per candidate instead of trees x rows x classes.
+
+    Returns:
+        list: Tree indices in selection order
+    """
+    flat = FlatForest.from_sklearn(teacher)
+    # Shape (n_trees, n_rows): leaf reached by each row in each tree
+    leaves = np.ascontiguousarray(flat.apply(X).T)
+    target = np.zeros((leaves.shape[1], flat.value.shape[1]))
+    for tree_leaves in leaves:
+        target += flat.value[tree_leaves]
+    target = np.argmax(target, axis=1)
+
+    total = np.zeros((leaves.shape[1], flat.value.shape[1]))
+    remaining = list(range(flat.n_trees))
+    order = []
+    while remaining:
+        best, best_agreement, best_total = 0, -1, None
+        for position, tree in enumerate(remaining):
+            candidate = total + flat.value[leaves[tree]]
+            agreement = np.count_nonzero(np.argmax(candidate, axis=1) == target)
+            if agreement > best_agreement:
+                best, best_agreement, best_total = position, agreement, candidate
+        order.append(remaining.pop(best))
+        total = best_total
+    return order
+
+
+def select_trees(model, indices):
+    """Copy of a fitted forest keeping only the given trees."""
+    pruned = copy.copy(model)
+    pruned.estimators_ = [model.estimators_[i] for i in indices]
+    pruned.n_estimators = len(indices)
+    return pruned
+
+
+def distill(teacher, X, shapes=STUDENT_SHAPES, seed=42):
+    """
+    Fit small student forests on the teacher's predictions.
+
+    Args:
+        teacher: Fitted forest whose labels the students learn
+        X: Rows to label (training rows plus augment_rows())
+        shapes: (n_estimators, max_depth) pairs to fit
+
+    Yields:
+        tuple: (description, fitted student forest)
+    """
+    # Keep the teacher's column names so the student validates inputs the same way
+    names = getattr(teacher, "feature_names_in_", None)
+    X = pd.DataFrame(X, columns=names) if names is not None else X
+    y = teacher.predict(X)
+    for n_estimators, max_depth in shapes:
+        student = RandomForestClassifier(
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            random_state=seed,
+            n_jobs=-1
+        )
+        student.fit(X, y)
+        student.n_jobs = teacher.n_jobs
+        yield f"distill {n_estimators} trees, depth {max_depth}", student
+
+
+def measure(model, X_test, y_test, latency_rows=200):
+    """
+    Accuracy, serving latency and size of one model.
+
+    Latency is the median single-row prediction time of the flat engine
+    that serves predictions; sizes are the flat artifact arrays and the
+    pickled sklearn model.
+    """
+    flat = FlatForest.from_sklearn(model)
+    X_test = np.asarray(X_test, dtype=np.float32)
+    accuracy = float((flat.predict(X_test) == np.asarray(y_test)).mean())
+
+    rows = X_test[:latency_rows]
+    for i in range(min(20, len(rows))):
+        flat.predict(rows[i:i + 1])
+    samples = []
+    for i in range(len(rows)):
+        start = time.perf_counter()
+        flat.predict(rows[i:i + 1])
+        samples.append(time.perf_counter() - start)
+
+    flat_bytes = sum(getattr(flat, name).nbytes for name in ("feature", "threshold", "children", "value", "roots"))
+    return {
+        'n_trees': flat.n_trees,
+        'n_nodes': flat.n_nodes,
+        'max_depth': flat.max_depth,
+        'accuracy': accuracy,
+        'single_row_us': float(np.median(samples) * 1e6),
+        'flat_kb': flat_bytes / 1024,
+        'pickle_kb': len(pickle.dumps(model)) / 1024
+    }
+
+
+def compress_forest(teacher, X_train, X_test, y_test, max_latency_us=None, max_size_kb=None,
+                    max_accuracy_loss=0.01, seed=42):
+    """
+    Shrink a fitted forest to a latency or size budget.
+
+    Candidates are sub-forests of the best trees (greedy selection by
+    agreement with the full forest) and small student forests distilled
+    from the teacher's labels. Selection and distillation only see the
+    training rows and jittered copies of them; the test set is used to
+    measure the accuracy each candidate loses.
+
+    At least one of max_latency_us and max_size_kb is required. The
+    chosen model is the fastest candidate within the budgets whose test
+    accuracy is at most max_accuracy_loss below the teacher's. The teacher
+    is kept if it already meets the budgets or if no candidate qualifies.
+
+    Args:
+        teacher: Fitted RandomForestClassifier
+        X_train: Rows the teacher was trained on
+        X_test, y_test: Held-out rows for tracking accuracy loss
+        max_latency_us (float): Single-row flat-engine latency budget
+        max_size_kb (float): Pickled model size budget
+        max_accuracy_loss (float): Largest acceptable drop in test accuracy
+
+    Returns:
+        tuple: (selected model, pd.DataFrame with one row per candidate)
+
+    Raises:
+        ValueError: Neither a latency nor a size budget was given
+    """
+    if max_latency_us is None and max_size_kb is None:
+        raise ValueError("Compression needs a budget: set max_latency_us or max_size_kb")
+
+    X_train = np.asarray(X_train, dtype=np.float64)
+    X_label = np.concatenate([X_train, augment_rows(X_train, seed=seed)])
+
+    baseline = measure(teacher, X_test, y_test)
+    records = [{'candidate': 'original', **baseline}]
+    models = {'original': teacher}
+
+    order = tree_selection_order(teacher, X_label)
+    for count in TREE_COUNTS:
+        if count >= len(order):
+            break
+        name = f"best {count} trees"
+        models[name] = select_trees(teacher, order[:count])
+        records.append({'candidate': name, **measure(models[name], X_test, y_test)})
+
+    for name, student in distill(teacher, X_label, seed=seed):
+        models[name] = student
+        records.append({'candidate': name, **measure(student, X_test, y_test)})
+
+    results = pd.DataFrame(records)
+    results['accuracy_loss'] = baseline['accuracy'] - results['accuracy']
+    results['within_budget'] = results['accuracy_loss'] <= max_accuracy_loss
+    if max_latency_us is not None:
+        results['within_budget'] &= results['single_row_us'] <= max_latency_us
+    if max_size_kb is not None:
+        results['within_budget'] &= results['pickle_kb'] <= max_size_kb
+
+    if results['within_budget'].iloc[0]:
+        print("The original model already meets the budget; keeping it.")
+        return teacher, results
+    eligible = results[results['within_budget']]
+    if eligible.empty:
+        print("No compressed model meets the budget; keeping the original model.")
+        return teacher, results
+    best = eligible.sort_values(['single_row_us', 'pickle_kb']).iloc[0]
+    return models[best['candidate']], results
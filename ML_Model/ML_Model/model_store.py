@@ -0,0 +1,140 @@
+import os
+import sys
+import uuid
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# File inside the versions directory naming the version to serve
+CURRENT_POINTER = "CURRENT"
+
+
+def new_version():
+    """Return a sortable, unique model version id."""
+    return datetime.now().strftime("%Y%m%dT%H%M%S%f") + "-" + uuid.uuid4().hex[:6]
+
+
+def read_current(versions_dir):
+    """Return the version named by the CURRENT pointer, or None if unset."""
+    try:
+        with open(Path(versions_dir) / CURRENT_POINTER) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_current(versions_dir, version):
+    """Point CURRENT at version, atomically replacing the previous pointer."""
+    versions_dir = Path(versions_dir)
+    tmp = versions_dir / f".{CURRENT_POINTER}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, versions_dir / CURRENT_POINTER)
+
+
+def prune_versions(versions_dir, keep=5):
+    """
+    Delete all but the newest `keep` version directories.
+
+    The current version is never deleted. Processes that still have an old
+    version memory-mapped keep working on POSIX; where the files are locked
+    the directory is simply left behind.
+    """
+    versions_dir = Path(versions_dir)
+    current = read_current(versions_dir)
+    versions = sorted(
+        (p for p in versions_dir.iterdir() if p.is_dir()),
+        key=lambda p: p.stat().st_mtime_ns
+    )
+    for path in versions[:-keep] if keep > 0 else versions:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def model_version(model):
+    """Version id recorded on a loaded model, if any."""
+    return getattr(model, "version", None) or getattr(model, "model_version_", None)
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ReloadingModel:
+    """
+    Model holder that picks up retrained models without a restart.
+
+    A background thread polls `watch_path` (the CURRENT pointer or the model
+    file) and, when it changes, loads the new model off the request path.
+    The (model, version) pair is then replaced in a single reference swap,
+    so each request works on the snapshot it started with and in-flight
+    predictions are never dropped. A failed load keeps serving the old
+    model and is retried on the next change.
+
+    The watcher thread is started lazily per process, so forked pool
+    workers run their own watcher instead of a dead copy of the parent's.
+    """
+
+    def __init__(self, loader, watch_path, interval=2.0, model=None):
+        """
+        Args:
+            loader: Callable returning a freshly loaded model
+            watch_path: File whose modification signals a new model
+            interval (float): Seconds between checks of watch_path
+            model: Already loaded initial model; loader() is called if None
+        """
+        self.loader = loader
+        self.watch_path = watch_path
+        self.interval = interval
+        self.reloads = 0
+
+        self._signature = _file_signature(watch_path)
+        if model is None:
+            model = loader()
+        self._current = (model, model_version(model))
+        self._watcher_pid = None
+        self._watcher_lock = threading.Lock()
+
+    def snapshot(self):
+        """Return the (model, version) pair to use for one request."""
+        if self._watcher_pid != os.getpid():
+            self._start_watcher()
+        return self._current
+
+    @property
+    def version(self):
+        return self._current[1]
+
+    def check(self):
+        """Reload now if the watched file changed; returns True on a swap."""
+        signature = _file_signature(self.watch_path)
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            model = self.loader()
+        except Exception as e:
+            print(f"Model reload failed, keeping version {self.version}: {e}", file=sys.stderr)
+            return False
+        self._current = (model, model_version(model))
+        self.reloads += 1
+        print(f"Model reloaded, now serving version {self.version}", file=sys.stderr)
+        return True
+
+    def _start_watcher(self):
+        with self._watcher_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            thread = threading.Thread(target=self._watch, daemon=True)
+            thread.start()
+
+    def _watch(self):
+        stop = threading.Event()
+        while not stop.wait(self.interval):
+            self.check()
@@ -1,43 +1,469 @@
 import sys
 import json
-import joblib
+import argparse
+import functools
+import threading
+import socketserver
 import numpy as np
-import pandas as pd
 from pathlib import Path
+from model_store import model_version
+
+FEATURES = ['n', 'p', 'k', 'temperature', 'humidity', 'ph', 'rainfall']
+
+# Get the absolute path to the model files
+MODEL_PATH = Path(__file__).parent / "trained_model.pkl"
+MODEL_VERSIONS_DIR = Path(__file__).parent / "model_versions"
+
+
+def load_model(model_path=None, engine="sklearn", n_jobs=None):
+    """
+    Load the trained model from disk.
+
+    sklearn, joblib and pandas are imported only when they are needed, so
+    the flat engine starts with nothing heavier than NumPy.
+
+    Args:
+        model_path: Path to the joblib model or the flat artifact directory
+        engine (str): "sklearn" to use the estimator as-is, "flat" to use a
+            forest_engine.FlatForest. The flat engine memory-maps the
+            artifact written by mode.py (the CURRENT version by default) and
+            falls back to compiling the joblib model when none exists.
+        n_jobs (int): If set, overrides the sklearn estimator's n_jobs
+    """
+    if engine == "flat":
+        from forest_engine import FlatForest
+        path = Path(model_path) if model_path else MODEL_VERSIONS_DIR
+        if path.is_dir():
+            from model_store import read_current
+            current = read_current(path)
+            if current is not None:
+                path = path / current
+            if (path / "meta.json").exists():
+                return FlatForest.load(path)
+        import joblib
+        return FlatForest.from_sklearn(joblib.load(path if path.is_file() else MODEL_PATH))
+
+    import joblib
+    model = joblib.load(model_path or MODEL_PATH)
+    if n_jobs is not None and hasattr(model, "n_jobs"):
+        model.n_jobs = n_jobs
+    return model
+
+
+def load_serving_model(model_path=None, engine="sklearn", reload=False, reload_interval=2.0):
+    """
+    Load the model for --serve and --socket.
+
+    A server answers small requests, and the worker pool (or the single
+    serving process) provides the parallelism, so sklearn estimators run
+    with n_jobs=1 instead of starting a thread or process pool per request.
+    With reload the model is wrapped in a model_store.ReloadingModel whose
+    reloads are loaded the same way.
+    """
+    model = load_model(model_path, engine, n_jobs=1)
+    if not reload:
+        return model
+    from model_store import ReloadingModel
+    return ReloadingModel(
+        lambda: load_model(model_path, engine, n_jobs=1),
+        model_file(model_path, engine),
+        interval=reload_interval,
+        model=model
+    )
+
+
+def to_features(records):
+    """
+    Build the model input frame for a list of feature records.
+
+    Args:
+        records (list): Mappings with the keys listed in FEATURES
+
+    Returns:
+        np.ndarray: One row per record in FEATURES order, in input order
+
+    Raises:
+        ValueError: If a record is not an object, lacks a feature, or has a
+            null, NaN or infinite feature value
+    """
+    rows = []
+    for i, data in enumerate(records):
+        if not isinstance(data, dict):
+            raise ValueError(f"Record {i} is not a JSON object")
+        missing = [name for name in FEATURES if name not in data]
+        if missing:
+            raise ValueError(f"Record {i} missing features: {missing}")
+        rows.append([data[name] for name in FEATURES])
+    features = np.array(rows, dtype=float)
+    # sklearn rejects NaN and infinity but FlatForest would silently send
+    # them down the right branch, so both engines are checked here
+    finite = np.isfinite(features)
+    if not finite.all():
+        i = int(np.argmin(finite.all(axis=1)))
+        invalid = [name for name, ok in zip(FEATURES, finite[i]) if not ok]
+        raise ValueError(f"Record {i} has missing or non-finite features: {invalid}")
+    return features
+
+
+def rank_crops(proba, classes, top_k):
+    """
+    Rank classes by probability for every row.
+
+    Ties keep class order, so the first entry is always the label
+    model.predict would return (classes[argmax(proba)]).
+
+    Returns:
+        list: Per row, a list of {"crop", "probability"} dicts, best first
+    """
+    top_k = min(int(top_k), proba.shape[1])
+    order = np.argsort(-proba, axis=1, kind="stable")[:, :top_k]
+    scores = np.take_along_axis(proba, order, axis=1)
+    labels = np.asarray(classes)[order]
+    return [
+        [{"crop": crop, "probability": score} for crop, score in zip(row_labels, row_scores)]
+        for row_labels, row_scores in zip(labels.tolist(), scores.tolist())
+    ]
+
+
+def check_top_k(top_k, n_classes=None):
+    """
+    Validate a requested ranking size.
+
+    Args:
+        top_k: Requested number of ranked crops
+        n_classes (int): Number of classes the model knows, if available
+
+    Returns:
+        int: top_k capped at n_classes
+    """
+    if isinstance(top_k, bool) or not isinstance(top_k, (int, np.integer)) or top_k < 0:
+        raise ValueError(f"top_k must be a non-negative integer, got {top_k!r}")
+    top_k = int(top_k)
+    if n_classes:
+        top_k = min(top_k, int(n_classes))
+    return top_k
+
+
+def predict_batch(model, records, top_k=0, cache=None):
+    """
+    Predict the recommended crop for many feature records at once.
+
+    All records go through a single vectorized model call. With top_k the
+    model is traversed once via predict_proba and both the recommended
+    crop and the ranked list come from the same probabilities. With a
+    prediction_cache.PredictionCache, records whose quantized features are
+    cached skip inference and only the misses reach the model.
+
+    Returns:
+        list: One {"recommended_crop": <label>} per record, in input order,
+            plus "top_crops" when top_k > 0
+    """
+    if not records:
+        return []
+    features = to_features(records)
+    if cache is None:
+        return _predict_features(model, features, top_k)
+
+    keys = [cache.key(row, top_k) for row in features.tolist()]
+    results = [cache.get(key) for key in keys]
+    misses = [i for i, result in enumerate(results) if result is None]
+    if misses:
+        fresh = _predict_features(model, features[misses], top_k)
+        for i, result in zip(misses, fresh):
+            results[i] = result
+            cache.put(keys[i], result)
+    return results
+
+
+def _predict_features(model, features, top_k):
+    """Run the model on a feature matrix and format one result per row."""
+    if hasattr(model, "feature_names_in_"):
+        # sklearn estimators fitted on a DataFrame expect the same feature names
+        import pandas as pd
+        features = pd.DataFrame(features, columns=FEATURES)
+
+    if not top_k:
+        pred = model.predict(features)
+        return [{"recommended_crop": crop} for crop in pred.tolist()]
+
+    proba = model.predict_proba(features)
+    return [
+        {"recommended_crop": ranked[0]["crop"], "top_crops": ranked}
+        for ranked in rank_crops(proba, model.classes_, top_k)
+    ]
+
+
+def predict_one(model, data, top_k=0, cache=None):
+    """
+    Predict the recommended crop for a single feature record.
+
+    Args:
+        model: Fitted classifier
+        data (dict): Mapping with the keys listed in FEATURES
+        top_k (int): Also return the k most likely crops with probabilities
+
+    Returns:
+        dict: {"recommended_crop": <label>}, plus "top_crops" when top_k > 0
+    """
+    return predict_batch(model, [data], top_k, cache)[0]
+
+
+def read_records(infile):
+    """
+    Read feature records from a JSON array or an NDJSON stream.
+
+    Returns:
+        list: Feature records in input order
+    """
+    text = infile.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def handle_request(model, line, top_k=0, cache=None):
+    """
+    Answer one newline-delimited JSON request.
+
+    The request is a feature record, a JSON array of records, or an object
+    with a "records" array; batches are answered with a "predictions" list in
+    input order. Object requests may set "top_k" (a non-negative integer,
+    capped at the number of crops) to also get a ranked list of crops with
+    probabilities. An optional "id" key is echoed back so callers
+    can match responses to requests. {"command": "stats"} returns the
+    prediction cache counters. Responses name the "model_version" that
+    served them when it is known. Errors are reported in the response
+    instead of terminating the server.
+    """
+    # Resolve a hot-reloading model once so the whole request uses one version
+    if hasattr(model, "snapshot"):
+        model, version = model.snapshot()
+    else:
+        version = model_version(model)
+    if cache is not None:
+        cache.set_version(version)
+
+    request_id = None
+    try:
+        data = json.loads(line)
+        if isinstance(data, dict):
+            request_id = data.get("id")
+            top_k = data.get("top_k", top_k)
+        top_k = check_top_k(top_k, len(getattr(model, "classes_", ())))
+        if isinstance(data, list):
+            response = {"predictions": predict_batch(model, data, top_k, cache)}
+        elif isinstance(data, dict) and data.get("command") == "stats":
+            response = {"cache": cache.stats() if cache is not None else None}
+        elif isinstance(data, dict) and "records" in data:
+            response = {"predictions": predict_batch(model, data["records"], top_k, cache)}
+        else:
+            response = predict_one(model, data, top_k, cache)
+    except Exception as e:
+        response = {"error": str(e)}
+    if version is not None:
+        # Never write into a result that the prediction cache may hold
+        response = {**response, "model_version": version}
+    if request_id is not None:
+        response = {"id": request_id, **response}
+    return response
+
+
+def _error_response(line, error):
+    """Build an error response, echoing the request id when it can be parsed."""
+    response = {"error": str(error)}
+    try:
+        data = json.loads(line)
+        if isinstance(data, dict) and data.get("id") is not None:
+            response = {"id": data["id"], **response}
+    except ValueError:
+        pass
+    return response
+
+
+def _answer(model, pool, line, handler=handle_request):
+    """Answer one request inline, or through the worker pool when one is given."""
+    if pool is None:
+        return handler(model, line)
+    try:
+        return pool.submit(line).result()
+    except Exception as e:
+        return _error_response(line, e)
+
+
+def serve_stream(model, infile, outfile, pool=None, handler=handle_request):
+    """
+    Serve NDJSON requests read from infile, one response line per request.
+
+    Without a pool requests are answered in order. With a pool they are
+    answered as workers finish, so callers should match responses by "id".
+    """
+    if pool is None:
+        for line in infile:
+            if not line.strip():
+                continue
+            outfile.write(json.dumps(handler(model, line)) + "\n")
+            outfile.flush()
+        return
+
+    write_lock = threading.Lock()
+
+    def write(line, future):
+        try:
+            response = future.result()
+        except Exception as e:
+            response = _error_response(line, e)
+        with write_lock:
+            outfile.write(json.dumps(response) + "\n")
+            outfile.flush()
+
+    for line in infile:
+        if not line.strip():
+            continue
+        # Blocks while the pool queue is full, which pushes back on the reader
+        future = pool.submit(line)
+        future.add_done_callback(lambda f, line=line: write(line, f))
+
+
+def serve_socket(model, socket_path, pool=None, handler=handle_request):
+    """Serve NDJSON requests on a local Unix socket until interrupted."""
+    class PredictionHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                line = raw.decode("utf-8")
+                if not line.strip():
+                    continue
+                response = json.dumps(_answer(model, pool, line, handler)) + "\n"
+                self.wfile.write(response.encode("utf-8"))
+                self.wfile.flush()
+
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        socket_path.unlink()
+
+    with socketserver.ThreadingUnixStreamServer(str(socket_path), PredictionHandler) as server:
+        print(json.dumps({"status": "ready", "socket": str(socket_path)}), file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def model_file(model_path=None, engine="sklearn"):
+    """Return the file whose change means the model on disk was replaced."""
+    if engine == "flat":
+        path = Path(model_path) if model_path else MODEL_VERSIONS_DIR
+        if not path.is_dir():
+            return path
+        from model_store import CURRENT_POINTER
+        if (path / CURRENT_POINTER).exists():
+            return path / CURRENT_POINTER
+        return path / "meta.json"
+    return Path(model_path) if model_path else MODEL_PATH
+
+
+def parse_precisions(spec):
+    """Parse 'name=step,name=step' into a dict of quantization steps."""
+    if not spec:
+        return None
+    precisions = {}
+    for pair in spec.split(","):
+        name, _, step = pair.partition("=")
+        precisions[name.strip()] = float(step)
+    return precisions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crop recommendation predictor")
+    parser.add_argument("input_json", nargs="?",
+                        help="Feature record as a JSON object, or a JSON array of records")
+    parser.add_argument("--input",
+                        help="Score a JSON array or NDJSON file of records ('-' for stdin), writing NDJSON results")
+    parser.add_argument("--serve", action="store_true",
+                        help="Keep the model loaded and answer NDJSON requests on stdin/stdout")
+    parser.add_argument("--socket", help="Serve NDJSON requests on this Unix socket path instead of stdin")
+    parser.add_argument("--model",
+                        help="Path to the joblib model or flat artifact (default depends on --engine)")
+    parser.add_argument("--engine", choices=["sklearn", "flat"], default="sklearn",
+                        help="Inference engine: the sklearn estimator or the compiled flat-array forest")
+    parser.add_argument("--top-k", type=int, default=0,
+                        help="Also return the k most likely crops with probabilities")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="Cache up to this many predictions keyed on quantized features (serving modes)")
+    parser.add_argument("--cache-ttl", type=float, default=None,
+                        help="Seconds a cached prediction stays valid")
+    parser.add_argument("--cache-precision",
+                        help="Quantization steps as name=step pairs, e.g. 'temperature=0.5,ph=0.1'")
+    parser.add_argument("--reload", action="store_true",
+                        help="Watch for retrained models and swap them in between requests (serving modes)")
+    parser.add_argument("--reload-interval", type=float, default=2.0,
+                        help="Seconds between checks for a new model version")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Serve through this many pre-forked single-threaded workers")
+    parser.add_argument("--max-queue", type=int, default=256,
+                        help="Maximum queued requests before the server applies backpressure")
+    parser.add_argument("--request-timeout", type=float, default=60.0,
+                        help="Seconds a pooled request may take before it fails and its worker is replaced")
+    return parser.parse_args(argv)
+
 
 def main():
-    # Load input data from command line argument
-    input_json = sys.argv[1]
-    data = json.loads(input_json)
-    
-    # Create a DataFrame with proper feature names (lowercase)
-    features = pd.DataFrame([[
-        data["n"], 
-        data["p"], 
-        data["k"], 
-        data["temperature"], 
-        data["humidity"], 
-        data["ph"], 
-        data["rainfall"]
-    ]], columns=['n', 'p', 'k', 'temperature', 'humidity', 'ph', 'rainfall'])
-    
-    # Get the absolute path to the model file
-    current_dir = Path(__file__).parent
-    model_path = current_dir / "trained_model.pkl"
-    
+    args = parse_args()
+
     try:
-        # Load model
-        model = joblib.load(model_path)
-        
-        # Predict
-        pred = model.predict(features)
-        
-        # Return prediction
-        print(json.dumps({"recommended_crop": pred[0]}))
-        
+        check_top_k(args.top_k)
+
+        if args.socket or args.serve:
+            model = load_serving_model(args.model, args.engine, args.reload, args.reload_interval)
+            cache = None
+            if args.cache_size > 0:
+                from prediction_cache import PredictionCache
+                cache = PredictionCache(
+                    max_size=args.cache_size,
+                    ttl=args.cache_ttl,
+                    precisions=parse_precisions(args.cache_precision),
+                    watch_path=model_file(args.model, args.engine)
+                )
+            handler = functools.partial(handle_request, top_k=args.top_k, cache=cache)
+
+            # With a pool each forked worker holds its own copy of the cache
+            pool = None
+            if args.workers > 0:
+                from worker_pool import PredictionPool
+                pool = PredictionPool(model, handler, args.workers, args.max_queue,
+                                      result_timeout=args.request_timeout)
+            try:
+                if args.socket:
+                    serve_socket(model, args.socket, pool, handler)
+                else:
+                    print(json.dumps({"status": "ready"}), file=sys.stderr, flush=True)
+                    serve_stream(model, sys.stdin, sys.stdout, pool, handler)
+            finally:
+                if pool is not None:
+                    pool.close()
+        elif args.input:
+            model = load_model(args.model, args.engine)
+            if args.input == "-":
+                records = read_records(sys.stdin)
+            else:
+                with open(args.input) as f:
+                    records = read_records(f)
+            for result in predict_batch(model, records, args.top_k):
+                print(json.dumps(result))
+        else:
+            model = load_model(args.model, args.engine)
+            # Load input data from command line argument
+            data = json.loads(args.input_json)
+
+            # Return prediction
+            if isinstance(data, list):
+                print(json.dumps(predict_batch(model, data, args.top_k)))
+            else:
+                print(json.dumps(predict_one(model, data, args.top_k)))
+
     except Exception as e:
         print(json.dumps({"error": str(e)}), file=sys.stderr)
         sys.exit(1)
 
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,159 @@
+import os
+import copy
+import time
+import threading
+from collections import OrderedDict
+
+# Quantization step per feature, in model feature order; readings closer
+# than one step share a key
+DEFAULT_PRECISIONS = {
+    'n': 1.0,
+    'p': 1.0,
+    'k': 1.0,
+    'temperature': 0.1,
+    'humidity': 0.5,
+    'ph': 0.05,
+    'rainfall': 1.0
+}
+
+
+class PredictionCache:
+    """
+    LRU/TTL cache of predictions keyed on quantized feature vectors.
+
+    IoT nodes resend near-identical readings every few seconds; snapping
+    each feature to a configurable step lets those snapshots share one
+    cached prediction. The cache is bounded (least recently used entries
+    are evicted first), entries optionally expire after `ttl` seconds, and
+    everything is dropped when the watched model file changes on disk or
+    a different model version starts serving.
+    """
+
+    def __init__(self, max_size=10000, ttl=None, precisions=None, watch_path=None,
+                 check_interval=1.0):
+        """
+        Args:
+            max_size (int): Maximum number of cached predictions
+            ttl (float): Seconds an entry stays valid; None never expires
+            precisions (dict): Quantization step per feature, merged over
+                DEFAULT_PRECISIONS
+            watch_path: Model file whose modification invalidates the cache
+            check_interval (float): Minimum seconds between model file checks
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        unknown = set(precisions or {}) - set(DEFAULT_PRECISIONS)
+        if unknown:
+            raise ValueError(f"Unknown features in precisions: {sorted(unknown)}")
+        self.precisions = {**DEFAULT_PRECISIONS, **(precisions or {})}
+        self._steps = list(self.precisions.values())
+        self.watch_path = watch_path
+        self.check_interval = check_interval
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._signature = self._file_signature()
+        self._version = None
+        self._last_check = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, values, top_k=0):
+        """
+        Quantized cache key for one feature row.
+
+        Args:
+            values: Feature values in model feature order
+            top_k (int): Requested ranking size, part of the key
+        """
+        return (int(top_k),) + tuple(
+            round(value / step) for value, step in zip(values, self._steps)
+        )
+
+    def get(self, key):
+        """Return the cached prediction for key, or None on a miss."""
+        with self._lock:
+            self._check_model_file()
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        Store a prediction, evicting the least recently used entry if full.
+
+        The cache keeps its own deep copy of the result and get() hands out
+        deep copies, so callers may modify what they receive, including the
+        nested top_crops list.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_version(self, version):
+        """Drop every cached prediction if the serving model version changed."""
+        if version == self._version:
+            return
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                if self._entries:
+                    self._entries.clear()
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop every cached prediction."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """Return size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def _file_signature(self):
+        if self.watch_path is None:
+            return None
+        try:
+            st = os.stat(self.watch_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _check_model_file(self):
+        """Clear the cache if the watched model file changed (lock held)."""
+        if self.watch_path is None:
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        signature = self._file_signature()
+        if signature != self._signature:
+            self._signature = signature
+            self._entries.clear()
+            self.invalidations += 1
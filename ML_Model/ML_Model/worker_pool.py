@@ -0,0 +1,334 @@
+import os
+import sys
+import time
+import queue
+import signal
+import threading
+import itertools
+import collections
+import multiprocessing as mp
+from multiprocessing.connection import Connection, wait
+from multiprocessing.reduction import send_handle, recv_handle
+from concurrent.futures import Future
+
+# Workers must inherit the already-loaded model, so the pool always forks
+_ctx = mp.get_context("fork")
+
+_STOP = None
+
+
+def _worker_loop(conn, model, func):
+    """Run in each worker: answer tasks from conn until told to stop."""
+    # One request per worker at a time; the pool provides the parallelism
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is _STOP:
+            break
+        request_id, payload = task
+        try:
+            message = ("ok", request_id, func(model, payload))
+        except Exception as e:
+            message = ("error", request_id, str(e))
+        # A synchronous pipe write: once send() returns the result reaches
+        # the parent even if this process dies right after
+        try:
+            conn.send(message)
+        except (TypeError, AttributeError, ValueError) as e:
+            conn.send(("error", request_id, f"Result could not be sent: {e}"))
+
+
+def _zygote_loop(control, model, func):
+    """
+    Run in the fork server: fork one worker per request on control.
+
+    The fork server is forked before the pool starts any threads and never
+    starts one itself, so workers forked from it, including replacements,
+    never inherit a lock held by another thread.
+    """
+    # Exited workers are reaped by the kernel
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        try:
+            request = control.recv()
+        except EOFError:
+            break
+        if request is _STOP:
+            break
+        parent_end, worker_end = _ctx.Pipe()
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            control.close()
+            parent_end.close()
+            code = 0
+            try:
+                _worker_loop(worker_end, model, func)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        worker_end.close()
+        send_handle(control, parent_end.fileno(), None)
+        control.send(pid)
+        parent_end.close()
+
+
+class PredictionPool:
+    """
+    Pool of pre-forked, single-threaded prediction workers.
+
+    The model is loaded once in the parent and shared with the workers
+    through copy-on-write fork. Workers are forked by a fork server that is
+    started before any pool thread, so replacements are as safe to fork as
+    the first workers. Requests wait in a bounded queue, so submit() blocks
+    (or raises queue.Full after `timeout`) when all workers are busy and
+    the queue is full.
+
+    The parent sends each worker one request at a time over its own pipe
+    and records which request it holds, so a worker that dies fails exactly
+    that request, and it is replaced. Requests without a result within
+    `result_timeout` seconds of submission fail with TimeoutError; a worker
+    stuck on one is killed and replaced.
+
+    Create the pool before starting other threads in the process.
+    """
+
+    def __init__(self, model, func, n_workers=None, max_queue=256, monitor_interval=0.5,
+                 result_timeout=60.0):
+        """
+        Args:
+            model: Loaded model shared with every worker
+            func: Callable (model, payload) -> result run inside the workers
+            n_workers (int): Number of worker processes (default: CPU count)
+            max_queue (int): Maximum number of queued requests
+            monitor_interval (float): Seconds between timeout checks
+            result_timeout (float): Seconds a request may take from
+                submission to result; None waits forever
+        """
+        self.model = model
+        self.func = func
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.monitor_interval = monitor_interval
+        self.result_timeout = result_timeout
+
+        self._queue = collections.deque()
+        self._futures = {}
+        self._deadlines = {}
+        # worker id -> request id it holds; set before the request is sent
+        self._assigned = {}
+        self._idle = []
+        self._conns = {}
+        self._pids = {}
+        self._cond = threading.Condition()
+        self._ids = itertools.count()
+        self._closed = threading.Event()
+        self.restarts = 0
+        self.timeouts = 0
+
+        control, zygote_end = _ctx.Pipe()
+        self._zygote = _ctx.Process(target=_zygote_loop, args=(zygote_end, model, func), daemon=True)
+        self._zygote.start()
+        zygote_end.close()
+        self._control = control
+
+        for worker_id in range(self.n_workers):
+            self._start_worker(worker_id)
+
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def _start_worker(self, worker_id):
+        """Have the fork server fork a worker and take over its pipe."""
+        self._control.send(worker_id)
+        conn = Connection(recv_handle(self._control))
+        self._pids[worker_id] = self._control.recv()
+        self._conns[worker_id] = conn
+        self._idle.append(worker_id)
+
+    def submit(self, payload, timeout=None):
+        """
+        Queue one request.
+
+        Args:
+            payload: Argument passed to func in a worker
+            timeout (float): Seconds to wait for queue space; None blocks
+
+        Returns:
+            Future: Resolves to the worker result
+
+        Raises:
+            queue.Full: The queue stayed full for `timeout` seconds
+        """
+        with self._cond:
+            if self._closed.is_set():
+                raise RuntimeError("PredictionPool is closed")
+            if not self._cond.wait_for(lambda: len(self._queue) < self.max_queue, timeout):
+                raise queue.Full
+            request_id = next(self._ids)
+            future = Future()
+            self._futures[request_id] = future
+            if self.result_timeout is not None:
+                self._deadlines[request_id] = time.monotonic() + self.result_timeout
+            self._queue.append((request_id, payload))
+            self._dispatch()
+        return future
+
+    def _dispatch(self):
+        """Send queued requests to idle workers (lock held)."""
+        while self._queue and self._idle:
+            worker_id = self._idle.pop()
+            request_id, payload = self._queue.popleft()
+            self._assigned[worker_id] = request_id
+            try:
+                self._conns[worker_id].send((request_id, payload))
+            except OSError:
+                # The worker is gone; the collector fails the request and replaces it
+                pass
+        self._cond.notify_all()
+
+    def _collect(self):
+        """Route worker results to their futures and replace dead workers."""
+        while True:
+            with self._cond:
+                if self._closed.is_set() and not self._futures:
+                    break
+                conns = {conn: worker_id for worker_id, conn in self._conns.items()}
+            for conn in wait(list(conns), timeout=self.monitor_interval):
+                worker_id = conns[conn]
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    self._replace(worker_id)
+                    continue
+                self._resolve(worker_id, message)
+            self._expire()
+
+    def _resolve(self, worker_id, message):
+        kind, request_id, value = message
+        with self._cond:
+            if self._assigned.get(worker_id) == request_id:
+                del self._assigned[worker_id]
+                self._idle.append(worker_id)
+            future = self._futures.pop(request_id, None)
+            self._deadlines.pop(request_id, None)
+            self._dispatch()
+        if future is None:
+            return
+        if kind == "ok":
+            future.set_result(value)
+        else:
+            future.set_exception(RuntimeError(value))
+
+    def _replace(self, worker_id):
+        """Fail the request a dead worker held and fork a replacement."""
+        with self._cond:
+            self._conns.pop(worker_id).close()
+            self._pids.pop(worker_id, None)
+            if worker_id in self._idle:
+                self._idle.remove(worker_id)
+            request_id = self._assigned.pop(worker_id, None)
+            future = self._futures.pop(request_id, None)
+            self._deadlines.pop(request_id, None)
+            if not self._closed.is_set():
+                try:
+                    self._start_worker(worker_id)
+                    self.restarts += 1
+                except (EOFError, OSError) as e:
+                    print(f"Could not replace worker {worker_id}: {e}", file=sys.stderr)
+            failed = []
+            if not self._conns:
+                # No worker left to serve the queue
+                failed = [self._futures.pop(request_id) for request_id, _ in self._queue]
+                self._queue.clear()
+                self._deadlines.clear()
+            self._dispatch()
+        if future is not None:
+            future.set_exception(RuntimeError(f"Worker {worker_id} exited while handling the request"))
+        for pending in failed:
+            pending.set_exception(RuntimeError("No prediction workers left"))
+
+    def _expire(self):
+        """Fail requests past their deadline and kill workers stuck on one."""
+        if self.result_timeout is None:
+            return
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            late = {request_id for request_id, deadline in self._deadlines.items() if deadline <= now}
+            if not late:
+                return
+            self._queue = collections.deque(task for task in self._queue if task[0] not in late)
+            for worker_id, request_id in list(self._assigned.items()):
+                if request_id in late:
+                    # The worker cannot be interrupted; its EOF triggers a replacement
+                    del self._assigned[worker_id]
+                    try:
+                        os.kill(self._pids[worker_id], signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+            for request_id in late:
+                self._deadlines.pop(request_id)
+                expired.append(self._futures.pop(request_id))
+            self.timeouts += len(expired)
+            self._cond.notify_all()
+        for future in expired:
+            future.set_exception(TimeoutError(f"No result within {self.result_timeout} seconds"))
+
+    def stats(self):
+        """Return pool size, pending request count, worker restarts and timeouts."""
+        with self._cond:
+            pending = len(self._futures)
+        return {"workers": self.n_workers, "pending": pending, "restarts": self.restarts,
+                "timeouts": self.timeouts}
+
+    def close(self, timeout=30.0):
+        """
+        Stop all workers after the queued requests are served.
+
+        Args:
+            timeout (float): Seconds to wait for queued and running
+                requests; workers still busy after that are killed and
+                their requests fail. None waits forever.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._collector.join(timeout)
+        if self._collector.is_alive():
+            # Each killed worker's EOF fails its request; the collector
+            # exits once no request is left
+            with self._cond:
+                pids = list(self._pids.values())
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            self._collector.join()
+        with self._cond:
+            for conn in self._conns.values():
+                try:
+                    conn.send(_STOP)
+                except OSError:
+                    pass
+                conn.close()
+            self._conns.clear()
+        self._control.send(_STOP)
+        self._control.close()
+        self._zygote.join(timeout)
+        if self._zygote.is_alive():
+            self._zygote.kill()
+            self._zygote.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,104 @@
+"""
+Import-time regression check
+----------------------------
+Times fresh interpreters importing the lightweight entry points and fails
+when one goes over its budget, e.g. because a heavy dependency (xarray,
+scikit-learn, matplotlib, ...) crept back into a module-level import.
+
+Budgets are in milliseconds on top of a bare `python -c pass`. Only the
+loaded-module checks run under pytest (tests/test_imports.py); timings
+vary too much between machines to gate the test suite on.
+
+Usage (from ML_Model/):
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --repeats 10 --output benchmarks/results/imports.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ML_DIR = Path(__file__).resolve().parent.parent
+
+# (name, import statement, budget in ms, modules that must stay unloaded)
+CHECKS = [
+    ("EO_Analysis package",
+     "import EO_Analysis",
+     20, ["numpy", "pandas", "xarray", "sklearn", "matplotlib"]),
+    ("DataValidator",
+     "from EO_Analysis import DataValidator",
+     50, ["numpy", "pandas", "xarray", "scipy", "sklearn", "matplotlib", "seaborn", "folium"]),
+    ("clean_time_series",
+     "from EO_Analysis import clean_time_series",
+     250, ["pandas", "xarray", "rasterio", "sklearn", "matplotlib", "seaborn", "folium"]),
+    ("predict.py (flat engine)",
+     "import sys; sys.path.insert(0, 'ML_Model'); import predict, forest_engine",
+     250, ["pandas", "sklearn", "joblib"]),
+]
+
+
+def time_import(code, repeats):
+    """Median wall time of a fresh interpreter running code, in ms."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ML_DIR, check=True, capture_output=True, text=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000.0
+
+
+def loaded_modules(code, modules):
+    """Return which of `modules` are in sys.modules after running code."""
+    probe = f"{code}; import sys, json; print(json.dumps([m for m in {modules!r} if m in sys.modules]))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ML_DIR, check=True,
+                         capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import times against their budgets")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    baseline = time_import("pass", args.repeats)
+    results = []
+    failed = False
+    for name, code, budget, forbidden in CHECKS:
+        try:
+            elapsed = time_import(code, args.repeats) - baseline
+            leaked = loaded_modules(code, forbidden)
+        except subprocess.CalledProcessError as e:
+            error = e.stderr.strip().splitlines()[-1] if e.stderr else str(e)
+            print(f"[FAIL] {name}: import failed ({error})")
+            results.append({"name": name, "budget_ms": budget, "error": error, "ok": False})
+            failed = True
+            continue
+        ok = elapsed <= budget and not leaked
+        failed = failed or not ok
+        results.append({
+            "name": name,
+            "import_ms": elapsed,
+            "budget_ms": budget,
+            "leaked_modules": leaked,
+            "ok": ok
+        })
+        status = "ok" if ok else "FAIL"
+        extra = f", loaded {', '.join(leaked)}" if leaked else ""
+        print(f"[{status}] {name}: {elapsed:.1f} ms (budget {budget} ms{extra})")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as f:
+            json.dump({"interpreter_ms": baseline, "checks": results}, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
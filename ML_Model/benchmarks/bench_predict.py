@@ -0,0 +1,274 @@
+"""
+Prediction latency and throughput benchmarks
+--------------------------------------------
+Measures predict.py and the trained model for each inference engine:
+
+- import time of the prediction stack
+- cold start of a one-shot `predict.py '<json>'` call
+- single-row p50/p99 latency, in process and through the --serve loop
+- batch throughput at 1/10/100/10k rows
+- peak RSS
+
+Inputs are synthetic rows sampled from data/cleanCrop_rec_DataSet.csv with
+a little seeded jitter. Results are written as JSON, stamped with the git
+commit, so runs can be compared across commits.
+
+Usage (from ML_Model/):
+    python benchmarks/bench_predict.py
+    python benchmarks/bench_predict.py --engines flat --output benchmarks/results/flat.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+ML_DIR = Path(__file__).resolve().parent.parent
+MODEL_DIR = ML_DIR / "ML_Model"
+PREDICT_SCRIPT = MODEL_DIR / "predict.py"
+DATA_PATH = ML_DIR / "data" / "cleanCrop_rec_DataSet.csv"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+FEATURES = ['n', 'p', 'k', 'temperature', 'humidity', 'ph', 'rainfall']
+BATCH_SIZES = [1, 10, 100, 10000]
+ENGINES = ["sklearn", "flat"]
+
+
+def synthetic_rows(n_rows, seed=0):
+    """Sample rows from the cleaned dataset and jitter each feature by 5% of its std."""
+    import csv
+    with open(DATA_PATH) as f:
+        data = np.array([[float(row[name]) for name in FEATURES] for row in csv.DictReader(f)])
+    rng = np.random.default_rng(seed)
+    rows = data[rng.integers(0, len(data), n_rows)]
+    rows = rows + rng.normal(0.0, 0.05, rows.shape) * data.std(axis=0)
+    return [dict(zip(FEATURES, row)) for row in rows.round(4).tolist()]
+
+
+def percentiles(samples_s):
+    """p50/p99/mean of a list of durations, in milliseconds."""
+    ms = np.asarray(samples_s) * 1000.0
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean())
+    }
+
+
+def rss_mb(ru_maxrss):
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return ru_maxrss / scale
+
+
+def time_subprocess(args, repeats):
+    """
+    Run a fresh interpreter `repeats` times.
+
+    Returns:
+        tuple: (wall times in seconds, largest peak RSS of those runs in MB)
+    """
+    samples = []
+    peak = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        proc = subprocess.Popen(args, cwd=MODEL_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # wait4 reports the resource usage of this child alone
+        _, status, usage = os.wait4(proc.pid, 0)
+        samples.append(time.perf_counter() - start)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, args)
+        peak = max(peak, rss_mb(usage.ru_maxrss))
+    return samples, peak
+
+
+def bench_imports(engine, repeats):
+    """Time a fresh interpreter importing what the engine needs to predict."""
+    code = "import predict"
+    if engine == "sklearn":
+        code += "; import joblib, pandas, sklearn.ensemble"
+    baseline, _ = time_subprocess([sys.executable, "-c", "pass"], repeats)
+    samples, _ = time_subprocess([sys.executable, "-W", "ignore", "-c", code], repeats)
+    return {
+        "interpreter_ms": percentiles(baseline)["p50_ms"],
+        "import_ms": percentiles(samples)["p50_ms"] - percentiles(baseline)["p50_ms"]
+    }
+
+
+def bench_cold_start(engine, row, repeats):
+    """Time one-shot `predict.py '<json>'` calls, as the old Node route made them."""
+    args = [sys.executable, "-W", "ignore", str(PREDICT_SCRIPT), "--engine", engine, json.dumps(row)]
+    samples, peak = time_subprocess(args, repeats)
+    result = percentiles(samples)
+    result["peak_rss_mb"] = peak
+    return result
+
+
+def bench_server(engine, rows, warmup=20):
+    """
+    Round-trip latency of single-row requests through predict.py --serve.
+
+    The first `warmup` requests are not timed; at least one request always is.
+    """
+    warmup = min(warmup, len(rows) - 1)
+    proc = subprocess.Popen(
+        [sys.executable, "-W", "ignore", str(PREDICT_SCRIPT), "--serve", "--engine", engine],
+        cwd=MODEL_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True
+    )
+    samples = []
+    try:
+        for i, row in enumerate(rows):
+            start = time.perf_counter()
+            proc.stdin.write(json.dumps({"id": i, **row}) + "\n")
+            proc.stdin.flush()
+            proc.stdout.readline()
+            if i >= warmup:
+                samples.append(time.perf_counter() - start)
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return percentiles(samples)
+
+
+def bench_in_process(engine, rows, single_iterations, batch_repeats):
+    """Single-row latency and batch throughput with the model already loaded."""
+    sys.path.insert(0, str(MODEL_DIR))
+    import warnings
+    warnings.filterwarnings("ignore")
+    from predict import load_model, predict_one, predict_batch
+
+    start = time.perf_counter()
+    model = load_model(engine=engine)
+    load_s = time.perf_counter() - start
+    if hasattr(model, "n_jobs"):
+        # Single rows are fastest without a thread pool; match the serving setup
+        model.n_jobs = 1
+
+    for row in rows[:20]:
+        predict_one(model, row)
+    samples = []
+    for row in rows[:single_iterations]:
+        start = time.perf_counter()
+        predict_one(model, row)
+        samples.append(time.perf_counter() - start)
+
+    batches = {}
+    for size in BATCH_SIZES:
+        batch = rows[:size]
+        timings = []
+        for _ in range(batch_repeats):
+            start = time.perf_counter()
+            predict_batch(model, batch)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        batches[str(size)] = {
+            "seconds": best,
+            "rows_per_second": size / best
+        }
+
+    return {
+        "model_load_ms": load_s * 1000.0,
+        "single_row": percentiles(samples),
+        "batch": batches,
+        "peak_rss_mb": rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ML_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_engine(engine, args):
+    """Run every benchmark for one engine."""
+    rows = synthetic_rows(max(BATCH_SIZES + [args.iterations]), seed=args.seed)
+
+    # In-process numbers run in a child so each engine gets its own RSS
+    child = subprocess.run(
+        [sys.executable, __file__, "--in-process", engine,
+         "--iterations", str(args.iterations), "--batch-repeats", str(args.batch_repeats),
+         "--seed", str(args.seed)],
+        capture_output=True, text=True, check=True
+    )
+    result = json.loads(child.stdout)
+    result["imports"] = bench_imports(engine, args.cold_repeats)
+    result["cold_start"] = bench_cold_start(engine, rows[0], args.cold_repeats)
+    result["server"] = bench_server(engine, rows[:args.iterations])
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark crop prediction latency and throughput")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--iterations", type=int, default=1000, help="Single-row requests to time")
+    parser.add_argument("--batch-repeats", type=int, default=5, help="Repeats per batch size (best is kept)")
+    parser.add_argument("--cold-repeats", type=int, default=5, help="Fresh interpreters per cold-start test")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--in-process", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    for name in ("iterations", "batch_repeats", "cold_repeats"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+    return args
+
+
+def main():
+    args = parse_args()
+
+    if args.in_process:
+        rows = synthetic_rows(max(BATCH_SIZES + [args.iterations]), seed=args.seed)
+        print(json.dumps(bench_in_process(args.in_process, rows, args.iterations, args.batch_repeats)))
+        return
+
+    commit = git_commit()
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "engines": {}
+    }
+    for engine in args.engines:
+        print(f"Benchmarking {engine} engine...", file=sys.stderr)
+        results["engines"][engine] = run_engine(engine, args)
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{commit or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for engine, result in results["engines"].items():
+        print(f"\n{engine}:")
+        print(f"  import: {result['imports']['import_ms']:.1f} ms, "
+              f"cold start p50: {result['cold_start']['p50_ms']:.1f} ms")
+        print(f"  single row p50/p99: {result['single_row']['p50_ms']:.3f} / "
+              f"{result['single_row']['p99_ms']:.3f} ms, "
+              f"server p50/p99: {result['server']['p50_ms']:.3f} / {result['server']['p99_ms']:.3f} ms")
+        for size, batch in result["batch"].items():
+            print(f"  batch {size:>5}: {batch['rows_per_second']:,.0f} rows/s")
+        print(f"  peak RSS: {result['peak_rss_mb']:.1f} MB (cold start {result['cold_start']['peak_rss_mb']:.1f} MB)")
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Spectral index benchmark
+------------------------
+Times NDVI + EVI + NDWI on a synthetic scene with the fused engine
+(EO_Analysis.utils.spectral, used by calculate_indices and
+VegetationAnalyzer) and with the previous per-index xarray expressions
+(kept below as legacy_indices), and reports the peak memory each allocates
+on top of the bands, in units of one band.
+
+A full 10980 x 10980 Sentinel-2 10 m scene needs about 2 GB just for four
+float32 bands, so the default is a 20 m scene (5490 x 5490).
+
+Usage (from ML_Model/):
+    python benchmarks/bench_spectral.py
+    python benchmarks/bench_spectral.py --size 10980 --output benchmarks/results/spectral.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ML_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ML_DIR))
+
+from EO_Analysis.utils.preprocessing import calculate_indices
+
+INDICES = ['NDVI', 'EVI', 'NDWI']
+
+
+def synthetic_scene(size, seed=0):
+    """Four float32 reflectance bands on a size x size grid."""
+    import xarray as xr
+    rng = np.random.default_rng(seed)
+    coords = {'y': np.arange(size), 'x': np.arange(size)}
+    bands = {}
+    for band, (low, high) in {'nir': (0.1, 0.6), 'red': (0.02, 0.3),
+                              'blue': (0.01, 0.2), 'swir': (0.05, 0.4)}.items():
+        bands[band] = (('y', 'x'), rng.uniform(low, high, (size, size)).astype(np.float32))
+    return xr.Dataset(bands, coords=coords)
+
+
+def legacy_indices(data):
+    """The per-index xarray expressions calculate_indices used before the fused engine."""
+    return {
+        'NDVI': (data.nir - data.red) / (data.nir + data.red),
+        'EVI': 2.5 * (data.nir - data.red) / (data.nir + 6 * data.red - 7.5 * data.blue + 1),
+        'NDWI': (data.nir - data.swir) / (data.nir + data.swir)
+    }
+
+
+def measure(func, data):
+    """Wall time and peak traced allocation of one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(data)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spectral index computation")
+    parser.add_argument("--size", type=int, default=5490, help="Scene width and height in pixels")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    data = synthetic_scene(args.size)
+    band_bytes = data.nir.nbytes
+
+    legacy_s, legacy_peak, expected = measure(legacy_indices, data)
+    expected = {name: array.values for name, array in expected.items()}
+    fused_s, fused_peak, result = measure(lambda d: calculate_indices(d, INDICES), data)
+
+    max_error = max(float(np.nanmax(np.abs(result[name].values - expected[name]))) for name in INDICES)
+    results = {
+        "size": args.size,
+        "legacy_seconds": legacy_s,
+        "fused_seconds": fused_s,
+        "legacy_peak_bands": legacy_peak / band_bytes,
+        "fused_peak_bands": fused_peak / band_bytes,
+        "max_abs_difference": max_error
+    }
+    print(f"legacy: {legacy_s:.2f}s, peak {results['legacy_peak_bands']:.1f} bands")
+    print(f"fused:  {fused_s:.2f}s, peak {results['fused_peak_bands']:.1f} bands")
+    print(f"max |difference|: {max_error:.2e}")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
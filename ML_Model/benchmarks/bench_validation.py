@@ -0,0 +1,121 @@
+"""
+Sensor validation benchmark
+---------------------------
+Times DataValidator.validate_sensor_data (the rule-based engine behind
+validate_temperature_data, validate_humidity_data and
+validate_rainfall_data) against the previous per-type methods, which
+filtered the frame with boolean masks (kept below as legacy_validate), on a
+synthetic minute-resolution sensor log with out-of-range readings and
+repeated timestamps, and checks that both report the same issues.
+
+The default log has 50M rows, which takes about 1.6 GB plus the legacy
+methods' filtered copies; use --rows on smaller machines.
+
+Usage (from ML_Model/):
+    python benchmarks/bench_validation.py
+    python benchmarks/bench_validation.py --rows 5000000 --output benchmarks/results/validation.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ML_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ML_DIR))
+
+from EO_Analysis.utils.validation import DataValidator
+
+DATA_TYPES = ['temperature', 'humidity', 'rainfall']
+
+
+def synthetic_log(n_rows, seed=0, invalid=0.001, duplicates=0.0005):
+    """Sorted minute readings with a few out-of-range values and repeated timestamps."""
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(n_rows, dtype=np.int64)
+    minutes[rng.integers(1, n_rows, int(n_rows * duplicates))] -= 1
+    minutes = np.maximum.accumulate(minutes)
+    df = pd.DataFrame({
+        'timestamp': np.datetime64('2020-01-01', 'ns') + minutes.astype('timedelta64[m]'),
+        'temperature': rng.normal(22.0, 8.0, n_rows),
+        'relative_humidity': rng.uniform(10.0, 100.0, n_rows),
+        'precipitation': rng.exponential(4.0, n_rows)
+    })
+    n_bad = int(n_rows * invalid)
+    df.loc[rng.integers(0, n_rows, n_bad), 'temperature'] = 75.0
+    df.loc[rng.integers(0, n_rows, n_bad), 'relative_humidity'] = 104.0
+    df.loc[rng.integers(0, n_rows, n_bad), 'precipitation'] = -1.0
+    return df
+
+
+def legacy_validate(validator, data, data_type):
+    """The checks the per-type methods ran before the rule engine, in non-strict mode."""
+    column = validator.required_columns[data_type][1]
+    low, high = getattr(validator, f"{data_type}_range")
+    issues = []
+    if not pd.api.types.is_datetime64_any_dtype(data['timestamp']):
+        issues.append("timestamp column must be datetime type")
+    if not pd.api.types.is_numeric_dtype(data[column]):
+        issues.append(f"{column} column must be numeric type")
+    invalid = data[(data[column] < low) | (data[column] > high)]
+    if not invalid.empty:
+        issues.append(f"{data_type.capitalize()} values outside valid range {(low, high)}")
+    if data_type == 'temperature':
+        duplicates = data[data.duplicated(['timestamp'])]
+        if not duplicates.empty:
+            issues.append("Duplicate timestamps found")
+    if data_type == 'rainfall':
+        negative = data[data[column] < 0]
+        if not negative.empty:
+            issues.append("Negative rainfall values found")
+    return {'valid': len(issues) == 0, 'issues': issues}
+
+
+def timed(func, repeats):
+    """Best wall time of repeated calls and the last result."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sensor data validation")
+    parser.add_argument("--rows", type=int, default=50_000_000, help="Rows in the synthetic log")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    data = synthetic_log(args.rows)
+    validator = DataValidator()
+    results = {"rows": args.rows}
+
+    for data_type in DATA_TYPES:
+        legacy_s, expected = timed(lambda: legacy_validate(validator, data, data_type), args.repeats)
+        engine_s, result = timed(lambda: validator.validate_sensor_data(data, data_type, strict=False),
+                                 args.repeats)
+        if result['issues'] != expected['issues']:
+            raise AssertionError(f"{data_type}: {result['issues']} != {expected['issues']}")
+        results[data_type] = {
+            "legacy_seconds": legacy_s,
+            "engine_seconds": engine_s,
+            "counts": result['counts']
+        }
+        print(f"{data_type:<12} legacy {legacy_s:.2f}s  engine {engine_s:.2f}s  "
+              f"({legacy_s / engine_s:.1f}x)  {result['counts']}")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Data cleaning benchmark
+-----------------------
+Times clean_dataframe() against the previous column-by-column cleaning
+(kept below as legacy_clean) on a synthetic sensor dataset with missing
+values, duplicate rows and outliers, and checks that both produce the
+same frame.
+
+Usage (from ML_Model/):
+    python benchmarks/bench_wrangling.py
+    python benchmarks/bench_wrangling.py --rows 1000000 --repeats 3
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ML_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ML_DIR / "Data Wrangling"))
+
+from DataWrangling import clean_dataframe
+
+FEATURES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+CROPS = ['rice', 'maize', 'chickpea', 'kidneybeans', 'pigeonpeas', 'mothbeans', 'mungbean',
+         'blackgram', 'lentil', 'pomegranate', 'banana', 'mango', 'grapes', 'watermelon',
+         'muskmelon', 'apple', 'orange', 'papaya', 'coconut', 'cotton', 'jute', 'coffee']
+
+
+def synthetic_frame(n_rows, seed=0, missing=0.01, duplicates=0.05):
+    """Crop-like rows with missing readings, repeated rows and heavy tails."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'N': rng.integers(0, 140, n_rows),
+        'P': rng.integers(5, 145, n_rows),
+        'K': rng.integers(5, 205, n_rows),
+        'temperature': rng.normal(25.6, 5.0, n_rows),
+        'humidity': rng.uniform(14.0, 100.0, n_rows),
+        'ph': rng.normal(6.5, 0.8, n_rows),
+        'rainfall': rng.lognormal(4.5, 0.5, n_rows),
+        'label': pd.Categorical.from_codes(rng.integers(0, len(CROPS), n_rows), CROPS).astype(str)
+    })
+    n_dupes = int(n_rows * duplicates)
+    df.iloc[rng.integers(0, n_rows, n_dupes)] = df.iloc[rng.integers(0, n_rows, n_dupes)].to_numpy()
+    for col in ['temperature', 'humidity', 'ph', 'rainfall']:
+        df.loc[rng.random(n_rows) < missing, col] = np.nan
+    return df
+
+
+def legacy_clean(df):
+    """The per-column cleaning load_and_clean_data used before clean_dataframe."""
+    df.isnull().sum()
+    numerical_columns = df.select_dtypes(include=[np.number]).columns
+    for col in numerical_columns:
+        df[col] = df[col].fillna(df[col].median())
+    categorical_columns = [col for col in df.columns if col not in numerical_columns]
+    for col in categorical_columns:
+        df[col] = df[col].fillna(df[col].mode()[0])
+    df = df.drop_duplicates()
+    for col in numerical_columns:
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        df[col] = df[col].clip(lower=Q1 - 1.5 * IQR, upper=Q3 + 1.5 * IQR)
+    df.columns = df.columns.str.lower().str.replace(' ', '_')
+    df.isnull().sum()
+    return df
+
+
+def best_time(func, df, repeats):
+    timings = []
+    for _ in range(repeats):
+        frame = df.copy()
+        start = time.perf_counter()
+        result = func(frame)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data cleaning step")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per implementation (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} rows...", file=sys.stderr)
+    df = synthetic_frame(args.rows, seed=args.seed)
+
+    legacy_s, expected = best_time(legacy_clean, df, args.repeats)
+    vectorized_s, (cleaned, report) = best_time(clean_dataframe, df, args.repeats)
+
+    same = cleaned.equals(expected)
+    results = {
+        "rows": args.rows,
+        "legacy_seconds": legacy_s,
+        "vectorized_seconds": vectorized_s,
+        "speedup": legacy_s / vectorized_s,
+        "outputs_match": same,
+        "duplicates_removed": report["duplicates_removed"]
+    }
+    print(f"legacy:     {legacy_s:.2f}s")
+    print(f"vectorized: {vectorized_s:.2f}s ({results['speedup']:.2f}x)")
+    print(f"outputs match: {same}")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
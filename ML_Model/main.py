@@ -1,4 +1,7 @@
 import sys
+import json
+import time
+import argparse
 from pathlib import Path
 import logging
 from datetime import datetime
@@ -12,9 +15,18 @@ sys.path.append(str(Path(__file__).parent / 'Analyze Data'))
 sys.path.append(str(Path(__file__).parent / 'ML_Model'))
  
 # Import our custom modules
-from DataWrangling import load_and_clean_data
+from DataWrangling import load_and_clean_data, print_cleaning_report
 from AnalyzeData import analyze_data
-from mode import crop_recommendation_model, test_model
+from crop_stats import update_crop_stats
+from mode import (crop_recommendation_model, test_model, append_labelled_rows, incremental_update,
+                  MODEL_PATH, BEST_PARAMS_PATH, LABELLED_ROWS_PATH)
+from pipeline import Stage, PipelineRunner
+
+CODE_DIR = Path(__file__).parent
+INPUT_FILE = Path("data/Crop_recommendation (2).csv")
+CLEANED_FILE = Path("data/cleanCrop_rec_DataSet.csv")
+ANALYSIS_DIR = Path("analysis_results")
+RESULTS_DIR = Path("model_results")
 
 def setup_logging():
     """Set up logging configuration"""
@@ -54,35 +66,96 @@ def print_example_predictions():
         print(f"Input: {features}")
         print(f"  True Crop: {y_test[i]}, Predicted Crop: {y_pred[i]}")
 
+def wrangle():
+    report = load_and_clean_data(INPUT_FILE, CLEANED_FILE)
+    if report is None:
+        raise RuntimeError("Data wrangling failed")
+    print_cleaning_report(report)
+
+def analyze():
+    # analyze_data reports its own errors; fail the stage so it is not cached
+    if not analyze_data(CLEANED_FILE, labelled_rows=LABELLED_ROWS_PATH):
+        raise RuntimeError("Data analysis failed")
+
+def train():
+    params = None
+    if BEST_PARAMS_PATH.exists():
+        with open(BEST_PARAMS_PATH) as f:
+            params = json.load(f)
+    crop_recommendation_model(params)
+
+def evaluate():
+    test_model()
+    print_example_predictions()
+
+def build_pipeline():
+    """The wrangling -> analysis -> training -> testing stages and their files."""
+    return PipelineRunner([
+        Stage("wrangling", wrangle,
+              inputs=[INPUT_FILE, CODE_DIR / "Data Wrangling"],
+              outputs=[CLEANED_FILE]),
+        Stage("analysis", analyze,
+              inputs=[CLEANED_FILE, LABELLED_ROWS_PATH, CODE_DIR / "Analyze Data"],
+              outputs=[ANALYSIS_DIR],
+              deps=["wrangling"]),
+        Stage("training", train,
+              inputs=[CLEANED_FILE, LABELLED_ROWS_PATH, BEST_PARAMS_PATH, CODE_DIR / "ML_Model" / "mode.py",
+                      CODE_DIR / "ML_Model" / "forest_engine.py", CODE_DIR / "ML_Model" / "model_store.py"],
+              outputs=[MODEL_PATH, RESULTS_DIR / "test_data.npz"],
+              deps=["wrangling"]),
+        Stage("testing", evaluate,
+              inputs=[MODEL_PATH, RESULTS_DIR / "test_data.npz", CODE_DIR / "ML_Model" / "mode.py"],
+              outputs=[RESULTS_DIR / "test_report.txt", RESULTS_DIR / "confusion_matrix.png"],
+              deps=["training"]),
+    ])
+
+def run_incremental(new_data, pipeline, logger):
+    """
+    Add newly labelled rows without rerunning the whole pipeline.
+
+    Wrangling and analysis come from the stage cache unless their inputs
+    changed; the per-crop statistics and the model are updated with just
+    the new rows instead of being rebuilt, and testing reruns on the
+    updated model.
+
+    The new rows change the analysis and training fingerprints. Training,
+    if it was up to date before the update, is recorded as up to date
+    afterwards, so the next full run keeps the warm-started model instead
+    of retraining from scratch. Analysis is not recorded: only its crop
+    statistics were updated here, so the next full run reruns it and
+    redraws any plot that changed.
+    """
+    pipeline.run(only=["wrangling", "analysis"])
+    training_current = pipeline.is_current("training")
+
+    logger.info(f"Adding labelled rows from {new_data}...")
+    start = time.perf_counter()
+    rows = append_labelled_rows(new_data, data_path=CLEANED_FILE)
+    update_crop_stats(rows, ANALYSIS_DIR / "crop_stats.json", ANALYSIS_DIR / "crop_statistics.csv")
+    incremental_update()
+    if training_current:
+        pipeline.record("training")
+    logger.info(f"Incremental update completed in {time.perf_counter() - start:.2f}s")
+
+    pipeline.run(only=["testing"])
+
 def main():
     """Main function to orchestrate the entire workflow"""
+    parser = argparse.ArgumentParser(description="Crop recommendation pipeline")
+    parser.add_argument("--new-data", help="CSV of newly labelled rows; updates the model incrementally")
+    parser.add_argument("--force", nargs="*", metavar="STAGE",
+                        help="Rerun these stages (all if none given) even when cached")
+    args = parser.parse_args()
+    force = True if args.force == [] else (args.force or ())
+
     logger = setup_logging()
     
     try:
-        # Define file paths
-        input_file = Path("data/Crop_recommendation (2).csv")
-        cleaned_file = Path("data/cleanCrop_rec_DataSet.csv")
-        
-        # Step 1: Data Wrangling
-        logger.info("Starting data wrangling process...")
-        load_and_clean_data(input_file, cleaned_file)
-        logger.info("Data wrangling completed successfully!")
-        
-        # Step 2: Data Analysis
-        logger.info("Starting data analysis...")
-        analyze_data(cleaned_file)
-        logger.info("Data analysis completed successfully!")
-        
-        # Step 3: Model Training
-        logger.info("Starting model training...")
-        model, X_test, y_test = crop_recommendation_model()
-        logger.info("Model training completed successfully!")
-        
-        # Step 4: Model Testing and Output
-        logger.info("Testing the trained model and saving results...")
-        test_model()
-        print_example_predictions()
-        
+        pipeline = build_pipeline()
+        if args.new_data:
+            run_incremental(args.new_data, pipeline, logger)
+        else:
+            pipeline.run(force=force)
         logger.info("All processes completed successfully!")
         
     except FileNotFoundError as e:
@@ -0,0 +1,221 @@
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """
+    One pipeline step with the files it reads and writes.
+
+    Args:
+        name (str): Stage name, used in logs and for dependencies
+        func: Callable run with no arguments
+        inputs (list): Files or directories the stage reads, including its
+            code; missing ones are fingerprinted as absent, so optional
+            inputs are allowed
+        outputs (list): Files or directories the stage writes
+        params (dict): JSON-serializable parameters that affect the result
+        deps (list): Names of stages that must run first
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), params=None, deps=()):
+        self.name = name
+        self.func = func
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.params = params or {}
+        self.deps = list(deps)
+
+
+class PipelineRunner:
+    """
+    Runs stages in dependency order and skips those whose inputs are unchanged.
+
+    A stage's fingerprint hashes its parameters and the contents of its
+    input files, which should include the code the stage runs. When the fingerprint matches
+    the one recorded after the stage last succeeded, and its outputs are
+    still exactly as that run left them, the stage is a cache hit and its
+    existing outputs are reused. Because inputs are hashed by content, a
+    stage that reruns but writes identical files does not invalidate the
+    stages after it.
+
+    File digests are remembered by (size, mtime), so unchanged files are
+    not re-read on every run.
+    """
+
+    def __init__(self, stages, state_path=Path(".pipeline_cache.json")):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = Path(state_path)
+        self.state = self._load_state()
+        self.timings = {}
+
+    def run(self, only=None, force=()):
+        """
+        Run the pipeline.
+
+        Args:
+            only (list): Stage names to consider (default: all); dependencies
+                outside this list are not run
+            force: Stage names to run even on a cache hit, or True for all
+
+        Returns:
+            dict: Stage name -> {"cached": bool, "seconds": float}
+        """
+        for name in self._order():
+            if only is not None and name not in only:
+                continue
+            stage = self.stages[name]
+            fingerprint = self._fingerprint(stage)
+            forced = force is True or name in force
+            if not forced and self._is_cached(stage, fingerprint):
+                self.timings[name] = {"cached": True, "seconds": 0.0}
+                logger.info(f"[{name}] cache hit ({fingerprint[:12]}), skipped")
+                continue
+
+            logger.info(f"[{name}] running{' (forced)' if forced else ''}...")
+            start = time.perf_counter()
+            stage.func()
+            elapsed = time.perf_counter() - start
+
+            missing = [str(p) for p in stage.outputs if not p.exists()]
+            if missing:
+                raise RuntimeError(f"Stage {name} did not produce {missing}")
+            self.timings[name] = {"cached": False, "seconds": elapsed}
+            logger.info(f"[{name}] finished in {elapsed:.2f}s")
+
+            # Inputs written by earlier stages in this run are re-hashed here
+            self.record(name)
+
+        self._log_summary()
+        return self.timings
+
+    def is_current(self, name):
+        """True if the stage would be a cache hit now."""
+        stage = self.stages[name]
+        return self._is_cached(stage, self._fingerprint(stage))
+
+    def record(self, name):
+        """
+        Record the stage's current inputs and outputs as up to date.
+
+        run() calls this after a stage succeeds. Call it directly after
+        updating a stage's outputs outside the pipeline in a way equivalent
+        to rerunning it (e.g. an incremental model update), so the next run
+        does not redo the work.
+        """
+        stage = self.stages[name]
+        self.state["stages"][name] = {
+            "fingerprint": self._fingerprint(stage),
+            "outputs": self._output_signatures(stage)
+        }
+        self._save_state()
+
+    def _order(self):
+        """Stage names in dependency order; raises ValueError on cycles."""
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a dependency cycle at stage {name}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown pipeline stage: {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _fingerprint(self, stage):
+        digest = hashlib.sha256()
+        digest.update(stage.name.encode())
+        digest.update(json.dumps(stage.params, sort_keys=True, default=str).encode())
+        for path in stage.inputs:
+            digest.update(str(path).encode())
+            digest.update(self._path_digest(path).encode())
+        return digest.hexdigest()
+
+    def _is_cached(self, stage, fingerprint):
+        recorded = self.state["stages"].get(stage.name)
+        return (
+            recorded is not None
+            and recorded["fingerprint"] == fingerprint
+            and recorded["outputs"] == self._output_signatures(stage)
+        )
+
+    def _path_digest(self, path):
+        """Content digest of a file, or of every file under a directory."""
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for child in sorted(p for p in path.rglob("*") if p.is_file() and "__pycache__" not in p.parts):
+                digest.update(str(child.relative_to(path)).encode())
+                digest.update(self._file_digest(child).encode())
+            return digest.hexdigest()
+        if not path.exists():
+            return "missing"
+        return self._file_digest(path)
+
+    def _file_digest(self, path):
+        st = path.stat()
+        key = str(path.resolve())
+        cached = self.state["files"].get(key)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha256"]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.state["files"][key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest.hexdigest()}
+        return digest.hexdigest()
+
+    def _output_signatures(self, stage):
+        """Cheap (size, mtime) signatures that detect outputs changed or removed since the run."""
+        signatures = {}
+        for path in stage.outputs:
+            files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+            for f in files:
+                if f.exists():
+                    st = f.stat()
+                    signatures[str(f)] = [st.st_size, st.st_mtime_ns]
+                else:
+                    signatures[str(f)] = None
+        return signatures
+
+    def _load_state(self):
+        if self.state_path.exists():
+            try:
+                with open(self.state_path) as f:
+                    state = json.load(f)
+                if "stages" in state and "files" in state:
+                    return state
+            except (OSError, ValueError):
+                logger.warning(f"Ignoring unreadable pipeline cache {self.state_path}")
+        return {"stages": {}, "files": {}}
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        tmp_path.replace(self.state_path)
+
+    def _log_summary(self):
+        if not self.timings:
+            return
+        ran = sum(t["seconds"] for t in self.timings.values())
+        hits = sum(t["cached"] for t in self.timings.values())
+        parts = ", ".join(
+            f"{name}: " + ("cached" if t["cached"] else f"{t['seconds']:.2f}s")
+            for name, t in self.timings.items()
+        )
+        logger.info(f"Pipeline: {hits}/{len(self.timings)} stages cached, {ran:.2f}s of work ({parts})")
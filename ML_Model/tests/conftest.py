@@ -0,0 +1,58 @@
+"""
+Shared fixtures for the ML_Model tests.
+
+The scripts import their siblings by bare module name (main.py puts these
+directories on sys.path), so the tests do the same.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ML_DIR = Path(__file__).resolve().parent.parent
+for directory in (ML_DIR, ML_DIR / "ML_Model", ML_DIR / "Data Wrangling", ML_DIR / "Analyze Data"):
+    if str(directory) not in sys.path:
+        sys.path.insert(0, str(directory))
+
+FEATURES = ['n', 'p', 'k', 'temperature', 'humidity', 'ph', 'rainfall']
+CROPS = ['apple', 'banana', 'maize', 'rice']
+
+
+def make_crop_frame(n_rows=400, seed=0):
+    """Small labelled dataset in the layout of data/Crop_recommendation.csv."""
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, len(CROPS), n_rows)
+    df = pd.DataFrame({
+        'n': rng.integers(0, 140, n_rows) + labels * 10,
+        'p': rng.integers(5, 145, n_rows),
+        'k': rng.integers(5, 205, n_rows),
+        'temperature': rng.normal(20 + labels * 3, 2.0),
+        'humidity': rng.uniform(14.0, 100.0, n_rows),
+        'ph': rng.normal(6.5, 0.8, n_rows),
+        'rainfall': rng.normal(60 + labels * 40, 10.0),
+    })
+    df['label'] = np.asarray(CROPS)[labels]
+    return df
+
+
+@pytest.fixture(scope="session")
+def crop_frame():
+    return make_crop_frame()
+
+
+@pytest.fixture(scope="session")
+def forest(crop_frame):
+    """Small fitted RandomForestClassifier on plain arrays."""
+    from sklearn.ensemble import RandomForestClassifier
+    model = RandomForestClassifier(n_estimators=12, max_depth=8, random_state=0)
+    model.fit(crop_frame[FEATURES].to_numpy(dtype=float), crop_frame['label'])
+    return model
+
+
+@pytest.fixture
+def record(crop_frame):
+    """One feature record as predict.py receives it."""
+    return {name: float(crop_frame[name].iloc[0]) for name in FEATURES}
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import CROPS, FEATURES, make_crop_frame
+from crop_stats import CropStats
+
+
+def test_crop_stats_match_groupby(crop_frame):
+    expected = crop_frame.groupby('label')[FEATURES].agg(['mean', 'std', 'min', 'max'])
+    pd.testing.assert_frame_equal(CropStats.from_frame(crop_frame).to_frame(), expected,
+                                  check_exact=False, rtol=1e-9)
+
+
+def test_merged_partitions_equal_one_pass(crop_frame, tmp_path):
+    whole = CropStats.from_frame(crop_frame)
+    # Partitions see the crops in different orders
+    merged = CropStats.from_frame(crop_frame.iloc[:150])
+    merged.merge(CropStats.from_frame(crop_frame.iloc[150:].iloc[::-1]))
+
+    merged.save(tmp_path / "crop_stats.json")
+    loaded = CropStats.load(tmp_path / "crop_stats.json")
+    pd.testing.assert_frame_equal(loaded.to_frame(), whole.to_frame(), check_exact=False, rtol=1e-9)
+    assert loaded.ideal_values() == whole.ideal_values()
+
+
+def test_out_of_range_flags_only_known_crops(crop_frame):
+    stats = CropStats.from_frame(crop_frame)
+    batch = pd.DataFrame([
+        {**crop_frame.iloc[0][FEATURES].to_dict(), 'label': crop_frame['label'].iloc[0]},
+        {**crop_frame.iloc[0][FEATURES].to_dict(), 'rainfall': 1e6, 'label': crop_frame['label'].iloc[0]},
+        {**crop_frame.iloc[0][FEATURES].to_dict(), 'rainfall': 1e6, 'label': 'coffee'},
+    ])
+    assert stats.out_of_range(batch)['rainfall'].tolist() == [False, True, False]
+
+
+def test_stratified_sample_caps_every_class_and_keeps_row_order():
+    from AnalyzeData import stratified_sample
+
+    df = make_crop_frame(400, seed=4)
+    df = pd.concat([df, df.iloc[:3].assign(label='coffee')], ignore_index=True)
+    sample = stratified_sample(df, per_class=20)
+
+    counts = sample['label'].value_counts()
+    assert (counts[CROPS] == 20).all()
+    assert counts['coffee'] == 3
+    assert sample.index.is_monotonic_increasing
+
+
+def test_histogram_counts_match_numpy(crop_frame):
+    from AnalyzeData import histogram_counts
+
+    counts = histogram_counts(crop_frame, ['rainfall'], bins=10)
+    edges = np.histogram_bin_edges(crop_frame['rainfall'], bins=10)
+    for crop in CROPS:
+        expected, _ = np.histogram(crop_frame.loc[crop_frame['label'] == crop, 'rainfall'], bins=edges)
+        np.testing.assert_array_equal(counts.loc[counts['label'] == crop, 'count'], expected)
+
+
+def test_unchanged_plots_are_skipped(crop_frame, tmp_path):
+    pytest.importorskip("seaborn")
+    from render_scheduler import PlotJob, render_plots
+
+    jobs = [PlotJob('class_distribution', 'plot_class_distribution', 'class_distribution.png', ['label'])]
+    first = render_plots(crop_frame, jobs, tmp_path, n_workers=1)
+    assert list(first['rendered']) == ['class_distribution.png']
+    assert render_plots(crop_frame, jobs, tmp_path, n_workers=1)['skipped'] == ['class_distribution.png']
+
+    # Other columns do not matter; the label column does
+    changed = crop_frame.assign(rainfall=0.0)
+    assert render_plots(changed, jobs, tmp_path, n_workers=1)['skipped'] == ['class_distribution.png']
+    relabelled = crop_frame.assign(label=crop_frame['label'].iloc[::-1].to_numpy())
+    assert list(render_plots(relabelled, jobs, tmp_path, n_workers=1)['rendered']) == ['class_distribution.png']
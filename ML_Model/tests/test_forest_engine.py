@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import forest_engine
+from forest_engine import FlatForest
+
+from conftest import FEATURES, make_crop_frame
+
+
+@pytest.fixture(scope="module")
+def rows():
+    # Extra rows so batches cover more than one traversal and accumulation block
+    return make_crop_frame(n_rows=1100, seed=1)[FEATURES].to_numpy(dtype=float)
+
+
+@pytest.mark.parametrize("n_rows", [1, forest_engine._SMALL_BATCH_ROWS, forest_engine._SMALL_BATCH_ROWS + 1,
+                                    forest_engine._TRAVERSAL_BLOCK_ROWS + 1,
+                                    forest_engine._ACCUMULATE_BLOCK_ROWS + 1, 1100])
+def test_flat_forest_matches_sklearn_exactly(forest, rows, n_rows):
+    flat = FlatForest.from_sklearn(forest)
+    X = rows[:n_rows]
+    np.testing.assert_array_equal(flat.predict_proba(X), forest.predict_proba(X))
+    np.testing.assert_array_equal(flat.predict(X), forest.predict(X))
+
+
+def test_single_record_is_one_row(forest, rows):
+    flat = FlatForest.from_sklearn(forest)
+    assert flat.predict(rows[0]).shape == (1,)
+
+
+def test_artifact_round_trip_is_memory_mapped(forest, rows, tmp_path):
+    flat = FlatForest.from_sklearn(forest)
+    flat.version = "v1"
+    flat.save(tmp_path / "v1")
+
+    loaded = FlatForest.load(tmp_path / "v1")
+    assert isinstance(loaded.value, np.memmap)
+    assert loaded.version == "v1"
+    np.testing.assert_array_equal(loaded.classes_, forest.classes_)
+    np.testing.assert_array_equal(loaded.predict_proba(rows), forest.predict_proba(rows))
+
+
+def test_flat_engine_serves_the_current_version(forest, rows, tmp_path):
+    from model_store import write_current
+    from predict import load_model
+
+    FlatForest.from_sklearn(forest).save(tmp_path / "v1")
+    write_current(tmp_path, "v1")
+
+    model = load_model(tmp_path, engine="flat")
+    np.testing.assert_array_equal(model.predict(rows), forest.predict(rows))
+
+
+def test_published_version_is_written_to_the_pickle(forest, tmp_path):
+    import copy
+    import joblib
+    from mode import publish_model
+    from predict import load_model
+
+    model_path = tmp_path / "trained_model.pkl"
+    versions_dir = tmp_path / "model_versions"
+    publish_model(copy.deepcopy(forest), model_path, versions_dir, version="initial")
+
+    assert joblib.load(model_path).model_version_ == "initial"
+    assert load_model(versions_dir, engine="flat").version == "initial"
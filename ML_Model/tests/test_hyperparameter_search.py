@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from conftest import FEATURES, make_crop_frame
+from forest_engine import FlatForest
+from hyperparameter_search import (
+    measure_latency, pareto_ranks, select_model, successive_halving_search
+)
+
+
+def test_select_model_returns_the_searched_parameters():
+    results = pd.DataFrame([
+        {'rung': 1, 'n_estimators': 10, 'max_depth': np.nan, 'accuracy': 0.9, 'single_row_us': 50.0},
+        {'rung': 1, 'n_estimators': 50, 'max_depth': 8.0, 'accuracy': 0.95, 'single_row_us': 200.0},
+        {'rung': 0, 'n_estimators': 5, 'max_depth': 2.0, 'accuracy': 0.99, 'single_row_us': 1.0},
+    ])
+    space = {'n_estimators': [10, 50], 'max_depth': [None, 8]}
+
+    params, _ = select_model(results, search_space=space)
+    assert params == {'n_estimators': 50, 'max_depth': 8}
+
+    params, _ = select_model(results, max_latency_us=100, search_space=space)
+    assert params == {'n_estimators': 10, 'max_depth': None}
+
+
+def test_pareto_front_keeps_fast_and_accurate_models():
+    results = [
+        {'accuracy': 0.95, 'single_row_us': 200.0},
+        {'accuracy': 0.90, 'single_row_us': 50.0},
+        {'accuracy': 0.85, 'single_row_us': 100.0},
+    ]
+    assert pareto_ranks(results) == [0, 0, 1]
+
+
+def test_latency_is_measured_on_the_given_rows(forest, crop_frame):
+    engine = FlatForest.from_sklearn(forest)
+    X = crop_frame[FEATURES].to_numpy(np.float32)
+
+    latency = measure_latency(engine, X, latency_rows=20, repeats=3)
+    assert set(latency) == {'single_row_us', 'batch_us_per_row'}
+    assert latency['single_row_us'] > latency['batch_us_per_row'] > 0
+
+
+def test_search_narrows_to_the_frontier():
+    train, val = make_crop_frame(600, seed=1), make_crop_frame(200, seed=2)
+    space = {'n_estimators': [5, 10, 20], 'max_depth': [3, None]}
+
+    results = successive_halving_search(
+        train[FEATURES].values, train['label'].values, val[FEATURES].values, val['label'].values,
+        n_candidates=6, eta=3, n_workers=1, search_space=space, latency_rows=10, latency_repeats=2
+    )
+    assert list(results.groupby('rung').size()) == [6, 2]
+    assert results['n_train'].iloc[-1] == len(train)
+    params, _ = select_model(results, search_space=space)
+    assert set(params) == set(space)
@@ -0,0 +1,15 @@
+import sys
+
+import pytest
+
+from conftest import ML_DIR
+
+sys.path.insert(0, str(ML_DIR / "benchmarks"))
+from bench_imports import CHECKS, loaded_modules
+
+
+# Wall-clock budgets depend on the machine, so they are only checked by
+# benchmarks/bench_imports.py; the heavy-module checks are deterministic
+@pytest.mark.parametrize("name, code, budget, forbidden", CHECKS, ids=[check[0] for check in CHECKS])
+def test_import_leaves_heavy_modules_unloaded(name, code, budget, forbidden):
+    assert loaded_modules(code, forbidden) == []
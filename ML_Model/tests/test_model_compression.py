@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from conftest import FEATURES
+from forest_engine import FlatForest
+from model_compression import compress_forest, select_trees, tree_selection_order
+
+
+def dense_selection_order(teacher, X):
+    """The greedy selection over a full (trees, rows, classes) vote array."""
+    flat = FlatForest.from_sklearn(teacher)
+    tree_proba = flat.value[flat.apply(X)].transpose(1, 0, 2)
+    target = np.argmax(tree_proba.sum(axis=0), axis=1)
+    total = np.zeros(tree_proba.shape[1:])
+    remaining = list(range(flat.n_trees))
+    order = []
+    while remaining:
+        candidates = total[None] + tree_proba[remaining]
+        best = int(np.argmax((np.argmax(candidates, axis=2) == target).mean(axis=1)))
+        order.append(remaining.pop(best))
+        total = candidates[best]
+    return order
+
+
+def test_tree_selection_matches_the_dense_greedy_order(forest, crop_frame):
+    X = crop_frame[FEATURES].to_numpy()
+    order = tree_selection_order(forest, X)
+
+    assert sorted(order) == list(range(len(forest.estimators_)))
+    assert order == dense_selection_order(forest, X)
+    # The full selection votes like the teacher
+    np.testing.assert_array_equal(select_trees(forest, order).predict(X), forest.predict(X))
+
+
+def test_compression_needs_a_budget(forest, crop_frame):
+    X = crop_frame[FEATURES].to_numpy()
+    with pytest.raises(ValueError, match="budget"):
+        compress_forest(forest, X, X, crop_frame['label'].to_numpy())
+
+
+def test_original_is_kept_when_it_meets_the_budget(forest, crop_frame):
+    X = crop_frame[FEATURES].to_numpy()
+    y = crop_frame['label'].to_numpy()
+
+    model, results = compress_forest(forest, X[:300], X[300:], y[300:], max_size_kb=1e6)
+    assert model is forest
+    assert results['within_budget'].iloc[0]
+    assert len(results) > 1
+
+
+def test_smaller_model_is_chosen_when_the_original_is_over_budget(forest, crop_frame):
+    X = crop_frame[FEATURES].to_numpy()
+    y = crop_frame['label'].to_numpy()
+    _, results = compress_forest(forest, X[:300], X[300:], y[300:], max_size_kb=1e6)
+    budget = results['pickle_kb'].iloc[0] / 2
+
+    model, results = compress_forest(forest, X[:300], X[300:], y[300:], max_size_kb=budget,
+                                     max_accuracy_loss=1.0)
+    assert model is not forest
+    assert not results['within_budget'].iloc[0]
+    assert results[results['within_budget']]['pickle_kb'].max() <= budget
@@ -0,0 +1,66 @@
+import pytest
+
+from pipeline import Stage, PipelineRunner
+
+
+def make_runner(tmp_path, calls, fail=False):
+    source = tmp_path / "input.txt"
+    target = tmp_path / "output.txt"
+
+    def build():
+        calls.append("build")
+        if fail:
+            raise RuntimeError("stage failed")
+        target.write_text(source.read_text().upper())
+
+    stage = Stage("build", build, inputs=[source], outputs=[target])
+    return PipelineRunner([stage], state_path=tmp_path / "cache.json"), source, target
+
+
+def test_unchanged_inputs_are_a_cache_hit(tmp_path):
+    calls = []
+    runner, source, _ = make_runner(tmp_path, calls)
+    source.write_text("a")
+    runner.run()
+    assert runner.run()["build"]["cached"]
+    source.write_text("b")
+    assert not runner.run()["build"]["cached"]
+    assert calls == ["build", "build"]
+
+
+def test_failed_stage_is_not_cached(tmp_path):
+    calls = []
+    runner, source, _ = make_runner(tmp_path, calls, fail=True)
+    source.write_text("a")
+    with pytest.raises(RuntimeError):
+        runner.run()
+    assert "build" not in runner.state["stages"]
+
+
+def test_failed_analysis_fails_the_stage(tmp_path, monkeypatch):
+    import main
+    monkeypatch.setattr(main, "CLEANED_FILE", tmp_path / "missing.csv")
+    with pytest.raises(RuntimeError, match="analysis failed"):
+        main.analyze()
+
+
+def test_training_fingerprint_covers_the_exported_artifact_code():
+    import main
+    inputs = {path.name for path in main.build_pipeline().stages["training"].inputs}
+    assert {"mode.py", "forest_engine.py", "model_store.py"} <= inputs
+
+
+def test_recorded_stage_stays_cached_after_an_outside_update(tmp_path):
+    calls = []
+    runner, source, target = make_runner(tmp_path, calls)
+    source.write_text("a")
+    runner.run()
+
+    # e.g. an incremental update that brings the output in line with new input
+    source.write_text("ab")
+    target.write_text("AB")
+    assert not runner.is_current("build")
+    runner.record("build")
+
+    assert runner.run()["build"]["cached"]
+    assert calls == ["build"]
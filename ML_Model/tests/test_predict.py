@@ -0,0 +1,143 @@
+import io
+import os
+import json
+
+import pytest
+
+from forest_engine import FlatForest
+from model_store import ReloadingModel
+from predict import handle_request, predict_batch, predict_one, serve_stream
+from prediction_cache import PredictionCache
+
+
+class VersionedModel:
+    """Wraps a fitted model and records a version, as loaded artifacts do."""
+
+    def __init__(self, model, version):
+        self.model = model
+        self.version = version
+        self.classes_ = model.classes_
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
+
+def test_model_version_does_not_leak_into_cached_predictions(forest, record):
+    model = VersionedModel(forest, "v1")
+    cache = PredictionCache(max_size=10)
+
+    single = handle_request(model, json.dumps(record), cache=cache)
+    batch = handle_request(model, json.dumps([record]), cache=cache)
+
+    assert single["model_version"] == "v1"
+    assert batch["model_version"] == "v1"
+    assert batch["predictions"] == [{"recommended_crop": single["recommended_crop"]}]
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_returns_copies():
+    cache = PredictionCache(max_size=10)
+    key = cache.key([1, 2, 3, 20.0, 50.0, 6.5, 100.0])
+    result = {"recommended_crop": "rice", "top_crops": [{"crop": "rice", "probability": 0.9}]}
+    cache.put(key, result)
+    result["top_crops"].append({"crop": "maize", "probability": 0.1})
+
+    cached = cache.get(key)
+    cached["extra"] = 1
+    cached["top_crops"][0]["probability"] = 0.0
+    assert cache.get(key) == {"recommended_crop": "rice", "top_crops": [{"crop": "rice", "probability": 0.9}]}
+
+
+@pytest.mark.parametrize("top_k", [-1, 1.5, "3", True, None])
+def test_invalid_top_k_is_an_error_response(forest, record, top_k):
+    response = handle_request(forest, json.dumps({"records": [record], "top_k": top_k, "id": 7}))
+    assert response["id"] == 7
+    assert "top_k" in response["error"]
+
+
+def test_top_k_is_capped_at_the_number_of_classes(forest, record):
+    response = handle_request(forest, json.dumps({**record, "top_k": 100}))
+    ranked = response["top_crops"]
+    assert len(ranked) == len(forest.classes_)
+    assert ranked[0]["crop"] == response["recommended_crop"]
+
+
+def test_stream_answers_each_line_in_order(forest, record):
+    requests = [
+        json.dumps({**record, "id": 1}),
+        "",
+        "not json",
+        json.dumps({"records": [record, record], "id": 2}),
+    ]
+    out = io.StringIO()
+    serve_stream(forest, io.StringIO("\n".join(requests) + "\n"), out)
+
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(responses) == 3
+    assert responses[0]["id"] == 1 and "recommended_crop" in responses[0]
+    assert "error" in responses[1]
+    assert responses[2]["id"] == 2
+    assert responses[2]["predictions"] == [{"recommended_crop": responses[0]["recommended_crop"]}] * 2
+
+
+def test_batch_matches_single_predictions(forest, crop_frame):
+    records = crop_frame.drop(columns="label").head(25).to_dict("records")
+    batch = predict_batch(forest, records, top_k=2)
+    assert batch == [predict_one(forest, record, top_k=2) for record in records]
+
+
+def test_missing_features_are_reported(forest, record):
+    del record["ph"]
+    response = handle_request(forest, json.dumps(record))
+    assert "ph" in response["error"]
+
+
+@pytest.mark.parametrize("engine", ["sklearn", "flat"])
+@pytest.mark.parametrize("value", [None, float("nan"), float("inf")])
+def test_non_finite_features_are_rejected_by_both_engines(forest, record, engine, value):
+    model = FlatForest.from_sklearn(forest) if engine == "flat" else forest
+    response = handle_request(model, json.dumps({"records": [record, {**record, "ph": value}]}))
+    assert response == {"error": "Record 1 has missing or non-finite features: ['ph']"}
+
+
+def test_cache_shares_nearby_readings_and_evicts_least_recent():
+    cache = PredictionCache(max_size=2)
+    reading = [90, 42, 43, 20.87, 82.0, 6.5, 202.9]
+    assert cache.key(reading) == cache.key([90, 42, 43, 20.88, 82.1, 6.51, 203.1])
+    assert cache.key(reading) != cache.key(reading, top_k=3)
+
+    for crop, n in (("rice", 1), ("maize", 2), ("apple", 3)):
+        cache.put(cache.key([n] + reading[1:]), {"recommended_crop": crop})
+    assert cache.get(cache.key([1] + reading[1:])) is None
+    assert cache.get(cache.key([3] + reading[1:])) == {"recommended_crop": "apple"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_reloading_model_swaps_on_change_and_survives_bad_loads(forest, tmp_path):
+    pointer = tmp_path / "CURRENT"
+
+    def point_at(version, mtime):
+        # Explicit mtimes, so the change is seen even on coarse-grained filesystems
+        pointer.write_text(version + "\n")
+        os.utime(pointer, (mtime, mtime))
+
+    point_at("v1", 1_000_000)
+    versions = {"v1": VersionedModel(forest, "v1"), "v2": VersionedModel(forest, "v2")}
+
+    def loader():
+        return versions[pointer.read_text().strip()]
+
+    model = ReloadingModel(loader, pointer, interval=3600)
+    assert model.version == "v1"
+    assert not model.check()
+
+    point_at("v2", 1_000_001)
+    assert model.check()
+    assert model.snapshot() == (versions["v2"], "v2")
+
+    point_at("missing", 1_000_002)
+    assert not model.check()
+    assert model.version == "v2"
@@ -0,0 +1,38 @@
+import numpy as np
+import xarray as xr
+
+from EO_Analysis.utils.preprocessing import (
+    DOS_HISTOGRAM_BINS, apply_atmospheric_correction, estimate_dark_values
+)
+
+
+def make_scene(seed=0):
+    rng = np.random.default_rng(seed)
+    red = rng.uniform(100.0, 3000.0, (64, 64))
+    nir = rng.integers(0, 10000, (64, 64), dtype=np.uint16)
+    return xr.Dataset({"red": (("y", "x"), red), "nir": (("y", "x"), nir)})
+
+
+def test_correction_leaves_the_callers_arrays_untouched():
+    scene = make_scene()
+    red, nir = scene["red"].values, scene["nir"].values
+    red_before, nir_before = red.copy(), nir.copy()
+
+    corrected = apply_atmospheric_correction(scene, {"red": 500.0, "nir": 1000.0})
+
+    np.testing.assert_array_equal(red, red_before)
+    np.testing.assert_array_equal(nir, nir_before)
+    np.testing.assert_allclose(corrected["red"].values, np.maximum(red_before - 500.0, 0))
+    np.testing.assert_allclose(corrected["nir"].values, np.maximum(nir_before - 1000.0, 0))
+    assert corrected["nir"].dtype == np.float32
+    assert corrected["red"].attrs["dark_value"] == 500.0
+
+
+def test_estimated_dark_values_match_the_quantile():
+    scene = make_scene()
+    dark_values = estimate_dark_values(scene)
+
+    assert dark_values["nir"] == float(np.quantile(scene["nir"].values, 0.01))
+    # Float bands are histogram estimates within one bin width of the quantile
+    red = scene["red"].values
+    assert abs(dark_values["red"] - np.quantile(red, 0.01)) <= (red.max() - red.min()) / DOS_HISTOGRAM_BINS
@@ -0,0 +1,45 @@
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import ML_DIR
+from EO_Analysis.utils.preprocessing import calculate_indices
+from EO_Analysis.utils.spectral import compute_indices
+
+sys.path.insert(0, str(ML_DIR / "benchmarks"))
+from bench_spectral import INDICES, legacy_indices, synthetic_scene
+
+
+@pytest.fixture(scope="module")
+def scene():
+    return synthetic_scene(96)
+
+
+def test_fused_indices_match_the_per_index_expressions(scene):
+    fused = calculate_indices(scene, INDICES)
+    expected = legacy_indices(scene)
+    for name in INDICES:
+        assert fused[name].dtype == np.float32
+        assert fused[name].dims == scene.nir.dims
+        np.testing.assert_allclose(fused[name].values, expected[name].values, rtol=1e-5, atol=1e-6)
+
+
+def test_result_does_not_depend_on_the_tile_size(scene):
+    bands = {band: scene[band].values for band in ('nir', 'red', 'blue', 'swir')}
+    whole = compute_indices(bands, INDICES)
+    tiled = compute_indices(bands, INDICES, tile_size=1000)
+    for name in INDICES:
+        np.testing.assert_array_equal(tiled[name], whole[name])
+
+
+def test_zero_denominator_is_nan():
+    bands = {'nir': np.array([0.0, 0.5], dtype=np.float32), 'red': np.array([0.0, 0.1], dtype=np.float32)}
+    ndvi = compute_indices(bands, ['ndvi'])['NDVI']
+    assert np.isnan(ndvi[0])
+    assert ndvi[1] == pytest.approx(0.4 / 0.6)
+
+
+def test_missing_band_is_an_error(scene):
+    with pytest.raises(ValueError, match="swir"):
+        compute_indices({'nir': scene.nir.values}, ['NDWI'])
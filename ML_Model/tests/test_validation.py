@@ -0,0 +1,67 @@
+import sys
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from conftest import ML_DIR
+from EO_Analysis.utils.validation import DataValidator
+
+sys.path.insert(0, str(ML_DIR / "benchmarks"))
+from bench_validation import DATA_TYPES, legacy_validate, synthetic_log
+
+
+@pytest.fixture(scope="module")
+def log():
+    return synthetic_log(20_000, seed=1)
+
+
+@pytest.mark.parametrize("data_type", DATA_TYPES)
+def test_rule_engine_reports_the_legacy_issues(log, data_type):
+    validator = DataValidator()
+    result = validator.validate_sensor_data(log, data_type, strict=False)
+    assert result['issues'] == legacy_validate(validator, log, data_type)['issues']
+
+
+def test_offending_rows_are_reported_by_position(log):
+    result = DataValidator().validate_sensor_data(log, 'rainfall', strict=False)
+    negative = np.flatnonzero(log['precipitation'].to_numpy() < 0)
+    np.testing.assert_array_equal(np.sort(result['offending']['precipitation:negative']), negative)
+    assert result['counts']['precipitation:negative'] == len(negative)
+
+    duplicates = DataValidator().validate_sensor_data(log, 'temperature', strict=False)
+    expected = np.flatnonzero(log['timestamp'].duplicated().to_numpy())
+    np.testing.assert_array_equal(np.sort(duplicates['offending']['timestamp:duplicate']), expected)
+
+
+def test_strict_validation_raises(log):
+    with pytest.raises(ValueError, match="outside valid range"):
+        DataValidator().validate_humidity_data(log)
+
+
+def gappy_band(seed=0, shape=(60, 50)):
+    rng = np.random.default_rng(seed)
+    values = rng.random(shape)
+    values[rng.random(shape) < 0.35] = np.nan
+    return values
+
+
+def test_spatial_gaps_do_not_depend_on_the_strip_size():
+    from scipy import ndimage
+
+    data = xr.Dataset({'nir': (('y', 'x'), gappy_band(0)), 'red': (('y', 'x'), gappy_band(1))})
+    validator = DataValidator()
+    whole = validator.validate_spatial_consistency(data, max_gap_pixels=3)
+    assert not whole['valid']
+
+    labeled, _ = ndimage.label(np.isnan(data['nir'].values))
+    sizes = np.bincount(labeled.ravel())[1:]
+    assert sorted(issue['size_pixels'] for issue in whole['issues'] if issue['band'] == 'nir') == \
+        sorted(int(size) for size in sizes if size > 3)
+
+    def regions(result):
+        return sorted((issue['band'], issue['size_pixels'], str(issue['bbox'])) for issue in result['issues'])
+
+    for tile_rows in (1, 7, 16):
+        tiled = validator.validate_spatial_consistency(data, max_gap_pixels=3, tile_rows=tile_rows)
+        assert regions(tiled) == regions(whole)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from EO_Analysis.utils.windowed import _mask_and_resample, _native_block, _resample_bilinear, tile_windows
+
+
+def test_resampling_at_native_resolution_is_exact():
+    values = np.random.default_rng(0).random((5, 7)).astype(np.float32)
+    out = _resample_bilinear(values, np.arange(5.0), np.arange(7.0))
+    np.testing.assert_array_equal(out, values)
+
+
+def test_invalid_pixels_do_not_bleed_into_clear_ones():
+    values = np.full((8, 8), 0.5, dtype=np.float32)
+    values[:, :4] = np.nan
+    # 2x upsampling: output pixel centres at source coordinates i / 2 - 0.25
+    centres = np.arange(16) / 2 - 0.25
+    out = _resample_bilinear(values, centres, centres)
+    clear = out[~np.isnan(out)]
+    assert clear.size
+    np.testing.assert_array_equal(clear, 0.5)
+    assert np.isnan(out[:, :7]).all()
+
+
+def test_tile_windows_cover_the_grid_once():
+    covered = np.zeros((70, 45), dtype=int)
+    for row, col, height, width in tile_windows(45, 70, 16):
+        covered[row:row + height, col:col + width] += 1
+    assert (covered == 1).all()
+
+
+def test_masked_tiles_resample_seamlessly_without_rasterio():
+    # 10 m band with a bright cloud in its top-left quadrant, resampled onto a 5 m grid
+    band = np.full((64, 64), 0.5, dtype=np.float32)
+    band[:32, :32] = 0.9
+    cloud = np.zeros((64, 64), dtype=bool)
+    cloud[:32, :32] = True
+    grid, shape = (128, 128), (64, 64)
+
+    def resample(window):
+        rows, cols, (row, col, height, width) = _native_block(window, grid, shape)
+        block = np.s_[row:row + height, col:col + width]
+        return _mask_and_resample(band[block].copy(), cloud[block], rows, cols)
+
+    mosaic = np.zeros(grid, dtype=np.float32)
+    for window in tile_windows(*grid, 48):
+        row, col, height, width = window
+        mosaic[row:row + height, col:col + width] = resample(window)
+
+    whole = resample((0, 0, 128, 128))
+    np.testing.assert_array_equal(mosaic, whole)
+    # Only output pixels with no clear neighbour are NaN; the cloud never bleeds
+    cloudy = np.zeros(grid, dtype=bool)
+    cloudy[:63, :63] = True
+    np.testing.assert_array_equal(np.isnan(whole), cloudy)
+    np.testing.assert_array_equal(whole[~cloudy], 0.5)
+
+
+def test_clouds_are_masked_before_resampling(tmp_path):
+    rasterio = pytest.importorskip("rasterio")
+    from rasterio.transform import from_origin
+    from EO_Analysis.utils.windowed import process_satellite_tiles
+
+    crs = "EPSG:32637"
+
+    def write(path, array, resolution, nodata=None):
+        with rasterio.open(path, "w", driver="GTiff", width=array.shape[1], height=array.shape[0], count=1,
+                           dtype=array.dtype, crs=crs, nodata=nodata,
+                           transform=from_origin(500000, 4000000, resolution, resolution)) as dst:
+            dst.write(array, 1)
+        return str(path)
+
+    # 10 m bands whose top-left quadrant is a bright cloud, and a 20 m cloud mask
+    nir = np.full((64, 64), 0.5, dtype=np.float32)
+    red = np.full((64, 64), 0.1, dtype=np.float32)
+    nir[:32, :32] = red[:32, :32] = 0.9
+    cloud = np.zeros((32, 32), dtype=np.uint8)
+    cloud[:16, :16] = 1
+    bands = {"nir": write(tmp_path / "nir.tif", nir, 10), "red": write(tmp_path / "red.tif", red, 10)}
+    mask_path = write(tmp_path / "cloud.tif", cloud, 20)
+
+    # Resampled to 5 m, where bilinear weights would mix cloud into the pixels next to it
+    output = tmp_path / "out.tif"
+    process_satellite_tiles(bands, str(output), cloud_mask=mask_path, resolution=5, indices=["NDVI"],
+                            tile_size=48, n_workers=1, dark_values={"nir": 0.0, "red": 0.0})
+
+    with rasterio.open(output) as result:
+        assert (result.width, result.height) == (128, 128)
+        out_nir, out_red, ndvi = result.read(1), result.read(2), result.read(3)
+    cloudy = np.zeros((128, 128), dtype=bool)
+    cloudy[:64, :64] = True
+    assert np.isnan(out_nir[cloudy]).all() and np.isnan(ndvi[cloudy]).all()
+    np.testing.assert_allclose(out_nir[~cloudy], 0.5)
+    np.testing.assert_allclose(out_red[~cloudy], 0.1)
+    np.testing.assert_allclose(ndvi[~cloudy], 0.4 / 0.6, rtol=1e-6)
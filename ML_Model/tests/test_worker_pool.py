@@ -0,0 +1,95 @@
+import os
+import copy
+import time
+from concurrent.futures import wait
+
+import pytest
+
+from worker_pool import PredictionPool
+
+
+def answer(model, payload):
+    if payload == "crash":
+        os._exit(3)
+    if payload == "hang":
+        time.sleep(60)
+    if payload == "fail":
+        raise ValueError("bad request")
+    return (model, payload, os.getpid())
+
+
+@pytest.fixture
+def pool():
+    with PredictionPool("model", answer, n_workers=2, max_queue=8,
+                        monitor_interval=0.05, result_timeout=2.0) as pool:
+        yield pool
+
+
+def test_results_reach_their_futures(pool):
+    futures = [pool.submit(i) for i in range(20)]
+    assert [f.result(timeout=10)[:2] for f in futures] == [("model", i) for i in range(20)]
+    assert os.getpid() not in {f.result()[2] for f in futures}
+
+
+def test_worker_errors_fail_only_their_request(pool):
+    with pytest.raises(RuntimeError, match="bad request"):
+        pool.submit("fail").result(timeout=10)
+    assert pool.submit(1).result(timeout=10)[1] == 1
+
+
+def test_crashed_worker_fails_its_request_and_is_replaced(pool):
+    crashed = pool.submit("crash")
+    others = [pool.submit(i) for i in range(10)]
+    with pytest.raises(RuntimeError, match="exited"):
+        crashed.result(timeout=10)
+    assert [f.result(timeout=10)[1] for f in others] == list(range(10))
+    assert pool.stats()["restarts"] == 1
+    assert pool.submit("after").result(timeout=10)[1] == "after"
+
+
+def test_stuck_request_times_out_and_worker_is_replaced(pool):
+    stuck = pool.submit("hang")
+    with pytest.raises(TimeoutError):
+        stuck.result(timeout=10)
+    done, _ = wait([pool.submit(i) for i in range(4)], timeout=10)
+    assert len(done) == 4
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["pending"] == 0
+
+
+def test_close_kills_workers_stuck_past_the_timeout():
+    pool = PredictionPool("model", answer, n_workers=1, monitor_interval=0.05, result_timeout=None)
+    stuck = pool.submit("hang")
+    queued = pool.submit(1)
+    start = time.monotonic()
+    pool.close(timeout=0.5)
+    assert time.monotonic() - start < 10
+    for future in (stuck, queued):
+        with pytest.raises(RuntimeError):
+            future.result(timeout=0)
+
+
+def estimator_jobs(model, payload):
+    """n_jobs of the estimator a request would be served by."""
+    if payload == "reload":
+        model.check()
+    return model.snapshot()[0].n_jobs
+
+
+def test_pooled_reloading_estimators_run_single_threaded(forest, tmp_path):
+    import joblib
+    from predict import load_serving_model
+
+    path = tmp_path / "trained_model.pkl"
+    parallel = copy.deepcopy(forest).set_params(n_jobs=-1)
+    joblib.dump(parallel, path)
+
+    model = load_serving_model(path, reload=True, reload_interval=3600)
+    with PredictionPool(model, estimator_jobs, n_workers=2, monitor_interval=0.05) as pool:
+        assert pool.submit(None).result(timeout=10) == 1
+
+        # A model replaced on disk is reloaded single-threaded too
+        joblib.dump(parallel, path)
+        os.utime(path, (1_000_000, 1_000_000))
+        assert pool.submit("reload").result(timeout=10) == 1
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from DataWrangling import (
+    clean_dataframe, load_and_clean_data, load_cleaned_dataset, write_columnar_cache
+)
+
+from conftest import ML_DIR, make_crop_frame
+
+sys.path.insert(0, str(ML_DIR / "benchmarks"))
+from bench_wrangling import legacy_clean, synthetic_frame
+
+
+def test_loader_prefers_a_fresh_columnar_cache(tmp_path, crop_frame):
+    pytest.importorskip("pyarrow")
+    csv_path = tmp_path / "clean.csv"
+    crop_frame.to_csv(csv_path, index=False)
+    cache_path = write_columnar_cache(crop_frame, csv_path)
+
+    cached = load_cleaned_dataset(csv_path)
+    assert cached['temperature'].dtype == np.float32
+    assert cached['label'].dtype == 'category'
+    np.testing.assert_allclose(cached['rainfall'], crop_frame['rainfall'], rtol=1e-6)
+
+    # A CSV rewritten after the cache makes the cache stale
+    stat = cache_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    fresh = load_cleaned_dataset(csv_path)
+    assert fresh['temperature'].dtype == np.float64
+    assert list(fresh.columns) == list(crop_frame.columns)
+
+
+def test_loader_reads_the_csv_without_a_cache(tmp_path, crop_frame):
+    csv_path = tmp_path / "clean.csv"
+    crop_frame.to_csv(csv_path, index=False)
+    assert len(load_cleaned_dataset(csv_path)) == len(crop_frame)
+
+
+def dirty_crop_frame():
+    """Raw-style frame with missing values, repeated rows and outliers."""
+    df = make_crop_frame(300, seed=3).rename(columns={'n': 'N', 'p': 'P', 'k': 'K'})
+    df['humidity'] = df['humidity'].astype(float)
+    df.loc[[5, 17, 40], 'humidity'] = np.nan
+    df.loc[[8, 90], 'N'] = np.nan
+    df.loc[[12], 'label'] = None
+    df.loc[[3, 7], 'rainfall'] = [900.0, -400.0]
+    return pd.concat([df, df.iloc[[1, 2, 3, 12]]], ignore_index=True)
+
+
+def test_clean_dataframe_matches_the_per_column_cleaning():
+    raw = dirty_crop_frame()
+    cleaned, report = clean_dataframe(raw)
+
+    pd.testing.assert_frame_equal(cleaned, legacy_clean(raw.copy()))
+    assert report['duplicates_removed'] == 4
+    assert report['columns']['humidity']['nulls_filled'] == 3
+    assert report['columns']['label']['nulls_filled'] == 2
+    assert report['columns']['rainfall']['clipped_low'] >= 1
+    assert report['columns']['rainfall']['clipped_high'] >= 1
+
+
+def test_clean_dataframe_matches_on_the_benchmark_frame():
+    raw = synthetic_frame(5000, seed=2)
+    cleaned, _ = clean_dataframe(raw)
+    pd.testing.assert_frame_equal(cleaned, legacy_clean(raw.copy()))
+
+
+@pytest.mark.parametrize("dedup", ["hash", "bloom"])
+def test_streaming_cleaner_matches_the_in_memory_one(tmp_path, dedup):
+    raw_path = tmp_path / "raw.csv"
+    dirty_crop_frame().to_csv(raw_path, index=False)
+
+    batch = load_and_clean_data(raw_path, tmp_path / "batch.csv")
+    stream = load_and_clean_data(raw_path, tmp_path / "stream.csv", chunksize=64, dedup=dedup,
+                                 expected_rows=1000)
+
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "stream.csv"), pd.read_csv(tmp_path / "batch.csv"))
+    for key in ('initial_rows', 'final_rows', 'duplicates_removed'):
+        assert stream[key] == batch[key]
+    assert stream['columns']['humidity']['fill_value'] == batch['columns']['humidity']['fill_value']
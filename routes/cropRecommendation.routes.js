@@ -1,12 +1,7 @@
 const express = require("express");
 const router = express.Router();
-const { spawn } = require("child_process");
-const path = require("path");
 const { getBestCropMatch } = require("../utils/tempCropsTest");
-
-// Get the absolute path to the ML model directory
-const ML_MODEL_DIR = path.join(__dirname, "..", "ML_Model", "ML_Model");
-const PREDICT_SCRIPT = path.join(ML_MODEL_DIR, "predict.py");
+const { predict } = require("../service/predictionWorker");
 
 // Updated validation ranges based on training data
 const validations = {
@@ -104,53 +99,34 @@ router.post("/predict", async (req, res) => {
       });
     }
 
-    console.log("Spawning Python process with data:", parsedData);
-
-    // Spawn Python process with working directory set to ML model directory
-    const pythonProcess = spawn(
-      "python",
-      [PREDICT_SCRIPT, JSON.stringify(parsedData)],
-      {
-        cwd: ML_MODEL_DIR,
-      }
-    );
-
-    let result = "";
-    let error = "";
-
-    // Collect data from script
-    pythonProcess.stdout.on("data", (data) => {
-      result += data.toString();
-      console.log("Python stdout:", data.toString());
-    });
+    console.log("Sending prediction request to worker:", parsedData);
+
+    // Optional ranked list of crops with probabilities from the same model pass
+    const topK = parseInt(req.body.top_k, 10);
+    const request = topK > 0 ? { ...parsedData, top_k: topK } : parsedData;
+
+    // Reuse the warm predict.py worker instead of spawning one per request
+    let prediction;
+    try {
+      prediction = await predict(request);
+    } catch (e) {
+      console.error("Prediction worker error:", e);
+      return res.status(500).json({
+        error: "Failed to process prediction",
+        details: e.message,
+      });
+    }
 
-    pythonProcess.stderr.on("data", (data) => {
-      error += data.toString();
-      console.error("Python error:", data.toString());
-    });
+    if (prediction.error) {
+      console.error("Prediction error from worker:", prediction.error);
+      return res.status(500).json({
+        error: "Failed to process prediction",
+        details: prediction.error,
+      });
+    }
 
-    // Handle process completion
-    pythonProcess.on("close", (code) => {
-      console.log("Python process exited with code:", code);
-      if (code !== 0) {
-        console.error("Python process error:", error);
-        return res.status(500).json({
-          error: "Failed to process prediction",
-          details: error,
-        });
-      }
-      try {
-        const prediction = JSON.parse(result);
-        console.log("Prediction result:", prediction);
-        res.json(prediction);
-      } catch (e) {
-        console.error("Parse error:", e);
-        res.status(500).json({
-          error: "Failed to parse prediction result",
-          details: e.message,
-        });
-      }
-    });
+    console.log("Prediction result:", prediction);
+    res.json(prediction);
   } catch (error) {
     console.error("Prediction error:", error);
     res.status(500).json({
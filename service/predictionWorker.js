@@ -0,0 +1,100 @@
+const { spawn } = require("child_process");
+const path = require("path");
+const readline = require("readline");
+
+// Get the absolute path to the ML model directory
+const ML_MODEL_DIR = path.join(__dirname, "..", "ML_Model", "ML_Model");
+const PREDICT_SCRIPT = path.join(ML_MODEL_DIR, "predict.py");
+
+const REQUEST_TIMEOUT_MS = 30000;
+
+let worker = null;
+let nextId = 1;
+const pending = new Map();
+
+/**
+ * Starts the long-lived predict.py process in NDJSON serving mode
+ * @returns {ChildProcess} The running worker process
+ */
+function startWorker() {
+  const proc = spawn("python", [PREDICT_SCRIPT, "--serve", "--engine", "flat", "--reload"], {
+    cwd: ML_MODEL_DIR,
+  });
+
+  const lines = readline.createInterface({ input: proc.stdout });
+  lines.on("line", (line) => {
+    let response;
+    try {
+      response = JSON.parse(line);
+    } catch (e) {
+      console.error("Invalid response from prediction worker:", line);
+      return;
+    }
+    const entry = pending.get(response.id);
+    if (!entry) return;
+    pending.delete(response.id);
+    clearTimeout(entry.timer);
+    delete response.id;
+    entry.resolve(response);
+  });
+
+  proc.stderr.on("data", (data) => {
+    console.error("Prediction worker:", data.toString());
+  });
+
+  proc.on("error", (error) => {
+    console.error("Failed to start prediction worker:", error.message);
+  });
+
+  // Writes to a worker that has died fail with EPIPE; without this handler
+  // the error would crash the server instead of going through the respawn path
+  proc.stdin.on("error", (error) => {
+    console.error("Prediction worker input failed:", error.message);
+    stopWorker(proc, error);
+  });
+
+  proc.on("close", (code) => {
+    console.log("Prediction worker exited with code:", code);
+    stopWorker(proc, new Error(`Prediction worker exited with code ${code}`));
+  });
+
+  return proc;
+}
+
+/**
+ * Drops a dead worker and fails every request still waiting on it; the next call respawns it
+ * @param {ChildProcess} proc - The worker that failed
+ * @param {Error} error - Error the pending requests are rejected with
+ */
+function stopWorker(proc, error) {
+  if (worker === proc) worker = null;
+  proc.kill();
+  for (const [id, entry] of pending) {
+    clearTimeout(entry.timer);
+    entry.reject(error);
+    pending.delete(id);
+  }
+}
+
+/**
+ * Sends one feature record to the warm prediction worker
+ * @param {Object} features - Parsed feature values (n, p, k, temperature, humidity, ph, rainfall)
+ * @returns {Promise<Object>} Prediction response from predict.py
+ */
+function predict(features) {
+  if (!worker) worker = startWorker();
+
+  const id = nextId++;
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => {
+      pending.delete(id);
+      reject(new Error("Prediction timed out"));
+    }, REQUEST_TIMEOUT_MS);
+    pending.set(id, { resolve, reject, timer });
+    worker.stdin.write(JSON.stringify({ id, ...features }) + "\n");
+  });
+}
+
+module.exports = {
+  predict,
+};